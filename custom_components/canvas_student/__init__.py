@@ -1,41 +1,195 @@
 
 from __future__ import annotations
-from homeassistant.core import HomeAssistant
+import time
+_IMPORT_STARTED = time.perf_counter()
+import asyncio
+import importlib
+import logging
+import sys
+from typing import TYPE_CHECKING
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
-from .const import DOMAIN
-from .coordinator import CanvasCoordinator
-from .simple_client import CanvasClient
+from .const import CONF_OBSERVEES, CONF_OBSERVER, DATA_AGGREGATE, DATA_METRICS, DATA_SCHEDULER, DOMAIN, GRADE_HISTORY_VERSION, IMPORT_BUDGET_MS, OPT_HIDE_EMPTY, SUBMISSION_CACHE_VERSION
 
-PLATFORMS = [Platform.SENSOR]
+if TYPE_CHECKING: from .coordinator import CanvasCoordinator
+
+PLATFORMS = [Platform.SENSOR, Platform.CALENDAR, Platform.TODO]
+
+_LOGGER = logging.getLogger(__name__)
+
+# HA imports this package (config_flow.py included) just to offer the config flow, so everything
+# only a running entry needs is imported on first setup, in the executor (see _async_import_runtime)
+_RUNTIME_MODULES = ("aggregate", "metrics", "scheduler", "services", "websocket_api", "simple_client", "observer", "coordinator")
+
+# Time spent importing this package and everything it pulls in eagerly (see diagnostics "startup")
+IMPORT_MS = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
+# Time spent importing the runtime modules, set by the first setup
+_runtime_import_ms: float | None = None
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+def _import_modules(names: list[str]) -> None:
+    for name in names: importlib.import_module(name)
+
+async def _async_import_runtime(hass: HomeAssistant) -> None:
+    """Import the runtime modules off the event loop (a no-op once they are loaded)."""
+    global _runtime_import_ms
+    missing = [f"{__name__}.{m}" for m in _RUNTIME_MODULES if f"{__name__}.{m}" not in sys.modules]
+    if not missing: return
+    started = time.perf_counter()
+    # Import executor on HA 2024.3+, the regular one before
+    add_job = getattr(hass, "async_add_import_executor_job", hass.async_add_executor_job)
+    await add_job(_import_modules, missing)
+    _runtime_import_ms = _elapsed_ms(started)
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    if IMPORT_MS > IMPORT_BUDGET_MS:
+        _LOGGER.warning("Importing %s took %.0f ms (budget %d ms)", DOMAIN, IMPORT_MS, IMPORT_BUDGET_MS)
+    await _async_import_runtime(hass)
+    from .aggregate import CanvasAggregate
+    from .metrics import PerformanceMonitor
+    from .scheduler import RefreshScheduler
+    from .services import async_setup_services
+    from .websocket_api import async_setup_websocket_api
+    scheduler = hass.data.setdefault(DATA_SCHEDULER, RefreshScheduler())
+    hass.data.setdefault(DATA_AGGREGATE, CanvasAggregate())
+    # State-write counters, reported in diagnostics; loop lag is sampled only with debug logging on
+    monitor = hass.data.setdefault(DATA_METRICS, PerformanceMonitor(lambda: scheduler.busy))
+    monitor.async_follow_logging(hass)
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
     return True
 
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    await hass.config_entries.async_reload(entry.entry_id)
+    # Options only shape the views built from the cached snapshot; apply them in place.
+    # Credentials / base URL / names need a fresh client and entities, so reload.
+    coords = (hass.data.get(DOMAIN, {}).get(entry.entry_id) or {}).get("coordinators") or []
+    if not coords or any(c.requires_reload() for c in coords):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    for coord in coords:
+        await coord.async_apply_options()
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    started = time.perf_counter()
+    await _async_import_runtime(hass)
+    from .aggregate import CanvasAggregate
+    from .coordinator import CanvasCoordinator
+    from .observer import ObserverSession, ObserverStudentClient
+    from .scheduler import RefreshScheduler
+    from .simple_client import CanvasClient
+    startup: dict[str, float | None] = {"import_ms": IMPORT_MS, "runtime_import_ms": _runtime_import_ms}
     session = async_get_clientsession(hass)
     client = CanvasClient(entry.data.get("base_url"), entry.data.get("access_token"), session=session)
-    coord = CanvasCoordinator(hass, entry, client)
-    try:
-        await coord.async_config_entry_first_refresh()
-    except Exception as ex:
-        raise ConfigEntryNotReady(str(ex))
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {"coordinator": coord, "client": client}
+    scheduler = hass.data.setdefault(DATA_SCHEDULER, RefreshScheduler())
+
+    # An observer token covers several students: one coordinator each, all sharing one session
+    observer: ObserverSession | None = None
+    if entry.data.get(CONF_OBSERVER):
+        observees = entry.data.get(CONF_OBSERVEES) or []
+        observer = ObserverSession(client, [o["id"] for o in observees])
+        coords = [
+            CanvasCoordinator(
+                hass, entry, ObserverStudentClient(observer, o["id"]), scheduler=scheduler,
+                student_id=o["id"], student_name=o.get("name"),
+            )
+            for o in observees
+        ]
+    else:
+        coords = [CanvasCoordinator(hass, entry, client, scheduler=scheduler)]
+    # Persisted submission states let the first crawl skip work that is already known;
+    # grade histories must be loaded before the first crawl appends to them
+    phase = time.perf_counter()
+    await asyncio.gather(*(c.submission_cache.async_load() for c in coords), *(c.grade_history.async_load() for c in coords))
+    startup["load_stores_ms"] = _elapsed_ms(phase)
+
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+        "coordinator": coords[0] if coords else None,
+        "coordinators": coords,
+        "client": client,
+        "observer": observer,
+        "startup": startup,
+    }
+
+    # Feed each student's slice into the cross-school aggregate on every coordinator update
+    # (the first one included, so listeners go in before the first refresh)
+    aggregate = hass.data.setdefault(DATA_AGGREGATE, CanvasAggregate())
+
+    for coord in coords:
+        @callback
+        def _push_aggregate(coord: CanvasCoordinator = coord) -> None:
+            meta = {
+                "key": coord.unique_prefix,
+                "entry_id": entry.entry_id,
+                "school_name": entry.data.get("school_name"),
+                "student_name": coord.student_name,
+                "base_url": entry.data.get("base_url"),
+                "hide_empty": entry.options.get(OPT_HIDE_EMPTY, False),
+            }
+            aggregate.async_update_entry(meta, coord.data)
+
+        entry.async_on_unload(coord.async_add_listener(_push_aggregate))
+        entry.async_on_unload(coord.async_shutdown)
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # Platforms are set up while the first crawl runs instead of after it; entities stay
+    # unavailable until their coordinator has data.
+    async def _first_refresh() -> None:
+        phase = time.perf_counter()
+        try:
+            await asyncio.gather(*(c.async_config_entry_first_refresh() for c in coords))
+        finally:
+            startup["first_refresh_ms"] = _elapsed_ms(phase)
+
+    async def _forward_platforms() -> None:
+        phase = time.perf_counter()
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        startup["platforms_ms"] = _elapsed_ms(phase)
+
+    refreshed, forwarded = await asyncio.gather(_first_refresh(), _forward_platforms(), return_exceptions=True)
+    if isinstance(refreshed, Exception):
+        if not isinstance(forwarded, BaseException):
+            await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+        if (aggregate := hass.data.get(DATA_AGGREGATE)) is not None:
+            aggregate.async_remove_entry(entry.entry_id)
+        for c in coords:
+            scheduler.unregister(c.unique_prefix)
+        raise ConfigEntryNotReady(str(refreshed)) from refreshed
+    for result in (refreshed, forwarded):
+        if isinstance(result, BaseException):
+            raise result
+    startup["setup_ms"] = _elapsed_ms(started)
+    _LOGGER.debug("Canvas %s set up: %s", entry.title, startup)
     return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+        entry_data = hass.data.get(DOMAIN, {}).pop(entry.entry_id, None) or {}
+        if (aggregate := hass.data.get(DATA_AGGREGATE)) is not None:
+            aggregate.async_remove_entry(entry.entry_id)
+        if (scheduler := hass.data.get(DATA_SCHEDULER)) is not None:
+            for coord in entry_data.get("coordinators") or []:
+                scheduler.unregister(coord.unique_prefix)
     return unload_ok
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await _async_import_runtime(hass)
+    from .grade_history import storage_key as grade_history_key
+    from .submission_cache import storage_key
+    # Delete the persisted submission caches and grade histories of the entry (one per observed student)
+    observees = (entry.data.get(CONF_OBSERVEES) or []) if entry.data.get(CONF_OBSERVER) else []
+    prefixes = [f"{entry.entry_id}_{o['id']}" for o in observees] or [entry.entry_id]
+    for prefix in prefixes:
+        await Store(hass, SUBMISSION_CACHE_VERSION, storage_key(prefix)).async_remove()
+        await Store(hass, GRADE_HISTORY_VERSION, grade_history_key(prefix)).async_remove()
+
 async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
@@ -0,0 +1,217 @@
+"""Cross-school aggregation for Canvas Student.
+
+Dashboards used to loop over `states.sensor` in Jinja to merge every school's
+missing / upcoming / awaiting-grading / announcements attributes on each render.
+CanvasAggregate does that merge once in Python: each coordinator update rebuilds
+only that entry's slice (already sorted and grouped by course), and the
+domain-wide sensors in sensor.py publish the merged result.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Callable
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .gpa import cumulative_gpa
+from .render import format_local, render_markdown
+
+_LOGGER = logging.getLogger(__name__)
+
+# Aggregate kind -> coordinator data key
+AGGREGATE_KINDS: dict[str, str] = {
+    "missing": "missing_by_course",
+    "upcoming": "assignments_by_course",
+    "awaiting_grading": "ungraded_by_course",
+    "announcements": "announcements",
+}
+
+# Undated items sort after dated ones
+_NO_DATE = "9999-12-31T23:59:59Z"
+
+
+def _group_announcements(items: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    grouped: dict[str, list[dict[str, Any]]] = {}
+    for a in items:
+        grouped.setdefault(str(a.get("course_id")), []).append(a)
+    return grouped
+
+
+def _grade_text(g: dict[str, Any] | None) -> str | None:
+    """Same wording as the assignments card: "A (93.1%)", "93.1%" or "A"."""
+    if not g:
+        return None
+    score = g.get("current_score")
+    letter = g.get("current_grade")
+    if letter and score is not None:
+        return f"{letter} ({round(float(score), 1)}%)"
+    if score is not None:
+        return f"{round(float(score), 1)}%"
+    return letter or None
+
+
+def _display_row(kind: str, a: dict[str, Any]) -> dict[str, Any]:
+    """Copy an item and add pre-formatted local timestamps."""
+    row = dict(a)
+    if kind == "announcements":
+        row["posted_display"] = format_local(a.get("posted_at"))
+    else:
+        row["due_display"] = format_local(a.get("due_at"))
+    if kind == "awaiting_grading":
+        row["submitted_display"] = format_local(a.get("submitted_at"))
+    return row
+
+
+def build_entry_slice(kind: str, meta: dict[str, Any], data: dict[str, Any]) -> dict[str, Any]:
+    """Return one entry's pre-sorted, course-grouped, display-ready slice for an aggregate kind."""
+    raw = data.get(AGGREGATE_KINDS[kind])
+    by_course = _group_announcements(raw or []) if kind == "announcements" else (raw or {})
+    names = data.get("course_names_by_id") or {}
+    base_url = meta.get("base_url") or ""
+
+    courses: list[dict[str, Any]] = []
+    total = 0
+    for cid, items in by_course.items():
+        # The upcoming card lists every course (with its grade) even when nothing is due
+        if not items and kind != "upcoming":
+            continue
+        if kind == "announcements":
+            rows = sorted(items, key=lambda a: a.get("posted_at") or "", reverse=True)
+        else:
+            rows = sorted(items, key=lambda a: a.get("due_at") or _NO_DATE)
+        total += len(rows)
+        course = {
+            "course_id": cid,
+            "course_name": names.get(str(cid), str(cid)),
+            "course_url": f"{base_url}/courses/{cid}" if base_url else None,
+            "count": len(rows),
+            "items": [_display_row(kind, a) for a in rows],
+        }
+        if kind == "upcoming":
+            course["grade_text"] = _grade_text((data.get("grades_by_course") or {}).get(str(cid)))
+            course["grade_url"] = (data.get("grade_urls_by_course") or {}).get(str(cid))
+            course["credits"] = (data.get("credits_by_course") or {}).get(str(cid))
+        courses.append(course)
+    courses.sort(key=lambda c: str(c["course_name"]).lower())
+
+    return {
+        "entry_id": meta.get("entry_id"),
+        "school_name": meta.get("school_name"),
+        "student_name": meta.get("student_name"),
+        "base_url": base_url,
+        "hide_empty": meta.get("hide_empty", False),
+        "gpa": data.get("gpa"),
+        # Cross-school GPA is recombined from these, not averaged from "gpa"
+        "gpa_credits": data.get("gpa_credits") or 0.0,
+        "gpa_quality_points": data.get("gpa_quality_points") or 0.0,
+        "gpa_max_points": data.get("gpa_max_points"),
+        "total": total,
+        "courses": courses,
+    }
+
+
+class CanvasAggregate:
+    """Merged, incrementally maintained views across every config entry."""
+
+    def __init__(self) -> None:
+        # kind -> slice key (entry id, or entry id + student for observer entries) -> slice
+        self._slices: dict[str, dict[str, dict[str, Any]]] = {k: {} for k in AGGREGATE_KINDS}
+        # kind -> merged {"total", "schools"}; rebuilt only when a slice changes
+        self._merged: dict[str, dict[str, Any]] = {k: {"total": 0, "schools": []} for k in AGGREGATE_KINDS}
+        # kind -> rendered Markdown; None until first requested after a change
+        self._rendered: dict[str, str | None] = {k: None for k in AGGREGATE_KINDS}
+        self._listeners: dict[str, list[Callable[[], None]]] = {k: [] for k in AGGREGATE_KINDS}
+
+        # Entity ownership: the aggregate sensors live on one entry's sensor platform
+        self._platforms: dict[str, AddEntitiesCallback] = {}
+        self._owner: str | None = None
+        self._entity_factory: Callable[[], list[Any]] | None = None
+
+    # --- Data ---
+
+    def merged(self, kind: str) -> dict[str, Any]:
+        return self._merged[kind]
+
+    def rendered(self, kind: str) -> str:
+        """Pre-rendered card content; re-rendered only after the merged view changed."""
+        if self._rendered[kind] is None:
+            self._rendered[kind] = render_markdown(kind, self._merged[kind])
+        return self._rendered[kind]
+
+    def cumulative_gpa(self) -> dict[str, dict[str, Any]]:
+        """Credit-weighted GPA across schools, per student (schools are matched by student name)."""
+        by_student: dict[str, list[dict[str, Any]]] = {}
+        for s in self._merged["upcoming"]["schools"]:
+            by_student.setdefault(str(s.get("student_name") or "Student"), []).append(s)
+        return {name: c for name, parts in by_student.items() if (c := cumulative_gpa(parts)) is not None}
+
+    @callback
+    def async_update_entry(self, meta: dict[str, Any], data: dict[str, Any] | None) -> None:
+        """Rebuild one entry's (or observed student's) slices and notify only the kinds that changed."""
+        key = meta.get("key") or meta["entry_id"]
+        for kind in AGGREGATE_KINDS:
+            new = build_entry_slice(kind, meta, data or {})
+            if self._slices[kind].get(key) == new:
+                continue
+            self._slices[kind][key] = new
+            self._remerge(kind)
+
+    @callback
+    def async_remove_entry(self, entry_id: str) -> None:
+        """Drop every slice belonging to an entry."""
+        for kind in AGGREGATE_KINDS:
+            keys = [k for k, s in self._slices[kind].items() if s.get("entry_id") == entry_id]
+            for k in keys:
+                del self._slices[kind][k]
+            if keys:
+                self._remerge(kind)
+
+    def _remerge(self, kind: str) -> None:
+        schools = sorted(
+            self._slices[kind].values(),
+            key=lambda s: (str(s.get("school_name") or "").lower(), str(s.get("student_name") or "").lower()),
+        )
+        self._merged[kind] = {"total": sum(s["total"] for s in schools), "schools": schools}
+        self._rendered[kind] = None
+        for cb in list(self._listeners[kind]):
+            cb()
+
+    @callback
+    def async_add_listener(self, kind: str, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        self._listeners[kind].append(update_callback)
+
+        @callback
+        def _remove() -> None:
+            if update_callback in self._listeners[kind]:
+                self._listeners[kind].remove(update_callback)
+
+        return _remove
+
+    # --- Entity ownership ---
+
+    @callback
+    def async_register_platform(
+        self,
+        entry_id: str,
+        async_add_entities: AddEntitiesCallback,
+        entity_factory: Callable[[], list[Any]],
+    ) -> None:
+        """Remember an entry's sensor platform; the first one hosts the aggregate sensors."""
+        self._platforms[entry_id] = async_add_entities
+        self._entity_factory = entity_factory
+        if self._owner is None:
+            self._owner = entry_id
+            async_add_entities(entity_factory())
+
+    @callback
+    def async_unregister_platform(self, entry_id: str) -> None:
+        """Forget a platform; if it hosted the aggregate sensors, re-home them on another entry."""
+        self._platforms.pop(entry_id, None)
+        if self._owner != entry_id:
+            return
+        self._owner = None
+        if self._platforms and self._entity_factory is not None:
+            self._owner, add_entities = next(iter(self._platforms.items()))
+            _LOGGER.debug("Canvas aggregate sensors moved to entry %s", self._owner)
+            add_entities(self._entity_factory())
@@ -0,0 +1,133 @@
+"""Calendar platform: Canvas due dates as calendar events."""
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import CALENDAR_EVENT_MINUTES, DOMAIN
+from .coordinator import CanvasCoordinator
+from .metrics import MeteredEntity
+
+
+class DueDateIndex:
+    """Events kept sorted by start so range queries are two bisects.
+
+    Every event lasts at most `max_duration`, so anything overlapping
+    [start, end) must start in [start - max_duration, end).
+    """
+
+    def __init__(self, max_duration: timedelta) -> None:
+        self.max_duration = max_duration
+        self._keys: list[tuple[datetime, str]] = []
+        self._events: dict[str, CalendarEvent] = {}
+        # Due item each event was built from; unchanged items keep their event
+        self._items: dict[str, dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def sync(self, items: dict[str, dict[str, Any]], build: Callable[[dict[str, Any]], CalendarEvent]) -> bool:
+        """Apply add/remove/update diffs against the current contents; return True if anything changed.
+
+        Events (costly to construct) are built only for new or changed items.
+        """
+        changed = False
+        for uid in [u for u, item in self._items.items() if items.get(u) != item]:
+            self._remove(uid)
+            changed = True
+        for uid, item in items.items():
+            if uid not in self._events:
+                ev = self._events[uid] = build(item)
+                self._items[uid] = item
+                insort(self._keys, (ev.start, uid))
+                changed = True
+        return changed
+
+    def _remove(self, uid: str) -> None:
+        del self._items[uid]
+        ev = self._events.pop(uid)
+        i = bisect_left(self._keys, (ev.start, uid))
+        if i < len(self._keys) and self._keys[i] == (ev.start, uid):
+            del self._keys[i]
+
+    def between(self, start: datetime, end: datetime) -> list[CalendarEvent]:
+        lo = bisect_left(self._keys, (start - self.max_duration, ""))
+        hi = bisect_left(self._keys, (end, ""))
+        return [
+            self._events[uid]
+            for _, uid in self._keys[lo:hi]
+            if self._events[uid].end > start
+        ]
+
+    def next_after(self, now: datetime) -> CalendarEvent | None:
+        """First event that has not ended yet."""
+        i = bisect_left(self._keys, (now - self.max_duration, ""))
+        for _, uid in self._keys[i:]:
+            if self._events[uid].end > now:
+                return self._events[uid]
+        return None
+
+
+def _to_event(item: dict[str, Any], duration: timedelta) -> CalendarEvent:
+    due: datetime = item["due"]
+    description = item["course_name"]
+    if item.get("due_source") == "course_end":
+        description += " (due date from course end date)"
+    if item.get("html_url"):
+        description += f"\n{item['html_url']}"
+    return CalendarEvent(
+        start=due - duration,
+        end=due,
+        summary=str(item.get("name") or "Assignment"),
+        description=description,
+        uid=item["uid"],
+    )
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
+    coords: list[CanvasCoordinator] = hass.data[DOMAIN][entry.entry_id]["coordinators"]
+    async_add_entities([CanvasDueDatesCalendar(coord, entry) for coord in coords])
+
+
+class CanvasDueDatesCalendar(MeteredEntity, CoordinatorEntity, CalendarEntity):
+    """Due dates for every visible course; rebuilt by diff on each coordinator update."""
+    _attr_icon = "mdi:calendar-check"
+
+    def __init__(self, coordinator: CanvasCoordinator, entry: ConfigEntry) -> None:
+        super().__init__(coordinator)
+        self._entry = entry
+        self._attr_name = f"Canvas ({entry.data.get('school_name')} - {coordinator.student_name or 'Student'}) Due Dates"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_v2_due_dates_calendar"
+        self._metrics_group = coordinator.unique_prefix
+        self._duration = timedelta(minutes=CALENDAR_EVENT_MINUTES)
+        self._index = DueDateIndex(self._duration)
+        self._sync()
+
+    @property
+    def available(self) -> bool:
+        # Platforms are set up while the first refresh runs; no data yet means unavailable
+        return super().available and self.coordinator.data is not None
+
+    def _sync(self) -> bool:
+        items = {item["uid"]: item for item in self.coordinator.due_items()}
+        return self._index.sync(items, lambda item: _to_event(item, self._duration))
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._sync()
+        super()._handle_coordinator_update()
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        return self._index.next_after(dt_util.utcnow())
+
+    async def async_get_events(self, hass: HomeAssistant, start_date: datetime, end_date: datetime) -> list[CalendarEvent]:
+        return self._index.between(start_date, end_date)
@@ -0,0 +1,249 @@
+"""Record and replay Canvas traffic ("cassettes") for offline benchmarking.
+
+Performance problems depend on the shape of a school's data: how many courses,
+how deep the pagination goes, how many assignments and submissions each course
+has. A cassette captures that shape from a real installation and lets the same
+refresh workload run anywhere, with no token and no network.
+
+Both sides sit at the aiohttp session level, below CanvasClient, so queueing,
+pagination, decoding and tracing behave exactly as in production:
+
+* RecordingSession wraps the real ClientSession (CanvasClient.start_capture())
+  and keeps every response, sanitized: no Authorization header, secret query
+  values dropped, the school's host replaced, and personal fields (names,
+  e-mails, login ids, free text) overwritten with same-length filler so payload
+  sizes stay realistic.
+* ReplaySession serves a cassette to a CanvasClient, optionally adding a fixed
+  and/or the recorded per-request latency.
+
+Capture from a running installation with the `canvas_student.capture_cassette`
+service; replay in a benchmark with::
+
+    client = CanvasClient(CASSETTE_BASE_URL, "replay", session=ReplaySession(load_cassette(path), latency_s=0.05))
+    coordinator = CanvasCoordinator(hass, entry, client)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Mapping
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from .const import CASSETTE_BASE_URL, CASSETTE_VERSION
+
+# Never part of the request key or the stored URLs
+_SECRET_PARAMS = frozenset({"access_token", "token", "verifier", "client_secret", "refresh_token"})
+_SECRET_IN_TEXT = re.compile(r"\b(access_token|token|verifier)=[^&\"'\s>]+")
+
+# Personal data anywhere in a payload. "name" is a person's name in /users/self, observees
+# and nested user/author objects; course and assignment names are filled in too (sizes stay)
+_PERSONAL_FIELDS = frozenset(
+    {
+        "name",
+        "sortable_name",
+        "short_name",
+        "display_name",
+        "email",
+        "primary_email",
+        "login_id",
+        "sis_user_id",
+        "sis_login_id",
+        "integration_id",
+        "avatar_image_url",
+        "avatar_url",
+        "pronouns",
+        "bio",
+        "body",
+        "message",
+        "comment",
+    }
+)
+# Response headers kept in the cassette
+_KEPT_HEADERS = ("Link", "X-Rate-Limit-Remaining", "X-Request-Cost", "Content-Type")
+
+
+def _filler(value: str) -> str:
+    return "x" * len(value)
+
+
+def scrub(value: Any, origin: str | None = None) -> Any:
+    """Copy of a decoded payload with personal fields overwritten, secrets removed and
+    links to the school's `origin` (scheme://host) pointed at CASSETTE_BASE_URL."""
+    if isinstance(value, dict):
+        return {
+            k: _filler(v) if isinstance(v, str) and k in _PERSONAL_FIELDS else scrub(v, origin)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [scrub(v, origin) for v in value]
+    if isinstance(value, str):
+        if origin:
+            value = value.replace(origin, CASSETTE_BASE_URL)
+        return _SECRET_IN_TEXT.sub(lambda m: f"{m.group(1)}=redacted", value)
+    return value
+
+
+def _anonymize_links(link: str) -> str:
+    """Point every URL of a Link header at CASSETTE_BASE_URL, without secret query values."""
+
+    def _swap(match: re.Match[str]) -> str:
+        parts = urlsplit(match.group(1))
+        query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in _SECRET_PARAMS]
+        return f"<{CASSETTE_BASE_URL}{parts.path}{'?' + urlencode(query) if query else ''}>"
+
+    return re.sub(r"<([^>]+)>", _swap, link)
+
+
+def request_key(url: Any, params: Mapping[str, Any] | None = None) -> str:
+    """Host-independent key of a GET: path plus sorted query (list params flattened)."""
+    parts = urlsplit(str(url))
+    pairs = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in _SECRET_PARAMS]
+    for k, v in (params or {}).items():
+        if k in _SECRET_PARAMS:
+            continue
+        for item in v if isinstance(v, (list, tuple)) else [v]:
+            pairs.append((k, str(item)))
+    return f"{parts.path}?{urlencode(sorted(pairs))}" if pairs else parts.path
+
+
+class _RecordedResponse:
+    """Pass-through response that hands its body to the recorder once read."""
+
+    def __init__(self, recorder: RecordingSession, key: str, origin: str, resp: Any, started: float) -> None:
+        self._recorder = recorder
+        self._key = key
+        self._origin = origin
+        self._resp = resp
+        self._started = started
+        self.status = resp.status
+        self.headers = resp.headers
+
+    async def read(self) -> bytes:
+        body = await self._resp.read()
+        self._recorder.add(self._key, self._origin, self._resp, body, self._started)
+        return body
+
+    async def text(self) -> str:
+        text = await self._resp.text()
+        self._recorder.add(self._key, self._origin, self._resp, text.encode(), self._started)
+        return text
+
+
+class RecordingSession:
+    """ClientSession wrapper that keeps a sanitized copy of every response."""
+
+    def __init__(self, inner: Any) -> None:
+        self.inner = inner
+        self.interactions: list[dict[str, Any]] = []
+        self.started_at = datetime.now(timezone.utc)
+
+    def get(self, url: Any, params: Mapping[str, Any] | None = None, **kwargs: Any):
+        return self._get(url, params, **kwargs)
+
+    @asynccontextmanager
+    async def _get(self, url: Any, params: Mapping[str, Any] | None, **kwargs: Any) -> AsyncIterator[Any]:
+        started = time.monotonic()
+        parts = urlsplit(str(url))
+        async with self.inner.get(url, params=params, **kwargs) as resp:
+            yield _RecordedResponse(self, request_key(url, params), f"{parts.scheme}://{parts.netloc}", resp, started)
+
+    def add(self, key: str, origin: str, resp: Any, body: bytes, started: float) -> None:
+        headers = {h: resp.headers.get(h) for h in _KEPT_HEADERS if resp.headers.get(h) is not None}
+        if "Link" in headers:
+            headers["Link"] = _anonymize_links(headers["Link"])
+        item: dict[str, Any] = {
+            "key": key,
+            "status": resp.status,
+            "headers": headers,
+            "latency_ms": round((time.monotonic() - started) * 1000, 1),
+        }
+        try:
+            item["json"] = scrub(json.loads(body), origin) if body.strip() else None
+        except ValueError:
+            # Error pages and other non-JSON bodies: keep a short, secret-free excerpt
+            excerpt = body[:500].decode(errors="replace").replace(origin, CASSETTE_BASE_URL)
+            item["text"] = _SECRET_IN_TEXT.sub(r"\1=redacted", excerpt)
+        self.interactions.append(item)
+
+    def as_cassette(self) -> dict[str, Any]:
+        return {
+            "version": CASSETTE_VERSION,
+            "recorded_at": self.started_at.isoformat(),
+            "base_url": CASSETTE_BASE_URL,
+            "interactions": list(self.interactions),
+        }
+
+    def save(self, path: str) -> None:
+        """Write the cassette as JSON (blocking; run in the executor)."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.as_cassette(), fh)
+
+
+def load_cassette(path: str) -> dict[str, Any]:
+    """Read a cassette file (blocking)."""
+    with open(path, encoding="utf-8") as fh:
+        cassette = json.load(fh)
+    if cassette.get("version") != CASSETTE_VERSION:
+        raise ValueError(f"Unsupported cassette version {cassette.get('version')!r} in {path}")
+    return cassette
+
+
+class _ReplayResponse:
+    def __init__(self, status: int, headers: dict[str, str], body: bytes) -> None:
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self) -> str:
+        return self._body.decode()
+
+
+class ReplaySession:
+    """ClientSession stand-in that serves a cassette.
+
+    Repeated requests for the same key get the recorded responses in order and
+    then keep getting the last one, so any number of refresh cycles can run.
+    Requests that are not in the cassette get a 404 and are listed in `misses`.
+    """
+
+    def __init__(self, cassette: Mapping[str, Any], latency_s: float = 0.0, recorded_latency: bool = False) -> None:
+        self._latency_s = max(0.0, float(latency_s))
+        self._recorded_latency = recorded_latency
+        self._responses: dict[str, list[tuple[int, dict[str, str], bytes, float]]] = {}
+        for item in cassette.get("interactions") or []:
+            body = json.dumps(item["json"]).encode() if "json" in item else str(item.get("text") or "").encode()
+            self._responses.setdefault(item["key"], []).append(
+                (int(item["status"]), dict(item.get("headers") or {}), body, float(item.get("latency_ms") or 0.0))
+            )
+        self._served: dict[str, int] = {}
+        self.requests = 0
+        self.misses: list[str] = []
+
+    def get(self, url: Any, params: Mapping[str, Any] | None = None, **_: Any):
+        return self._get(url, params)
+
+    @asynccontextmanager
+    async def _get(self, url: Any, params: Mapping[str, Any] | None) -> AsyncIterator[_ReplayResponse]:
+        key = request_key(url, params)
+        self.requests += 1
+        recorded = self._responses.get(key)
+        if not recorded:
+            self.misses.append(key)
+            yield _ReplayResponse(404, {}, b'{"errors":[{"message":"not in cassette"}]}')
+            return
+        index = self._served.get(key, 0)
+        self._served[key] = index + 1
+        status, headers, body, latency_ms = recorded[min(index, len(recorded) - 1)]
+        delay = self._latency_s + (latency_ms / 1000 if self._recorded_latency else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        yield _ReplayResponse(status, headers, body)
@@ -22,13 +22,21 @@ from .const import (
     CONF_ACCESS_TOKEN,
     CONF_SCHOOL_NAME,
     CONF_STUDENT_NAME,
+    CONF_OBSERVER,
+    CONF_OBSERVEES,
     OPT_HIDE_EMPTY,
     OPT_DAYS_AHEAD,
     OPT_ANN_DAYS,
     OPT_MISS_LOOKBACK,
     OPT_UPDATE_MINUTES,
+    OPT_ATTRIBUTES_COUNTS_ONLY,
+    OPT_ADAPTIVE_POLLING,
+    OPT_MIN_UPDATE_MINUTES,
+    OPT_MAX_UPDATE_MINUTES,
     OPT_ENABLE_GPA,
     OPT_GPA_SCALE,
+    OPT_GPA_WEIGHTS_MAP,
+    OPT_GPA_CUSTOM_SCALE,
     OPT_CREDITS_MAP,
     OPT_COURSE_END_DATES_MAP,
     OPT_HIDE_COURSES,
@@ -37,10 +45,16 @@ from .const import (
     DEFAULT_ANNOUNCEMENT_DAYS,
     DEFAULT_MISSING_LOOKBACK,
     DEFAULT_UPDATE_MINUTES,
+    DEFAULT_ATTRIBUTES_COUNTS_ONLY,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_MIN_UPDATE_MINUTES,
+    DEFAULT_MAX_UPDATE_MINUTES,
     DEFAULT_ENABLE_GPA,
     DEFAULT_GPA_SCALE,
 )
-from .simple_client import CanvasClient, CanvasApiError
+from .gpa import validate_custom_scale
+# The client and coordinator are imported where the flow needs them: HA preloads this
+# module at boot, and loading them here would pull the whole runtime in with it.
 
 
 def _validate_yyyy_mm_dd(value: str) -> str:
@@ -59,34 +73,54 @@ class CanvasStudentConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors: Dict[str, str] = {}
 
         if user_input is not None:
+            from .simple_client import CanvasApiError, CanvasClient, CanvasTransientError
+
             base_url = (user_input.get(CONF_BASE_URL) or "").strip().rstrip("/")
             token = (user_input.get(CONF_ACCESS_TOKEN) or "").strip()
             school = (user_input.get(CONF_SCHOOL_NAME) or "").strip()
             student = (user_input.get(CONF_STUDENT_NAME) or "").strip()
+            observer = bool(user_input.get(CONF_OBSERVER))
+            observees: list[dict[str, str]] = []
 
             # Validate credentials
             try:
                 session = async_get_clientsession(self.hass)
                 client = CanvasClient(base_url, token, session=session)
-                await client.get_user_self()
+                await client.get_users_self()
+                if observer:
+                    observees = [
+                        {"id": str(o["id"]), "name": o.get("short_name") or o.get("name") or str(o["id"])}
+                        for o in await client.list_observees()
+                        if o.get("id") is not None
+                    ]
+                    if not observees:
+                        errors["base"] = "no_observees"
+            except CanvasTransientError:
+                # Timeouts, 5xx and rate limiting are not credential problems
+                errors["base"] = "cannot_connect"
             except CanvasApiError:
                 errors["base"] = "auth"
             except Exception:
                 errors["base"] = "cannot_connect"
 
             if not errors:
-                # One entry per (base_url + student + school) combo
-                await self.async_set_unique_id(f"{base_url}|{school}|{student}")
+                # One entry per (base_url + student + school) combo; an observer entry covers all its students
+                await self.async_set_unique_id(f"{base_url}|{school}|{'observer' if observer else student}")
                 self._abort_if_unique_id_configured()
 
+                data = {
+                    CONF_BASE_URL: base_url,
+                    CONF_ACCESS_TOKEN: token,
+                    CONF_SCHOOL_NAME: school,
+                    CONF_STUDENT_NAME: student,
+                }
+                if observer:
+                    data[CONF_OBSERVER] = True
+                    data[CONF_OBSERVEES] = observees
+
                 return self.async_create_entry(
-                    title=f"{school} - {student or 'Student'}",
-                    data={
-                        CONF_BASE_URL: base_url,
-                        CONF_ACCESS_TOKEN: token,
-                        CONF_SCHOOL_NAME: school,
-                        CONF_STUDENT_NAME: student,
-                    },
+                    title=f"{school} - {'Observer' if observer else student or 'Student'}",
+                    data=data,
                     options={},
                 )
 
@@ -96,6 +130,7 @@ class CanvasStudentConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Required(CONF_ACCESS_TOKEN): str,
                 vol.Required(CONF_SCHOOL_NAME): str,
                 vol.Optional(CONF_STUDENT_NAME, default="Student"): str,
+                vol.Optional(CONF_OBSERVER, default=False): bool,
             }
         )
 
@@ -112,36 +147,36 @@ class CanvasStudentOptionsFlow(config_entries.OptionsFlowWithConfigEntry):
 
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
         super().__init__(config_entry)
-        self._courses: list[dict[str, Any]] = []
+        self._courses_loaded = False
         self._key_to_cid: dict[str, str] = {}
+        self._cid_to_key_map: dict[str, str] = {}
 
     async def _ensure_courses_loaded(self) -> None:
-        if self._courses:
+        if self._courses_loaded:
             return
-        base_url = self.config_entry.data.get(CONF_BASE_URL)
-        token = self.config_entry.data.get(CONF_ACCESS_TOKEN)
-        session = async_get_clientsession(self.hass)
-        client = CanvasClient(base_url, token, session=session)
-        courses = await client.list_courses()
-        # Build stable mapping for UI: "Course Name (12345)" -> "12345"
-        key_to_cid: dict[str, str] = {}
-        for c in courses:
-            cid = str(c.get("id"))
-            name = c.get("name") or c.get("course_code") or cid
-            key = f"{name} ({cid})"
-            # Avoid collisions if Canvas returns duplicates
-            if key in key_to_cid and key_to_cid[key] != cid:
-                key = f"{name} ({cid})"
-            key_to_cid[key] = cid
-        self._courses = courses
-        self._key_to_cid = key_to_cid
+        # Prefer the running coordinator's course index; only hit Canvas when there is none
+        entry_data = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id) or {}
+        coords = [c for c in entry_data.get("coordinators") or [] if c.course_key_to_id]
+        if coords:
+            # Observer entries: the union of every observed student's courses
+            for coord in coords:
+                self._key_to_cid.update(coord.course_key_to_id)
+                self._cid_to_key_map.update(coord.course_id_to_key)
+        else:
+            from .coordinator import course_key_maps
+            from .simple_client import CanvasClient
+
+            base_url = self.config_entry.data.get(CONF_BASE_URL)
+            token = self.config_entry.data.get(CONF_ACCESS_TOKEN)
+            session = async_get_clientsession(self.hass)
+            client = CanvasClient(base_url, token, session=session)
+            courses = await client.list_courses()
+            # Stable mapping for UI: "Course Name (12345)" <-> "12345"
+            self._key_to_cid, self._cid_to_key_map = course_key_maps(courses or [])
+        self._courses_loaded = True
 
     def _cid_to_key(self, cid: str) -> str | None:
-        cid = str(cid)
-        for k, v in self._key_to_cid.items():
-            if v == cid:
-                return k
-        return None
+        return self._cid_to_key_map.get(str(cid))
 
     async def async_step_init(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
         await self._ensure_courses_loaded()
@@ -155,11 +190,19 @@ class CanvasStudentOptionsFlow(config_entries.OptionsFlowWithConfigEntry):
         ann_default = int(cur.get(OPT_ANN_DAYS, DEFAULT_ANNOUNCEMENT_DAYS))
         miss_default = int(cur.get(OPT_MISS_LOOKBACK, DEFAULT_MISSING_LOOKBACK))
         upd_default = int(cur.get(OPT_UPDATE_MINUTES, DEFAULT_UPDATE_MINUTES))
+        counts_only_default = bool(cur.get(OPT_ATTRIBUTES_COUNTS_ONLY, DEFAULT_ATTRIBUTES_COUNTS_ONLY))
+        adaptive_default = bool(cur.get(OPT_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING))
+        upd_min_default = int(cur.get(OPT_MIN_UPDATE_MINUTES, DEFAULT_MIN_UPDATE_MINUTES))
+        upd_max_default = int(cur.get(OPT_MAX_UPDATE_MINUTES, DEFAULT_MAX_UPDATE_MINUTES))
         enable_gpa_default = bool(cur.get(OPT_ENABLE_GPA, DEFAULT_ENABLE_GPA))
         gpa_scale_default = cur.get(OPT_GPA_SCALE, DEFAULT_GPA_SCALE)
 
         credits_default_raw = cur.get(OPT_CREDITS_MAP, {})
         credits_default_text = json.dumps(credits_default_raw, indent=2) if isinstance(credits_default_raw, dict) else str(credits_default_raw or "{}")
+        weights_default_raw = cur.get(OPT_GPA_WEIGHTS_MAP, {})
+        weights_default_text = json.dumps(weights_default_raw, indent=2) if isinstance(weights_default_raw, dict) else "{}"
+        custom_scale_raw = cur.get(OPT_GPA_CUSTOM_SCALE)
+        custom_scale_default_text = json.dumps(custom_scale_raw, indent=2) if isinstance(custom_scale_raw, dict) else ""
 
         end_dates_map = cur.get(OPT_COURSE_END_DATES_MAP, {})
         if not isinstance(end_dates_map, dict):
@@ -195,6 +238,10 @@ class CanvasStudentOptionsFlow(config_entries.OptionsFlowWithConfigEntry):
             new_opts[OPT_ANN_DAYS] = int(user_input.get(OPT_ANN_DAYS))
             new_opts[OPT_MISS_LOOKBACK] = int(user_input.get(OPT_MISS_LOOKBACK))
             new_opts[OPT_UPDATE_MINUTES] = int(user_input.get(OPT_UPDATE_MINUTES))
+            new_opts[OPT_ATTRIBUTES_COUNTS_ONLY] = bool(user_input.get(OPT_ATTRIBUTES_COUNTS_ONLY))
+            new_opts[OPT_ADAPTIVE_POLLING] = bool(user_input.get(OPT_ADAPTIVE_POLLING))
+            new_opts[OPT_MIN_UPDATE_MINUTES] = int(user_input.get(OPT_MIN_UPDATE_MINUTES))
+            new_opts[OPT_MAX_UPDATE_MINUTES] = int(user_input.get(OPT_MAX_UPDATE_MINUTES))
             new_opts[OPT_ENABLE_GPA] = bool(user_input.get(OPT_ENABLE_GPA))
             new_opts[OPT_GPA_SCALE] = user_input.get(OPT_GPA_SCALE)
 
@@ -207,6 +254,30 @@ class CanvasStudentOptionsFlow(config_entries.OptionsFlowWithConfigEntry):
                 new_opts[OPT_CREDITS_MAP] = parsed
             except Exception:
                 errors["credits_map_text"] = "invalid_json"
+
+            # Weighting category per course, e.g. {"12345": "honors", "67890": "ap"}
+            weights_text = (user_input.get("gpa_weights_text") or "").strip()
+            try:
+                parsed = json.loads(weights_text or "{}")
+                if not isinstance(parsed, dict):
+                    raise ValueError("not dict")
+                new_opts[OPT_GPA_WEIGHTS_MAP] = {str(k): str(v).strip().lower() for k, v in parsed.items() if v}
+            except Exception:
+                errors["gpa_weights_text"] = "invalid_json"
+
+            # Custom scale table; only used when the scale is "custom"
+            custom_text = (user_input.get("gpa_custom_scale_text") or "").strip()
+            if not custom_text:
+                new_opts.pop(OPT_GPA_CUSTOM_SCALE, None)
+            else:
+                try:
+                    parsed = json.loads(custom_text)
+                    validate_custom_scale(parsed)
+                    new_opts[OPT_GPA_CUSTOM_SCALE] = parsed
+                except ValueError:
+                    errors["gpa_custom_scale_text"] = "invalid_gpa_scale"
+
+            if errors:
                 return self.async_show_form(
                     step_id="init",
                     data_schema=self._schema_init(
@@ -215,9 +286,15 @@ class CanvasStudentOptionsFlow(config_entries.OptionsFlowWithConfigEntry):
                         ann_default,
                         miss_default,
                         upd_default,
+                        counts_only_default,
+                        adaptive_default,
+                        upd_min_default,
+                        upd_max_default,
                         enable_gpa_default,
                         gpa_scale_default,
                         credits_default_text,
+                        weights_default_text,
+                        custom_scale_default_text,
                         hide_keys_default,
                         actions,
                     ),
@@ -257,9 +334,15 @@ class CanvasStudentOptionsFlow(config_entries.OptionsFlowWithConfigEntry):
                 ann_default,
                 miss_default,
                 upd_default,
+                counts_only_default,
+                adaptive_default,
+                upd_min_default,
+                upd_max_default,
                 enable_gpa_default,
                 gpa_scale_default,
                 credits_default_text,
+                weights_default_text,
+                custom_scale_default_text,
                 hide_keys_default,
                 actions,
             ),
@@ -273,9 +356,15 @@ class CanvasStudentOptionsFlow(config_entries.OptionsFlowWithConfigEntry):
         ann_default: int,
         miss_default: int,
         upd_default: int,
+        counts_only_default: bool,
+        adaptive_default: bool,
+        upd_min_default: int,
+        upd_max_default: int,
         enable_gpa_default: bool,
         gpa_scale_default: str,
         credits_default_text: str,
+        weights_default_text: str,
+        custom_scale_default_text: str,
         hide_keys_default: list[str],
         actions: dict[str, str],
     ) -> vol.Schema:
@@ -293,9 +382,15 @@ class CanvasStudentOptionsFlow(config_entries.OptionsFlowWithConfigEntry):
                 vol.Optional(OPT_ANN_DAYS, default=ann_default): int,
                 vol.Optional(OPT_MISS_LOOKBACK, default=miss_default): int,
                 vol.Optional(OPT_UPDATE_MINUTES, default=upd_default): int,
+                vol.Optional(OPT_ATTRIBUTES_COUNTS_ONLY, default=counts_only_default): bool,
+                vol.Optional(OPT_ADAPTIVE_POLLING, default=adaptive_default): bool,
+                vol.Optional(OPT_MIN_UPDATE_MINUTES, default=upd_min_default): int,
+                vol.Optional(OPT_MAX_UPDATE_MINUTES, default=upd_max_default): int,
                 vol.Optional(OPT_ENABLE_GPA, default=enable_gpa_default): bool,
                 vol.Optional(OPT_GPA_SCALE, default=gpa_scale_default): str,
                 vol.Optional("credits_map_text", default=credits_default_text): str,
+                vol.Optional("gpa_weights_text", default=weights_default_text): str,
+                vol.Optional("gpa_custom_scale_text", default=custom_scale_default_text): str,
             }
         )
 
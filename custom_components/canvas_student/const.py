@@ -8,6 +8,10 @@ CONF_ACCESS_TOKEN = "access_token"
 CONF_SCHOOL_NAME = "school_name"
 CONF_STUDENT_NAME = "student_name"
 
+# Observer mode: one observer token, one entry, one coordinator per observed student
+CONF_OBSERVER = "observer_mode"
+CONF_OBSERVEES = "observees"
+
 # Options keys
 OPT_HIDE_EMPTY = "hide_empty"
 OPT_DAYS_AHEAD = "days_ahead"
@@ -15,9 +19,20 @@ OPT_ANN_DAYS = "announcement_days"
 OPT_MISS_LOOKBACK = "missing_lookback"
 OPT_UPDATE_MINUTES = "update_interval_minutes"
 
+# Sensor attributes hold only counts; details come from the websocket API
+OPT_ATTRIBUTES_COUNTS_ONLY = "attributes_counts_only"
+
+# Adaptive polling: shorten the interval near due dates, back off when quiet
+OPT_ADAPTIVE_POLLING = "adaptive_polling"
+OPT_MIN_UPDATE_MINUTES = "min_update_interval_minutes"
+OPT_MAX_UPDATE_MINUTES = "max_update_interval_minutes"
+
 OPT_ENABLE_GPA = "enable_gpa"
 OPT_GPA_SCALE = "gpa_scale"
 OPT_CREDITS_MAP = "credits_by_course"
+# GPA weighting category per course ({"123": "honors"}) and a user-defined scale table
+OPT_GPA_WEIGHTS_MAP = "gpa_weights_by_course"
+OPT_GPA_CUSTOM_SCALE = "gpa_custom_scale"
 
 # NEW: per-course end dates (YYYY-MM-DD) used as effective due dates for undated assignments
 OPT_COURSE_END_DATES_MAP = "course_end_dates_by_course"
@@ -32,14 +47,130 @@ DEFAULT_ANNOUNCEMENT_DAYS = 14
 DEFAULT_MISSING_LOOKBACK = 180
 DEFAULT_UPDATE_MINUTES = 10
 
+DEFAULT_ATTRIBUTES_COUNTS_ONLY = False
+DEFAULT_ADAPTIVE_POLLING = False
+DEFAULT_MIN_UPDATE_MINUTES = 5
+DEFAULT_MAX_UPDATE_MINUTES = 120
+
+# Adaptive polling tuning (local hours; quiet window wraps midnight)
+QUIET_HOURS_START = 23
+QUIET_HOURS_END = 6
+DUE_SOON_MINUTES = 60
+DUE_TODAY_HOURS = 6
+MAX_UNCHANGED_BACKOFF_STEPS = 4
+
 DEFAULT_ENABLE_GPA = False
 DEFAULT_GPA_SCALE = "us_4_0_plusminus"
 
+# Change-detection probe: a full crawl is forced at least this often even when
+# the probe reports no activity.
+FULL_REFRESH_MAX_AGE_MINUTES = 60
+
+# Domain-wide refresh orchestration
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+MAX_CONCURRENT_REFRESHES = 2
+DATA_AGGREGATE = f"{DOMAIN}_aggregate"
+
+# Runtime instrumentation (see metrics.py)
+DATA_METRICS = f"{DOMAIN}_metrics"
+LOOP_LAG_INTERVAL_SECONDS = 1.0
+LOOP_LAG_SAMPLES = 600
+STATE_WRITE_WINDOW_SECONDS = 300
+
+# Sections accepted by the canvas_student.refresh service
+SERVICE_REFRESH = "refresh"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_COURSE_ID = "course_id"
+ATTR_SECTIONS = "sections"
+REFRESH_SECTIONS = ("grades", "assignments", "missing", "ungraded", "announcements")
+
+# Observer mode: shared responses are reused by sibling students for this long,
+# and all students share one concurrent-request budget.
+OBSERVER_SHARED_TTL_SECONDS = 120
+OBSERVER_MAX_CONCURRENT_REQUESTS = 4
+
+# Client request scheduling. Lower priority values run first; each class has
+# its own concurrency cap and maximum queue wait (seconds) before the request
+# is deferred to the next refresh. Once Canvas' X-Rate-Limit-Remaining bucket
+# drops below a class's reserve, new requests of that class are deferred.
+PRIORITY_HIGH = 0  # course list, grades, assignment lists, change probe
+PRIORITY_NORMAL = 1  # recent submission checks, awaiting grading
+PRIORITY_LOW = 2  # announcements, historical missing-work checks
+REQUEST_MAX_CONCURRENT = 6
+REQUEST_CLASS_LIMITS = {PRIORITY_HIGH: 6, PRIORITY_NORMAL: 4, PRIORITY_LOW: 2}
+REQUEST_CLASS_DEADLINES = {PRIORITY_HIGH: 60, PRIORITY_NORMAL: 30, PRIORITY_LOW: 15}
+RATE_LIMIT_RESERVE = {PRIORITY_NORMAL: 50.0, PRIORITY_LOW: 200.0}
+# Each request (page) may take this long once it leaves the queue; a whole
+# refresh may take this long before unfinished sections fall back to the
+# last good data.
+REQUEST_TIMEOUT_SECONDS = 30
+REFRESH_DEADLINE_SECONDS = 120
+# Submission checks for work due longer ago than this are low priority
+HISTORICAL_SUBMISSION_DAYS = 14
+
+# Concluded courses (term / course / configured end date passed, plus a grace
+# period for late grades) are served from a frozen snapshot that is re-crawled
+# only this often.
+CONCLUDED_GRACE_DAYS = 7
+CONCLUDED_REFRESH_HOURS = 24
+
+# Persistent submission-state cache (see submission_cache.py). Graded work
+# almost never changes; unsubmitted work close to its due date is re-checked
+# on practically every refresh.
+SUBMISSION_CACHE_VERSION = 1
+SUBMISSION_CACHE_SAVE_DELAY = 30
+SUBMISSION_TTL_GRADED_HOURS = 168
+SUBMISSION_TTL_SUBMITTED_HOURS = 24
+SUBMISSION_TTL_UNSUBMITTED_MINUTES = 360
+SUBMISSION_TTL_UNSUBMITTED_RECENT_MINUTES = 10
+SUBMISSION_RECENT_DAYS = 3
+
+# Work that would stall the event loop runs in the executor: response bodies
+# at least this large are decoded there, and views are built there once the
+# snapshot holds this many assignments/submission states/announcements.
+# Smaller payloads stay inline; the thread handoff would cost more.
+JSON_EXECUTOR_MIN_BYTES = 256 * 1024
+VIEW_EXECUTOR_MIN_ITEMS = 2000
+
+# Diagnostics traces (see tracing.py): last requests per client, last
+# refresh cycles per coordinator
+REQUEST_TRACE_SIZE = 200
+REFRESH_TRACE_CYCLES = 5
+
+# Record/replay of Canvas traffic (see cassette.py). Captured cassettes go to
+# <config>/canvas_student_cassettes; recorded URLs point at a placeholder host.
+SERVICE_CAPTURE_CASSETTE = "capture_cassette"
+CASSETTE_DIR = "canvas_student_cassettes"
+CASSETTE_VERSION = 1
+CASSETTE_BASE_URL = "https://canvas.invalid"
+
+# Grade history (see grade_history.py): a row per score change, one row per
+# day after GRADE_HISTORY_FULL_DAYS, nothing (but a baseline) after
+# GRADE_HISTORY_MAX_DAYS. Smaller 7-day moves count as a flat trend.
+GRADE_HISTORY_VERSION = 1
+GRADE_HISTORY_SAVE_DELAY = 60
+GRADE_HISTORY_FULL_DAYS = 30
+GRADE_HISTORY_MAX_DAYS = 400
+GRADE_TREND_MIN_DELTA = 0.5
+
+# Importing the package (and what it loads eagerly) should stay under this;
+# a warning is logged at setup otherwise
+IMPORT_BUDGET_MS = 250
+
+# Calendar: due-date events end at the due time and last this long
+CALENDAR_EVENT_MINUTES = 15
+
 # Canvas API paths
 API_PREFIX = "/api/v1"
 PATH_USERS_SELF = API_PREFIX + "/users/self"
+PATH_ACTIVITY_SUMMARY = API_PREFIX + "/users/self/activity_stream/summary"
+PATH_TODO_COUNT = API_PREFIX + "/users/self/todo_item_count"
 PATH_COURSES = API_PREFIX + "/courses"
+PATH_OBSERVEES = API_PREFIX + "/users/self/observees"
+PATH_USER_COURSES = API_PREFIX + "/users/{user_id}/courses"
+PATH_USER_ENROLLMENTS = API_PREFIX + "/users/{user_id}/enrollments"
 PATH_ASSIGNMENTS = API_PREFIX + "/courses/{course_id}/assignments"
 PATH_SUBMISSIONS_SELF = API_PREFIX + "/courses/{course_id}/assignments/{assignment_id}/submissions/self"
 PATH_ANNOUNCEMENTS = API_PREFIX + "/announcements"
+PATH_SUBMISSIONS_LIST = API_PREFIX + "/courses/{course_id}/students/submissions"
 PATH_ENROLLMENTS = API_PREFIX + "/courses/{course_id}/enrollments"
@@ -1,87 +1,549 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
+import time
+from collections import deque
 from datetime import datetime, timedelta, timezone, time as dtime
-from typing import Any
+from functools import lru_cache
+from typing import Any, Iterable, Mapping
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
 from .const import (
+    CONF_ACCESS_TOKEN,
     CONF_BASE_URL,
+    CONF_OBSERVEES,
+    CONF_OBSERVER,
+    CONF_SCHOOL_NAME,
+    CONF_STUDENT_NAME,
+    CONCLUDED_GRACE_DAYS,
+    CONCLUDED_REFRESH_HOURS,
+    DEFAULT_ADAPTIVE_POLLING,
     DEFAULT_ANNOUNCEMENT_DAYS,
     DEFAULT_DAYS_AHEAD,
     DEFAULT_ENABLE_GPA,
     DEFAULT_GPA_SCALE,
     DEFAULT_HIDE_EMPTY,
+    DEFAULT_MAX_UPDATE_MINUTES,
+    DEFAULT_MIN_UPDATE_MINUTES,
     DEFAULT_MISSING_LOOKBACK,
     DEFAULT_UPDATE_MINUTES,
+    DUE_SOON_MINUTES,
+    DUE_TODAY_HOURS,
+    FULL_REFRESH_MAX_AGE_MINUTES,
+    HISTORICAL_SUBMISSION_DAYS,
+    MAX_UNCHANGED_BACKOFF_STEPS,
+    OPT_ADAPTIVE_POLLING,
     OPT_ANN_DAYS,
     OPT_COURSE_END_DATES_MAP,
     OPT_CREDITS_MAP,
     OPT_DAYS_AHEAD,
     OPT_ENABLE_GPA,
+    OPT_GPA_CUSTOM_SCALE,
     OPT_GPA_SCALE,
+    OPT_GPA_WEIGHTS_MAP,
     OPT_HIDE_COURSES,
     OPT_HIDE_EMPTY,
+    OPT_MAX_UPDATE_MINUTES,
+    OPT_MIN_UPDATE_MINUTES,
     OPT_MISS_LOOKBACK,
     OPT_UPDATE_MINUTES,
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    QUIET_HOURS_END,
+    QUIET_HOURS_START,
+    REFRESH_DEADLINE_SECONDS,
+    REFRESH_SECTIONS,
+    REFRESH_TRACE_CYCLES,
+    VIEW_EXECUTOR_MIN_ITEMS,
 )
-from .simple_client import CanvasClient
+from .gpa import compute_gpa, gpa_inputs, resolve_scale
+from .request_queue import CanvasRequestDeferred, priority
+from .scheduler import RefreshScheduler
+from .shared_views import SharedViews
+from .grade_history import GradeHistory
+from .submission_cache import SubmissionCache
+from .simple_client import CanvasClient, CanvasTransientError
+from .tracing import CycleTimer
 
 _LOGGER = logging.getLogger(__name__)
 
+# Failures after which a section keeps its last good data instead of being emptied
+_STALE_ERRORS = (CanvasRequestDeferred, CanvasTransientError)
 
-def _letter_from_score(score: float) -> str:
-    # Simple default; you can tweak if you want +/- mapping later.
-    if score >= 93:
-        return "A"
-    if score >= 90:
-        return "A-"
-    if score >= 87:
-        return "B+"
-    if score >= 83:
-        return "B"
-    if score >= 80:
-        return "B-"
-    if score >= 77:
-        return "C+"
-    if score >= 73:
-        return "C"
-    if score >= 70:
-        return "C-"
-    if score >= 67:
-        return "D+"
-    if score >= 63:
-        return "D"
-    if score >= 60:
-        return "D-"
-    return "F"
-
-
-def _grade_points(letter: str) -> float | None:
-    if not letter:
-        return None
-    l = letter.strip().upper()
-    table = {
-        "A+": 4.0, "A": 4.0, "A-": 3.7,
-        "B+": 3.3, "B": 3.0, "B-": 2.7,
-        "C+": 2.3, "C": 2.0, "C-": 1.7,
-        "D+": 1.3, "D": 1.0, "D-": 0.7,
-        "F": 0.0,
+# Per-course raw sections and the freshness key that covers them ("upcoming" comes with "assignments")
+_COURSE_SECTIONS = (
+    ("grades", "grades"),
+    ("assignments", "assignments"),
+    ("upcoming", "assignments"),
+    ("submissions", "submissions"),
+    ("ungraded", "ungraded"),
+)
+FRESHNESS_SECTIONS = ("courses", "grades", "assignments", "submissions", "ungraded", "announcements")
+
+
+@lru_cache(maxsize=4096)
+def _parse_dt(value: str) -> datetime | None:
+    """Parse a Canvas timestamp to an aware UTC-comparable datetime (memoized)."""
+    dt = dt_util.parse_datetime(value)
+    if dt is not None and dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _parse_options(options: Mapping[str, Any]) -> dict[str, Any]:
+    """Normalize entry options into the values the fetch and view stages use."""
+    hide_empty = bool(options.get(OPT_HIDE_EMPTY, DEFAULT_HIDE_EMPTY))
+    days_ahead = int(options.get(OPT_DAYS_AHEAD, DEFAULT_DAYS_AHEAD))
+    ann_days = int(options.get(OPT_ANN_DAYS, DEFAULT_ANNOUNCEMENT_DAYS))
+    miss_lookback_days = int(options.get(OPT_MISS_LOOKBACK, DEFAULT_MISSING_LOOKBACK))
+
+    enable_gpa = bool(options.get(OPT_ENABLE_GPA, DEFAULT_ENABLE_GPA))
+    gpa_scale_raw = options.get(OPT_GPA_SCALE, DEFAULT_GPA_SCALE)
+
+    # Preset name ("us_4_0_plusminus", "us_4_0_weighted"), "custom", or a numeric maximum (e.g. 5.0)
+    custom_scale = options.get(OPT_GPA_CUSTOM_SCALE)
+    gpa_scale = resolve_scale(gpa_scale_raw, custom_scale if isinstance(custom_scale, dict) else None)
+
+    # credits map: { "course_id": credits_float }
+    credits_raw = (options.get(OPT_CREDITS_MAP, {}) or {})
+    credits_map: dict[str, float] = {}
+    if isinstance(credits_raw, dict):
+        for k, v in credits_raw.items():
+            try:
+                if v is None:
+                    continue
+                credits_map[str(k)] = float(v)
+            except Exception:
+                continue
+
+    # weighting categories: { "course_id": "honors" | "ap" | ... }
+    weights_raw = (options.get(OPT_GPA_WEIGHTS_MAP, {}) or {})
+    weights_map: dict[str, str] = {}
+    if isinstance(weights_raw, dict):
+        weights_map = {str(k): str(v).strip().lower() for k, v in weights_raw.items() if v and str(v).strip()}
+
+    # hide courses list: ["17100","35804"] or [17100,35804]
+    hide_courses_raw = (options.get(OPT_HIDE_COURSES, []) or [])
+    hide_courses: set[str] = set()
+    if isinstance(hide_courses_raw, list):
+        hide_courses = {str(x) for x in hide_courses_raw if str(x).strip()}
+
+    # end dates map: { "176": "2026-02-14" }
+    end_dates_raw = (options.get(OPT_COURSE_END_DATES_MAP, {}) or {})
+    end_dates_map: dict[str, str] = {}
+    if isinstance(end_dates_raw, dict):
+        for k, v in end_dates_raw.items():
+            cid_k = str(k)
+            ds = str(v).strip()
+            if not ds:
+                continue
+            try:
+                d = datetime.strptime(ds, "%Y-%m-%d").date()
+                local_dt = datetime.combine(d, dtime(23, 59, 59), tzinfo=dt_util.DEFAULT_TIME_ZONE)
+                end_dates_map[cid_k] = local_dt.astimezone(timezone.utc).isoformat()
+            except Exception:
+                # Ignore bad values quietly
+                continue
+
+    return {
+        "hide_empty": hide_empty,
+        "days_ahead": days_ahead,
+        "ann_days": ann_days,
+        "miss_lookback_days": miss_lookback_days,
+        "enable_gpa": enable_gpa,
+        "gpa_scale": gpa_scale,
+        "credits_map": credits_map,
+        "weights_map": weights_map,
+        "hide_courses": hide_courses,
+        "end_dates_map": end_dates_map,
+    }
+
+
+def course_key_maps(courses: list[dict[str, Any]]) -> tuple[dict[str, str], dict[str, str]]:
+    """Build the options-flow course keys: ("Course Name (12345)" -> "12345", and the reverse)."""
+    key_to_cid: dict[str, str] = {}
+    cid_to_key: dict[str, str] = {}
+    for c in courses:
+        if c.get("id") is None:
+            continue
+        cid = str(c.get("id"))
+        name = c.get("name") or c.get("course_code") or cid
+        key = f"{name} ({cid})"
+        key_to_cid[key] = cid
+        cid_to_key[cid] = key
+    return key_to_cid, cid_to_key
+
+
+def course_end(course: dict[str, Any], end_dates_map: dict[str, str]) -> datetime | None:
+    """End of a course: the configured end date, else the course's end_at, else its term's end_at."""
+    term = course.get("term") or {}
+    for value in (end_dates_map.get(str(course.get("id"))), course.get("end_at"), term.get("end_at")):
+        if value and (dt := _parse_dt(value)) is not None:
+            return dt
+    return None
+
+
+def concluded_courses(courses: list[dict[str, Any]], end_dates_map: dict[str, str], now: datetime) -> set[str]:
+    """IDs of courses that ended more than CONCLUDED_GRACE_DAYS ago."""
+    grace = timedelta(days=CONCLUDED_GRACE_DAYS)
+    out: set[str] = set()
+    for c in courses:
+        if c.get("id") is None:
+            continue
+        end = course_end(c, end_dates_map)
+        if end is not None and end + grace < now:
+            out.add(str(c.get("id")))
+    return out
+
+
+def _effective_due(a: dict[str, Any], cid: str, end_dates_map: dict[str, str]) -> tuple[str | None, Any]:
+    """Return (due_at, due_source), falling back to the course end date for undated work."""
+    due = a.get("due_at")
+    due_source = a.get("due_source")
+    if not due:
+        eff = end_dates_map.get(cid)
+        if eff:
+            due = eff
+            due_source = "course_end"
+    return due, due_source
+
+
+def _announcements_for(items: Iterable[dict[str, Any]], course_ids: set[str]) -> list[dict[str, Any]]:
+    """Announcements of the given courses, plus those whose course could not be parsed.
+
+    Every announcement was requested for one of the entry's courses, so one without
+    a course ID is kept rather than silently dropped when falling back to old data.
+    """
+    return [a for a in items if a.get("course_id") is None or str(a.get("course_id")) in course_ids]
+
+
+def _is_submitted(sub: dict[str, Any]) -> bool:
+    return bool(sub.get("submitted_at")) or sub.get("workflow_state") in ("submitted", "graded")
+
+
+def build_views(raw: dict[str, Any], opts: dict[str, Any], now: datetime) -> dict[str, Any]:
+    """Build the coordinator data (what sensors read) from a raw snapshot.
+
+    Pure function of its inputs: no I/O, so it can be re-run whenever `now` or
+    the options change without touching Canvas.
+    """
+    base_url = raw.get("base_url") or ""
+    hide_courses: set[str] = opts["hide_courses"]
+    end_dates_map: dict[str, str] = opts["end_dates_map"]
+    credits_map: dict[str, float] = opts["credits_map"]
+
+    horizon = now + timedelta(days=opts["days_ahead"])
+    miss_floor = now - timedelta(days=opts["miss_lookback_days"])
+
+    # --- Courses ---
+    courses = [c for c in (raw.get("courses") or []) if str(c.get("id")) not in hide_courses]
+    course_ids = [str(c.get("id")) for c in courses if c.get("id") is not None]
+
+    course_names_by_id = {
+        str(c.get("id")): (c.get("name") or c.get("course_code") or str(c.get("id")))
+        for c in courses
+        if c.get("id") is not None
+    }
+    grade_urls_by_course = {
+        str(c.get("id")): f"{base_url}/courses/{c.get('id')}/grades"
+        for c in courses
+        if c.get("id") is not None and base_url
+    }
+
+    # --- Grades ---
+    raw_grades = raw.get("grades") or {}
+    grades_by_course = {cid: raw_grades[cid] for cid in course_ids if cid in raw_grades}
+
+    raw_upcoming = raw.get("upcoming") or {}
+    raw_assignments = raw.get("assignments") or {}
+    raw_submissions = raw.get("submissions") or {}
+
+    # --- Upcoming Assignments ---
+    assignments_by_course: dict[str, list[dict[str, Any]]] = {}
+    for cid in course_ids:
+        if cid not in raw_upcoming:
+            continue
+        up = raw_upcoming[cid]
+        used_upcoming_bucket = bool(up.get("from_bucket"))
+        trimmed: list[dict[str, Any]] = []
+
+        for a in up.get("items") or []:
+            due, due_source = _effective_due(a, cid, end_dates_map)
+
+            if not due:
+                # Include undated items ONLY when they came from the upcoming bucket.
+                # If we had to fall back to "all", including undated floods the list.
+                if used_upcoming_bucket:
+                    trimmed.append(
+                        {
+                            "id": a.get("id"),
+                            "name": a.get("name"),
+                            "due_at": None,
+                            "html_url": a.get("html_url"),
+                        }
+                    )
+                continue
+
+            dt = _parse_dt(due)
+            if dt and now <= dt <= horizon:
+                trimmed.append(
+                    {
+                        "id": a.get("id"),
+                        "name": a.get("name"),
+                        "due_at": due,
+                        "html_url": a.get("html_url"),
+                        "due_source": due_source,
+                    }
+                )
+
+        assignments_by_course[cid] = trimmed
+
+    # --- Missing Assignments / Undated outstanding ---
+    missing_by_course: dict[str, list[dict[str, Any]]] = {}
+    undated_outstanding_by_course: dict[str, list[dict[str, Any]]] = {}
+    for cid in course_ids:
+        subs = raw_submissions.get(cid) or {}
+        miss_list: list[dict[str, Any]] = []
+        out_list: list[dict[str, Any]] = []
+
+        for a in raw_assignments.get(cid) or []:
+            # Only assignments whose submission state was fetched can be judged;
+            # anything that crossed its due date since the last crawl waits for the next one.
+            sub = subs.get(str(a.get("id")))
+            if sub is None or _is_submitted(sub):
+                continue
+
+            due, due_source = _effective_due(a, cid, end_dates_map)
+            if not due:
+                # Only truly undated (no due_at) AND no course_end override in this view
+                out_list.append(
+                    {
+                        "id": a.get("id"),
+                        "name": a.get("name"),
+                        "due_at": None,
+                        "html_url": a.get("html_url"),
+                    }
+                )
+                continue
+
+            dt = _parse_dt(due)
+            # Only within lookback window and already due
+            if not dt or dt < miss_floor or dt > now:
+                continue
+
+            miss_list.append(
+                {
+                    "id": a.get("id"),
+                    "name": a.get("name"),
+                    "due_at": due,
+                    "html_url": a.get("html_url"),
+                    "due_source": due_source,
+                }
+            )
+
+        if miss_list:
+            missing_by_course[cid] = miss_list
+        if out_list:
+            undated_outstanding_by_course[cid] = out_list
+
+    # --- Awaiting Grading ---
+    raw_ungraded = raw.get("ungraded") or {}
+    ungraded_by_course = {cid: raw_ungraded[cid] for cid in course_ids if raw_ungraded.get(cid)}
+
+    # --- Announcements ---
+    visible = set(course_ids)
+    ann_floor = now - timedelta(days=opts["ann_days"])
+    announcements: list[dict[str, Any]] = []
+    for a in raw.get("announcements") or []:
+        if a.get("course_id") is not None and str(a.get("course_id")) not in visible:
+            continue
+        posted = _parse_dt(a["posted_at"]) if a.get("posted_at") else None
+        if posted is not None and posted < ann_floor:
+            continue
+        announcements.append(a)
+
+    # --- GPA ---
+    # Memoized on the per-course inputs: unchanged grades and credits cost one tuple build
+    gpa_scale = opts["gpa_scale"]
+    result = None
+    if opts["enable_gpa"]:
+        result = compute_gpa(gpa_scale, gpa_inputs(grades_by_course, credits_map, opts["weights_map"]))
+
+    options_applied = {
+        "hide_empty": opts["hide_empty"],
+        "days_ahead": opts["days_ahead"],
+        "announcement_days": opts["ann_days"],
+        "missing_lookback_days": opts["miss_lookback_days"],
+        "enable_gpa": opts["enable_gpa"],
+        "gpa_scale": gpa_scale.key,
+        "gpa_weighted_courses_count": len(opts["weights_map"]),
+        "hidden_courses_count": len(hide_courses),
+        "end_dates_count": len(end_dates_map),
+        "credits_count": len(credits_map),
+    }
+
+    return {
+        "course_names_by_id": course_names_by_id,
+        "grade_urls_by_course": grade_urls_by_course,
+        "grades_by_course": grades_by_course,
+        "assignments_by_course": assignments_by_course,
+        "missing_by_course": missing_by_course,
+        "ungraded_by_course": ungraded_by_course,
+        "undated_outstanding_by_course": undated_outstanding_by_course,
+        "announcements": announcements,
+        "credits_by_course": dict(result.credits_by_course) if result else {},
+        "grade_points_by_course": dict(result.points_by_course) if result else {},
+        "gpa": result.gpa if result else None,
+        "gpa_credits": result.credits if result else 0.0,
+        "gpa_quality_points": result.quality_points if result else 0.0,
+        "gpa_max_points": gpa_scale.max_points,
+        "options_applied": options_applied,
+        "courses_total": len(courses),
+        "grades_total": len(grades_by_course),
+        "concluded_course_ids": sorted(cid for cid in course_ids if cid in (raw.get("concluded") or ())),
+        **_freshness(raw, course_ids),
+    }
+
+
+def snapshot_size(raw: dict[str, Any]) -> int:
+    """Rough cost of build_views(): assignments, submission states and announcements it walks."""
+    return (
+        sum(len(v) for v in (raw.get("assignments") or {}).values())
+        + sum(len(v.get("items") or []) for v in (raw.get("upcoming") or {}).values())
+        + sum(len(v) for v in (raw.get("submissions") or {}).values())
+        + len(raw.get("announcements") or [])
+    )
+
+
+def _freshness(raw: dict[str, Any], course_ids: list[str]) -> dict[str, Any]:
+    """Per-section "last fetched" stamps (oldest over active visible courses) and which sections are stale."""
+    fresh_at = raw.get("fresh_at") or {}
+    fetched_at = raw.get("fetched_at")
+    concluded = raw.get("concluded") or set()
+    active = [cid for cid in course_ids if cid not in concluded]
+
+    updated: dict[str, str | None] = {}
+    stale: list[str] = []
+    for section in FRESHNESS_SECTIONS:
+        value = fresh_at.get(section)
+        if isinstance(value, dict):
+            stamps = [value.get(cid) for cid in active]
+            oldest = None if not stamps or None in stamps else min(stamps)
+        else:
+            oldest = value
+        updated[section] = oldest.isoformat() if oldest is not None else None
+        if fetched_at is not None and (oldest is None or oldest < fetched_at) and (active or not isinstance(value, dict)):
+            stale.append(section)
+    return {"section_updated_at": updated, "stale_sections": stale}
+
+
+def next_view_boundary(raw: dict[str, Any], opts: dict[str, Any], now: datetime) -> datetime | None:
+    """Return the earliest future instant at which build_views() would change output."""
+    days_ahead = timedelta(days=opts["days_ahead"])
+    lookback = timedelta(days=opts["miss_lookback_days"])
+    ann_days = timedelta(days=opts["ann_days"])
+    end_dates_map: dict[str, str] = opts["end_dates_map"]
+    best: datetime | None = None
+
+    def consider(when: datetime | None) -> None:
+        nonlocal best
+        if when is not None and when > now and (best is None or when < best):
+            best = when
+
+    for cid, up in (raw.get("upcoming") or {}).items():
+        for a in up.get("items") or []:
+            due, _ = _effective_due(a, cid, end_dates_map)
+            dt = _parse_dt(due) if due else None
+            if dt is not None:
+                consider(dt - days_ahead)  # enters the horizon
+                consider(dt)               # leaves upcoming / becomes missing
+
+    for cid, items in (raw.get("assignments") or {}).items():
+        subs = (raw.get("submissions") or {}).get(cid) or {}
+        for a in items:
+            if str(a.get("id")) not in subs:
+                continue
+            due, _ = _effective_due(a, cid, end_dates_map)
+            dt = _parse_dt(due) if due else None
+            if dt is not None:
+                consider(dt)             # becomes missing
+                consider(dt + lookback)  # falls out of the lookback window
+
+    for a in raw.get("announcements") or []:
+        posted = _parse_dt(a["posted_at"]) if a.get("posted_at") else None
+        if posted is not None:
+            consider(posted + ann_days)
+
+    return best
+
+
+
+def collect_due_items(raw: dict[str, Any], opts: dict[str, Any]) -> list[dict[str, Any]]:
+    """Every dated assignment in visible courses, using the course end date for undated work."""
+    hide_courses: set[str] = opts["hide_courses"]
+    end_dates_map: dict[str, str] = opts["end_dates_map"]
+    names = {
+        str(c.get("id")): (c.get("name") or c.get("course_code") or str(c.get("id")))
+        for c in raw.get("courses") or []
+        if c.get("id") is not None
     }
-    return table.get(l)
+
+    out: list[dict[str, Any]] = []
+    for cid, items in (raw.get("assignments") or {}).items():
+        if cid in hide_courses:
+            continue
+        for a in items:
+            due, due_source = _effective_due(a, cid, end_dates_map)
+            dt = _parse_dt(due) if due else None
+            if dt is None:
+                continue
+            out.append(
+                {
+                    "uid": f"{cid}:{a.get('id')}",
+                    "course_id": cid,
+                    "course_name": names.get(cid, cid),
+                    "id": a.get("id"),
+                    "name": a.get("name"),
+                    "html_url": a.get("html_url"),
+                    "due": dt,
+                    "due_source": due_source,
+                }
+            )
+    return out
 
 
 class CanvasCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     """Coordinator for Canvas Student integration."""
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, client: CanvasClient) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        client: CanvasClient,
+        scheduler: RefreshScheduler | None = None,
+        student_id: str | None = None,
+        student_name: str | None = None,
+    ) -> None:
         self.hass = hass
         self.entry = entry
         self.client = client
+        self._scheduler = scheduler
+
+        # Observer entries run one coordinator per observed student; everything
+        # keyed per student (entities, scheduler slots, aggregate slices) uses
+        # unique_prefix, which is just the entry id for a student's own token.
+        self.student_id: str | None = str(student_id) if student_id is not None else None
+        self.student_name: str | None = student_name or entry.data.get(CONF_STUDENT_NAME)
+        self.unique_prefix: str = entry.entry_id if student_id is None else f"{entry.entry_id}_{student_id}"
 
         # IMPORTANT:
         # Other parts of the integration may reference coordinator.school_name.
@@ -95,441 +557,869 @@ class CanvasCoordinator(DataUpdateCoordinator[dict[str, Any]]):
 
         update_minutes = int(entry.options.get(OPT_UPDATE_MINUTES, DEFAULT_UPDATE_MINUTES))
 
+        # Change-detection probe state (see _async_probe_fingerprint)
+        self._probe_fingerprint: str | None = None
+        self.last_full_refresh: datetime | None = None
+        self.probe_skips: int = 0
+
+        # Adaptive polling state (see _compute_update_interval)
+        self.unchanged_streak: int = 0
+
+        # Set by async_full_refresh(): crawl everything, bypassing probe, frozen courses and caches
+        self._force_full: bool = False
+
+        # Requests the client queue deferred to a later refresh (budget or deadline)
+        self.deferred_requests: int = 0
+
+        # Persistent per-assignment submission states (loaded in async_setup_entry)
+        self.submission_cache = SubmissionCache(hass, self.unique_prefix)
+        # Score change log per course, for trends without recorder history (loaded with the cache)
+        self.grade_history = GradeHistory(hass, self.unique_prefix)
+        # Last published view values, reused while unchanged so entities share one copy
+        self.shared_views = SharedViews()
+
+        # Raw snapshot of the last crawl; views are rebuilt from it locally
+        self._raw: dict[str, Any] | None = None
+        # Held while a full crawl or a partial refresh reads, replaces and publishes the snapshot
+        self._snapshot_lock = asyncio.Lock()
+        self._unsub_recompute: CALLBACK_TYPE | None = None
+        self._recompute_task: asyncio.Task[None] | None = None
+        # Where build_views() ran (see _async_build_views)
+        self.view_builds: dict[str, Any] = {"inline": 0, "executor": 0, "last_items": None, "last_ms": None}
+        # Phase timings of the last few refreshes (see tracing.CycleTimer)
+        self.refresh_cycles: deque[dict[str, Any]] = deque(maxlen=REFRESH_TRACE_CYCLES)
+
+        # Options-flow course index over every active course, hidden ones included
+        self.course_key_to_id: dict[str, str] = {}
+        self.course_id_to_key: dict[str, str] = {}
+
+        # Entry data the client/entities were built from (see requires_reload)
+        self._applied_data: dict[str, Any] = dict(entry.data)
+
         super().__init__(
             hass,
             _LOGGER,
-            name=f"Canvas ({self.school_name})",
+            name=f"Canvas ({self.school_name})" if student_id is None else f"Canvas ({self.school_name} - {self.student_name})",
             update_interval=timedelta(minutes=update_minutes),
         )
 
-    async def _async_update_data(self) -> dict[str, Any]:
-        try:
-            base_url = str(self.entry.data.get(CONF_BASE_URL, "")).rstrip("/")
-
-            hide_empty = bool(self.entry.options.get(OPT_HIDE_EMPTY, DEFAULT_HIDE_EMPTY))
-            days_ahead = int(self.entry.options.get(OPT_DAYS_AHEAD, DEFAULT_DAYS_AHEAD))
-            ann_days = int(self.entry.options.get(OPT_ANN_DAYS, DEFAULT_ANNOUNCEMENT_DAYS))
-            miss_lookback_days = int(self.entry.options.get(OPT_MISS_LOOKBACK, DEFAULT_MISSING_LOOKBACK))
-
-            enable_gpa = bool(self.entry.options.get(OPT_ENABLE_GPA, DEFAULT_ENABLE_GPA))
-            gpa_scale_raw = self.entry.options.get(OPT_GPA_SCALE, DEFAULT_GPA_SCALE)
-
-            # Accept numeric scale (e.g., 4.0) or a preset string (e.g., "us_4_0_plusminus")
-            if isinstance(gpa_scale_raw, (int, float)):
-                gpa_scale = float(gpa_scale_raw)
-            elif isinstance(gpa_scale_raw, str):
-                s = gpa_scale_raw.strip().lower()
-                if s in ("us_4_0", "us_4_0_plusminus", "4", "4.0", "4.00"):
-                    gpa_scale = 4.0
-                else:
-                    # Unknown preset -> default safely
-                    gpa_scale = float(DEFAULT_GPA_SCALE)
-            else:
-                gpa_scale = float(DEFAULT_GPA_SCALE)
-
-            # credits map: { "course_id": credits_float }
-            credits_raw = (self.entry.options.get(OPT_CREDITS_MAP, {}) or {})
-            credits_map: dict[str, float] = {}
-            if isinstance(credits_raw, dict):
-                for k, v in credits_raw.items():
-                    try:
-                        if v is None:
-                            continue
-                        credits_map[str(k)] = float(v)
-                    except Exception:
-                        continue
-
-            # hide courses list: ["17100","35804"] or [17100,35804]
-            hide_courses_raw = (self.entry.options.get(OPT_HIDE_COURSES, []) or [])
-            hide_courses: set[str] = set()
-            if isinstance(hide_courses_raw, list):
-                hide_courses = {str(x) for x in hide_courses_raw if str(x).strip()}
-
-            # end dates map: { "176": "2026-02-14" }
-            end_dates_raw = (self.entry.options.get(OPT_COURSE_END_DATES_MAP, {}) or {})
-            end_dates_map: dict[str, str] = {}
-            if isinstance(end_dates_raw, dict):
-                for k, v in end_dates_raw.items():
-                    cid_k = str(k)
-                    ds = str(v).strip()
-                    if not ds:
-                        continue
-                    try:
-                        d = datetime.strptime(ds, "%Y-%m-%d").date()
-                        local_dt = datetime.combine(d, dtime(23, 59, 59), tzinfo=dt_util.DEFAULT_TIME_ZONE)
-                        end_dates_map[cid_k] = local_dt.astimezone(timezone.utc).isoformat()
-                    except Exception:
-                        # Ignore bad values quietly
-                        continue
-
-            now = datetime.now(timezone.utc)
-            horizon = now + timedelta(days=days_ahead)
-            miss_floor = now - timedelta(days=miss_lookback_days)
-
-            # --- Courses ---
-            courses = await self.client.list_courses()
-            if not isinstance(courses, list):
-                courses = []
-
-            # Apply hide-courses filtering
-            if hide_courses:
-                courses = [c for c in courses if str(c.get("id")) not in hide_courses]
-
-            course_names_by_id = {
-                str(c.get("id")): (c.get("name") or c.get("course_code") or str(c.get("id")))
-                for c in courses
-                if c.get("id") is not None
-            }
-            grade_urls_by_course = {
-                str(c.get("id")): f"{base_url}/courses/{c.get('id')}/grades"
-                for c in courses
-                if c.get("id") is not None and base_url
-            }
-
-            # --- Grades ---
-            grades_by_course: dict[str, dict[str, Any]] = {}
-            for c in courses:
-                cid = str(c.get("id"))
-                if not cid or cid == "None":
-                    continue
-                try:
-                    enr = await self.client.list_enrollments(cid)
-                    e = next(
-                        (e for e in (enr or []) if e.get("type") == "StudentEnrollment" or "grades" in e),
-                        None,
-                    )
-                    if e and e.get("grades"):
-                        g = e["grades"]
-                        grades_by_course[cid] = {
-                            "current_score": g.get("current_score"),
-                            "current_grade": g.get("current_grade"),
-                        }
-                except Exception:
-                    # Don't let a single course break the whole update
-                    continue
-
-            # --- Upcoming Assignments (with fallback) ---
-            assignments_by_course: dict[str, list[dict[str, Any]]] = {}
+        # Jittered phase offset, added once to the first scheduled interval so
+        # entries set up together do not keep polling in lockstep. The first
+        # refresh itself is not delayed; at startup the scheduler only caps concurrency.
+        self._phase_offset = (
+            scheduler.register(self.unique_prefix, timedelta(minutes=update_minutes), group=entry.entry_id)
+            if scheduler is not None
+            else timedelta(0)
+        )
 
-            for c in courses:
-                cid = str(c.get("id"))
-                if not cid or cid == "None":
+    async def _async_probe_fingerprint(self) -> str | None:
+        """Return a hash of cheap account-activity endpoints, or None if the probe failed."""
+        try:
+            with priority(PRIORITY_HIGH):
+                summary = await self.client.get_activity_stream_summary()
+                todo = await self.client.get_todo_item_count()
+                # Observer tokens: the parent's summary misses the student's own submissions and grades
+                student = None
+                if hasattr(self.client, "get_student_activity"):
+                    student = await self.client.get_student_activity()
+        except Exception as err:
+            _LOGGER.debug("Canvas %s change probe failed: %s", self.school_name, err)
+            return None
+
+        if isinstance(summary, list):
+            summary = sorted(
+                summary,
+                key=lambda s: (str(s.get("type")), str(s.get("notification_category"))),
+            )
+        payload = json.dumps({"summary": summary, "todo": todo, "student": student}, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _can_skip_refresh(self, fingerprint: str | None, now: datetime, opts: dict[str, Any]) -> bool:
+        """Reuse cached data when the probe matches the last full refresh and it is still fresh."""
+        if fingerprint is None or self.data is None or not self.last_update_success or self._force_full:
+            return False
+        # Sections still on fallback data must be retried
+        if self.data.get("stale_sections"):
+            return False
+        # Options now show courses or a lookback the snapshot never fetched
+        if not self._snapshot_covers(opts):
+            return False
+        if fingerprint != self._probe_fingerprint or self.last_full_refresh is None:
+            return False
+        return now - self.last_full_refresh < timedelta(minutes=FULL_REFRESH_MAX_AGE_MINUTES)
+
+    def _nearest_due(self, data: dict[str, Any], now: datetime) -> datetime | None:
+        """Return the earliest future due date across upcoming assignments."""
+        nearest: datetime | None = None
+        for items in (data.get("assignments_by_course") or {}).values():
+            for a in items:
+                due = a.get("due_at")
+                if not due:
                     continue
-
-                # 1) Try Canvas "upcoming" bucket
-                used_upcoming_bucket = True
-                try:
-                    items = await self.client.list_assignments(cid, bucket="upcoming")
-                except Exception:
-                    items = []
-                if not isinstance(items, list):
-                    items = []
-
-                # 2) If empty, fall back to all assignments and filter ourselves
-                if not items:
-                    used_upcoming_bucket = False
-                    try:
-                        items = await self.client.list_assignments(cid, bucket=None)
-                    except Exception:
-                        items = []
-                    if not isinstance(items, list):
-                        items = []
-
-                _LOGGER.debug(
-                    "Canvas %s %s using upcoming=%s got %d items",
-                    self.school_name,
-                    cid,
-                    used_upcoming_bucket,
-                    len(items),
-                )
-
-                trimmed: list[dict[str, Any]] = []
-
-                for a in items:
-                    due = a.get("due_at")
-                    due_source = a.get("due_source")
-
-                    # If no due date, apply per-course end date
-                    if not due:
-                        eff = end_dates_map.get(cid)
-                        if eff:
-                            due = eff
-                            due_source = "course_end"
-
-                    if not due:
-                        # Include undated items ONLY when they came from the upcoming bucket.
-                        # If we had to fall back to "all", including undated floods the list.
-                        if used_upcoming_bucket:
-                            trimmed.append(
-                                {
-                                    "id": a.get("id"),
-                                    "name": a.get("name"),
-                                    "due_at": None,
-                                    "html_url": a.get("html_url"),
-                                }
-                            )
-                        continue
-
-                    dt = dt_util.parse_datetime(due)
-                    if dt is not None and dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-
-                    if dt and now <= dt <= horizon:
-                        trimmed.append(
-                            {
-                                "id": a.get("id"),
-                                "name": a.get("name"),
-                                "due_at": due,
-                                "html_url": a.get("html_url"),
-                                "due_source": due_source,
-                            }
-                        )
-
-                assignments_by_course[cid] = trimmed
-
-            # --- Missing Assignments ---
-            missing_by_course: dict[str, list[dict[str, Any]]] = {}
-
-            for c in courses:
-                cid = str(c.get("id"))
-                if not cid or cid == "None":
+                dt = _parse_dt(due)
+                if dt is None:
                     continue
+                if dt > now and (nearest is None or dt < nearest):
+                    nearest = dt
+        return nearest
+
+    def _compute_update_interval(self, data: dict[str, Any], now: datetime) -> timedelta:
+        """Pick the next polling interval from due dates, time of day and recent churn."""
+        opts = self.entry.options
+        base = int(opts.get(OPT_UPDATE_MINUTES, DEFAULT_UPDATE_MINUTES))
+        if not bool(opts.get(OPT_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING)):
+            return timedelta(minutes=base)
+
+        floor = max(1, int(opts.get(OPT_MIN_UPDATE_MINUTES, DEFAULT_MIN_UPDATE_MINUTES)))
+        ceiling = max(floor, int(opts.get(OPT_MAX_UPDATE_MINUTES, DEFAULT_MAX_UPDATE_MINUTES)))
+
+        nearest = self._nearest_due(data, now)
+        if len(data.get("concluded_course_ids") or []) >= (data.get("courses_total") or 0):
+            # Between terms / everything hidden or concluded: nothing to watch closely
+            minutes = float(ceiling)
+        elif nearest is not None and nearest - now <= timedelta(minutes=DUE_SOON_MINUTES):
+            # Work is due within the hour; stay at the floor regardless of churn
+            minutes = float(floor)
+        else:
+            minutes = float(base)
+            if nearest is not None and nearest - now <= timedelta(hours=DUE_TODAY_HOURS):
+                minutes = minutes / 2
+            elif nearest is None:
+                minutes = minutes * 2
+
+            local_hour = dt_util.as_local(now).hour
+            if QUIET_HOURS_START > QUIET_HOURS_END:
+                quiet = local_hour >= QUIET_HOURS_START or local_hour < QUIET_HOURS_END
+            else:
+                quiet = QUIET_HOURS_START <= local_hour < QUIET_HOURS_END
+            if quiet:
+                minutes = float(ceiling)
 
-                try:
-                    all_assignments = await self.client.list_assignments(cid, bucket=None)
-                except Exception:
-                    all_assignments = []
-                if not isinstance(all_assignments, list):
-                    all_assignments = []
-
-                miss_list: list[dict[str, Any]] = []
-
-                for a in all_assignments:
-                    due = a.get("due_at")
-                    due_source = a.get("due_source")
-
-                    if not due:
-                        eff = end_dates_map.get(cid)
-                        if eff:
-                            due = eff
-                            due_source = "course_end"
-
-                    if not due:
-                        continue
-
-                    dt = dt_util.parse_datetime(due)
-                    if dt is not None and dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-
-                    # Only within lookback window and already due
-                    if not dt or dt < miss_floor or dt > now:
-                        continue
+            minutes = minutes * (2 ** min(self.unchanged_streak, MAX_UNCHANGED_BACKOFF_STEPS))
 
-                    # Check submission state
-                    sub = None
-                    try:
-                        sub = await self.client.get_submission_self(cid, a.get("id"))
-                    except Exception:
-                        sub = None
+        return timedelta(minutes=min(max(minutes, floor), ceiling))
 
-                    submitted_at = (sub or {}).get("submitted_at")
-                    workflow_state = (sub or {}).get("workflow_state")
+    def _requests_sent(self) -> int:
+        trace = getattr(self.client, "trace", None)
+        return trace.total if trace is not None else 0
 
-                    if submitted_at or workflow_state in ("submitted", "graded"):
-                        continue
+    def _finish_cycle(self, timer: CycleTimer, outcome: str, **extra: Any) -> None:
+        self.refresh_cycles.append(timer.finish(outcome, self._requests_sent(), **extra))
 
-                    miss_list.append(
-                        {
-                            "id": a.get("id"),
-                            "name": a.get("name"),
-                            "due_at": due,
-                            "html_url": a.get("html_url"),
-                            "due_source": due_source,
-                        }
-                    )
+    async def _async_update_data(self) -> dict[str, Any]:
+        previous = self.data
+        timer = CycleTimer("full", self._requests_sent())
+        try:
+            if self._scheduler is not None:
+                queued = time.monotonic()
+                async with self._scheduler.slot(self.unique_prefix):
+                    timer.record["phases_ms"]["scheduler_wait"] = round((time.monotonic() - queued) * 1000, 1)
+                    data = await self._async_crawl(timer)
+            else:
+                data = await self._async_crawl(timer)
+        except BaseException as err:
+            self._finish_cycle(timer, f"failed: {err}"[:200])
+            raise
+        self._finish_cycle(
+            timer,
+            "ok",
+            stale_sections=list(data.get("stale_sections") or []),
+            deferred_requests=self.deferred_requests,
+        )
 
-                if miss_list:
-                    missing_by_course[cid] = miss_list
+        # Freshness stamps move on every crawl; they do not count as a change
+        if previous is not None and {**data, "section_updated_at": None} == {**previous, "section_updated_at": None}:
+            self.unchanged_streak += 1
+        else:
+            self.unchanged_streak = 0
+
+        interval = self._compute_update_interval(data, datetime.now(timezone.utc))
+        if self._phase_offset:
+            interval += self._phase_offset
+            self._phase_offset = timedelta(0)
+        self.update_interval = interval
+        self._async_schedule_recompute()
+        return data
+
+    async def _async_crawl(self, timer: CycleTimer) -> dict[str, Any]:
+        try:
+            # Partial refreshes wait for the crawl (and it for them): neither publishes over the other
+            async with self._snapshot_lock:
+                opts = _parse_options(self.entry.options)
+
+                # --- Change-detection probe ---
+                with timer.phase("probe"):
+                    fingerprint = await self._async_probe_fingerprint()
+                now = datetime.now(timezone.utc)
+                if self._raw is not None and self._can_skip_refresh(fingerprint, now, opts):
+                    self.probe_skips += 1
+                    timer.record["kind"] = "probe_skip"
+                    _LOGGER.debug("Canvas %s probe unchanged; reusing cached data", self.school_name)
+                    with timer.phase("build_views"):
+                        return await self._async_build_views(self._raw, opts, now)
+
+                with timer.phase("fetch"):
+                    raw = await self._async_fetch_raw(opts, now, timer)
+                self._raw = raw
+                self.grade_history.record(raw["grades"], now)
+                self.course_key_to_id, self.course_id_to_key = course_key_maps(raw["courses"])
+                self._probe_fingerprint = fingerprint
+                self.last_full_refresh = now
+                with timer.phase("build_views"):
+                    return await self._async_build_views(raw, opts, now)
 
-            # --- Awaiting Grading (submitted but ungraded) ---
-            ungraded_by_course: dict[str, list[dict[str, Any]]] = {}
+        except Exception as err:
+            # Use coordinator's school_name for more helpful diagnostics (and ensure it always exists).
+            raise UpdateFailed(f"{self.school_name} update failed: {err}") from err
 
-            for c in courses:
-                cid = str(c.get("id"))
-                if not cid or cid == "None":
-                    continue
-                try:
-                    submissions = await self.client.list_submissions_self(cid, workflow_state="submitted")
-                except Exception:
-                    continue
-                if not isinstance(submissions, list):
+    async def _async_build_views(self, raw: dict[str, Any], opts: dict[str, Any], now: datetime) -> dict[str, Any]:
+        """Run build_views() and the shared-view comparison inline for small snapshots and
+        in the executor for large ones.
+
+        The snapshot is never mutated once published (partial refreshes copy it),
+        so the worker thread can read it while the loop carries on.
+        """
+        items = snapshot_size(raw)
+        started = time.monotonic()
+        if items >= VIEW_EXECUTOR_MIN_ITEMS:
+            data = self._add_trends(await self.hass.async_add_executor_job(build_views, raw, opts, now), now)
+            # Comparing a large build with the published views costs about as much as building it
+            data = await self.hass.async_add_executor_job(self.shared_views.intern, data)
+            self.view_builds["executor"] += 1
+        else:
+            data = self._finish_views(build_views(raw, opts, now), now)
+            self.view_builds["inline"] += 1
+        self.view_builds["last_items"] = items
+        self.view_builds["last_ms"] = round((time.monotonic() - started) * 1000, 1)
+        return data
+
+    def _add_trends(self, data: dict[str, Any], now: datetime) -> dict[str, Any]:
+        """Add per-course trend summaries from the grade history (not part of the raw snapshot)."""
+        data["grade_trends_by_course"] = self.grade_history.summaries(data.get("grades_by_course") or {}, now)
+        return data
+
+    def _finish_views(self, data: dict[str, Any], now: datetime) -> dict[str, Any]:
+        """Add trend summaries and swap unchanged views for the shared, read-only copies entities already hold."""
+        return self.shared_views.intern(self._add_trends(data, now))
+
+    async def _async_fetch_raw(self, opts: dict[str, Any], now: datetime, timer: CycleTimer | None = None) -> dict[str, Any]:
+        """Crawl Canvas into a raw snapshot; all time-window filtering happens in build_views().
+
+        Sections that are deferred, fail transiently or miss the refresh deadline keep
+        the previous snapshot's data and freshness stamp.
+        """
+        timer = timer or CycleTimer("full")
+        base_url = str(self.entry.data.get(CONF_BASE_URL, "")).rstrip("/")
+        hide_courses: set[str] = opts["hide_courses"]
+        miss_floor = now - timedelta(days=opts["miss_lookback_days"])
+        ann_days = opts["ann_days"]
+
+        # Sections fetched successfully / kept on fallback data in this pass (see _update_freshness).
+        # Both stay local: a partial refresh may run while this crawl is in flight.
+        completed: set[tuple[str, str | None]] = set()
+        stale: set[tuple[str, str | None]] = set()
+
+        # --- Courses ---
+        try:
+            with priority(PRIORITY_HIGH), timer.phase("courses"):
+                all_courses = await self.client.list_courses()
+            completed.add(("courses", None))
+        except _STALE_ERRORS as err:
+            if self._raw is None:
+                raise
+            all_courses = self._fallback("courses", None, err, stale)
+        if not isinstance(all_courses, list):
+            all_courses = []
+
+        # Hidden courses stay in the course index (the options flow lists them) but are not crawled
+        course_ids = [
+            str(c.get("id"))
+            for c in all_courses
+            if c.get("id") is not None and str(c.get("id")) not in hide_courses
+        ]
+
+        grades: dict[str, dict[str, Any]] = {}
+        upcoming: dict[str, dict[str, Any]] = {}
+        assignments: dict[str, list[dict[str, Any]]] = {}
+        submissions: dict[str, dict[str, dict[str, Any]]] = {}
+        ungraded: dict[str, list[dict[str, Any]]] = {}
+        targets = {"grades": grades, "upcoming": upcoming, "assignments": assignments, "submissions": submissions, "ungraded": ungraded}
+
+        # Concluded courses keep their last crawl and are re-crawled only every CONCLUDED_REFRESH_HOURS
+        concluded = concluded_courses(all_courses, opts["end_dates_map"], now)
+        crawled_at: dict[str, datetime] = dict(self._previous("crawled_at") or {})
+        frozen = set() if self._force_full else {
+            cid
+            for cid in course_ids
+            if cid in concluded
+            and cid in (self._previous("assignments") or {})
+            and cid in crawled_at
+            and now - crawled_at[cid] < timedelta(hours=CONCLUDED_REFRESH_HOURS)
+        }
+
+        async def _crawl_course(cid: str) -> None:
+            with timer.phase(cid, "courses_ms"):
+                await _crawl_course_sections(cid)
+
+        async def _crawl_announcements() -> list[dict[str, Any]]:
+            with timer.phase("announcements"):
+                return await self._async_fetch_announcements(active, ann_days, stale)
+
+        async def _crawl_course_sections(cid: str) -> None:
+            g = await self._async_fetch_grades(cid, stale)
+            if g is not None:
+                grades[cid] = g
+            completed.add(("grades", cid))
+
+            assignments[cid], upcoming[cid] = await self._async_fetch_assignments(cid, stale)
+            completed.add(("assignments", cid))
+            submissions[cid] = await self._async_fetch_submissions(
+                cid, assignments[cid], now, miss_floor, stale, use_cache=not self._force_full
+            )
+            completed.add(("submissions", cid))
+
+            items = await self._async_fetch_ungraded(cid, stale)
+            if items:
+                ungraded[cid] = items
+            completed.add(("ungraded", cid))
+
+        # Courses are crawled concurrently; the client's request queue decides what goes first.
+        # Whatever is unfinished at the deadline keeps its last good data.
+        active = [cid for cid in course_ids if cid not in frozen]
+        course_tasks = [asyncio.create_task(_crawl_course(cid)) for cid in active]
+        ann_task = asyncio.create_task(_crawl_announcements())
+        try:
+            with timer.phase("crawl"):
+                _, pending = await asyncio.wait([*course_tasks, ann_task], timeout=REFRESH_DEADLINE_SECONDS)
+        except BaseException:
+            for task in (*course_tasks, ann_task):
+                task.cancel()
+            raise
+        for task in pending:
+            task.cancel()
+        results = await asyncio.gather(*course_tasks, ann_task, return_exceptions=True)
+        if pending:
+            _LOGGER.warning(
+                "Canvas %s refresh hit the %ss deadline; %d unfinished part(s) keep their last data",
+                self.school_name,
+                REFRESH_DEADLINE_SECONDS,
+                len(pending),
+            )
+        for cid, result in zip(active, results):
+            if isinstance(result, Exception):
+                _LOGGER.debug("Canvas %s course %s crawl failed: %s", self.school_name, cid, result)
+
+        # Only a complete, fresh crawl counts: a concluded course that hit the deadline or a
+        # transient error is retried next refresh instead of being frozen on its last data
+        for cid in active:
+            keys = {(key, cid) for _, key in _COURSE_SECTIONS}
+            if keys <= completed and not keys & stale:
+                crawled_at[cid] = now
+
+        # Frozen courses and unfinished sections carry their previous values
+        for cid in course_ids:
+            for section, key in _COURSE_SECTIONS:
+                if (key, cid) in completed:
                     continue
+                value = self._previous(section, cid)
+                if value is not None:
+                    targets[section][cid] = value
+
+        if ("announcements", None) not in stale and not isinstance(results[-1], BaseException):
+            announcements = results[-1]
+            completed.add(("announcements", None))
+        else:
+            announcements = _announcements_for(self._previous("announcements") or [], set(active))
+        announcements += [a for a in self._previous("announcements") or [] if str(a.get("course_id")) in frozen]
+        timer.record["courses_frozen"] = len(frozen)
+        timer.record["unfinished_at_deadline"] = len(pending)
+        if frozen:
+            _LOGGER.debug("Canvas %s reusing frozen snapshot for %d concluded course(s)", self.school_name, len(frozen))
+
+        # Forget cached submission states that this crawl no longer needs
+        self.submission_cache.prune(f"{cid}:{aid}" for cid, subs in submissions.items() for aid in subs)
+
+        previous_fresh = self._previous("fresh_at") or {}
+        fresh_at: dict[str, Any] = {
+            section: {cid: t for cid, t in (previous_fresh.get(section) or {}).items() if cid in course_ids}
+            for section in ("grades", "assignments", "submissions", "ungraded")
+        }
+        for section in ("courses", "announcements"):
+            if section in previous_fresh:
+                fresh_at[section] = previous_fresh[section]
+
+        raw = {
+            "fetched_at": now,
+            "base_url": base_url,
+            "courses": all_courses,
+            "grades": grades,
+            "upcoming": upcoming,
+            "assignments": assignments,
+            "submissions": submissions,
+            "ungraded": ungraded,
+            "announcements": announcements,
+            "concluded": concluded,
+            # When each course was last crawled (concluded courses are refreshed rarely)
+            "crawled_at": {cid: crawled_at[cid] for cid in course_ids if cid in crawled_at},
+            # When each section (per course) was last fetched successfully
+            "fresh_at": fresh_at,
+            # What this snapshot covers, so option changes can tell whether it is enough
+            "window": {
+                "hidden_courses": set(hide_courses),
+                "miss_lookback_days": opts["miss_lookback_days"],
+                "ann_days": ann_days,
+            },
+        }
+        self._update_freshness(raw, completed, stale, now)
+        return raw
+
+    # --- Per-course section fetchers (shared by full and partial refreshes) ---
+
+    def _previous(self, section: str, cid: str | None = None) -> Any:
+        """Last crawled value of a raw-snapshot section; kept when its request is deferred or fails."""
+        value = (self._raw or {}).get(section)
+        if cid is None or not isinstance(value, dict):
+            return value
+        return value.get(cid)
+
+    def _fallback(self, section: str, cid: str | None, err: Exception, stale: set[tuple[str, str | None]]) -> Any:
+        """Record a deferred/failed section request in the pass's `stale` set and return its last good value."""
+        if isinstance(err, CanvasRequestDeferred):
+            self.deferred_requests += 1
+        else:
+            _LOGGER.debug("Canvas %s %s %s kept last good data: %s", self.school_name, section, cid or "", err)
+        stale.add((section, cid))
+        return self._previous(section, cid)
+
+    def _update_freshness(
+        self,
+        raw: dict[str, Any],
+        completed: set[tuple[str, str | None]],
+        stale: set[tuple[str, str | None]],
+        now: datetime,
+    ) -> None:
+        """Stamp sections that were fetched successfully in this pass; stale ones keep their old stamp."""
+        fresh_at = raw.setdefault("fresh_at", {})
+        for section, cid in completed - stale:
+            if cid is None:
+                fresh_at[section] = now
+            else:
+                fresh_at.setdefault(section, {})[cid] = now
 
-                items: list[dict[str, Any]] = []
-                for sub in submissions:
-                    # Already graded?
-                    if sub.get("graded_at") or sub.get("grade") is not None or sub.get("score") is not None:
-                        continue
-
-                    assignment = sub.get("assignment") or {}
-                    items.append(
-                        {
-                            "id": sub.get("assignment_id"),
-                            "name": assignment.get("name"),
-                            "submitted_at": sub.get("submitted_at"),
-                            "due_at": assignment.get("due_at"),
-                            "html_url": assignment.get("html_url"),
-                        }
-                    )
-
-                if items:
-                    ungraded_by_course[cid] = items
-
-            # --- Undated outstanding by course (no due date, not submitted) ---
-            undated_outstanding_by_course: dict[str, list[dict[str, Any]]] = {}
-
-            for c in courses:
-                cid = str(c.get("id"))
-                if not cid or cid == "None":
-                    continue
+    async def _async_fetch_grades(self, cid: str, stale: set[tuple[str, str | None]]) -> dict[str, Any] | None:
+        try:
+            with priority(PRIORITY_HIGH):
+                enr = await self.client.list_enrollments(cid)
+        except _STALE_ERRORS as err:
+            return self._fallback("grades", cid, err, stale)
+        except Exception:
+            # Don't let a single course break the whole update
+            return None
+        e = next(
+            (e for e in (enr or []) if e.get("type") == "StudentEnrollment" or "grades" in e),
+            None,
+        )
+        if e and e.get("grades"):
+            g = e["grades"]
+            return {
+                "current_score": g.get("current_score"),
+                "current_grade": g.get("current_grade"),
+            }
+        return None
 
-                try:
-                    all_assignments = await self.client.list_assignments(cid, bucket=None)
-                except Exception:
-                    continue
-                if not isinstance(all_assignments, list):
+    async def _async_fetch_assignments(
+        self, cid: str, stale: set[tuple[str, str | None]]
+    ) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+        """Return (all assignments, upcoming entry) for a course."""
+        # Full list is fetched once and shared by the upcoming fallback,
+        # missing and undated views.
+        try:
+            with priority(PRIORITY_HIGH):
+                all_assignments = await self.client.list_assignments(cid, bucket=None)
+        except _STALE_ERRORS as err:
+            all_assignments = self._fallback("assignments", cid, err, stale) or []
+        except Exception:
+            all_assignments = []
+        if not isinstance(all_assignments, list):
+            all_assignments = []
+
+        # 1) Try Canvas "upcoming" bucket; 2) if empty, fall back to the full list
+        try:
+            with priority(PRIORITY_HIGH):
+                items = await self.client.list_assignments(cid, bucket="upcoming")
+        except _STALE_ERRORS as err:
+            prev = self._fallback("upcoming", cid, err, stale) or {}
+            items = prev.get("items") if prev.get("from_bucket") else []
+        except Exception:
+            items = []
+        if not isinstance(items, list):
+            items = []
+        used_upcoming_bucket = bool(items)
+
+        _LOGGER.debug(
+            "Canvas %s %s using upcoming=%s got %d items",
+            self.school_name,
+            cid,
+            used_upcoming_bucket,
+            len(items) if used_upcoming_bucket else len(all_assignments),
+        )
+        return all_assignments, {
+            "items": items if used_upcoming_bucket else all_assignments,
+            "from_bucket": used_upcoming_bucket,
+        }
+
+    async def _async_fetch_submissions(
+        self,
+        cid: str,
+        all_assignments: list[dict[str, Any]],
+        now: datetime,
+        miss_floor: datetime,
+        stale: set[tuple[str, str | None]],
+        use_cache: bool = True,
+    ) -> dict[str, dict[str, Any]]:
+        """Submission state for everything already due inside the lookback window,
+        plus undated work (outstanding, or dated later via a course end date).
+
+        Fresh states come from the submission cache; only expired ones hit Canvas.
+        """
+        previous = self._previous("submissions", cid) or {}
+        historical = now - timedelta(days=HISTORICAL_SUBMISSION_DAYS)
+        subs: dict[str, dict[str, Any]] = {}
+
+        async def _check(a: dict[str, Any], due: datetime | None, level: int) -> None:
+            aid = str(a.get("id"))
+            try:
+                with priority(level):
+                    sub = await self.client.get_submission_self(cid, a.get("id"))
+            except _STALE_ERRORS as err:
+                # Keep the last known state (if any); the check runs again next refresh
+                self._fallback("submissions", cid, err, stale)
+                if aid in previous:
+                    subs[aid] = previous[aid]
+                return
+            except Exception:
+                # Unknown state is treated as not submitted, as before
+                sub = None
+                fetched = False
+            else:
+                fetched = True
+            sub = sub or {}
+            subs[aid] = {
+                "submitted_at": sub.get("submitted_at"),
+                "workflow_state": sub.get("workflow_state"),
+            }
+            if fetched:
+                self.submission_cache.set(cid, aid, subs[aid], due, now)
+
+        checks = []
+        for a in all_assignments:
+            due = a.get("due_at")
+            dt = None
+            level = PRIORITY_NORMAL
+            if due:
+                dt = _parse_dt(due)
+                if not dt or dt < miss_floor or dt > now:
                     continue
-
-                out_list: list[dict[str, Any]] = []
-
-                for a in all_assignments:
-                    # Only truly undated (no due_at) AND no course_end override in this view
-                    if a.get("due_at"):
-                        continue
-
-                    # If you set a course_end_date, those become "dated" for planning purposes
-                    if end_dates_map.get(cid):
-                        continue
-
-                    sub = None
-                    try:
-                        sub = await self.client.get_submission_self(cid, a.get("id"))
-                    except Exception:
-                        sub = None
-
-                    submitted_at = (sub or {}).get("submitted_at")
-                    workflow_state = (sub or {}).get("workflow_state")
-
-                    if submitted_at or workflow_state in ("submitted", "graded"):
-                        continue
-
-                    out_list.append(
-                        {
-                            "id": a.get("id"),
-                            "name": a.get("name"),
-                            "due_at": None,
-                            "html_url": a.get("html_url"),
-                        }
-                    )
-
-                if out_list:
-                    undated_outstanding_by_course[cid] = out_list
-
-            # --- Announcements ---
-            announcements: list[dict[str, Any]] = []
-            start_anns = (dt_util.now() - timedelta(days=ann_days)).astimezone(timezone.utc)
-            end_anns = dt_util.now().astimezone(timezone.utc)
-
-            context_codes = [f"course_{c.get('id')}" for c in courses if c.get("id") is not None]
-            if context_codes:
-                try:
-                    for a in await self.client.get_announcements(context_codes, start_anns, end_anns):
-                        cid = a.get("course_id")
-                        if not cid:
-                            ctx = a.get("context_code") or ""
-                            if ctx.startswith("course_"):
-                                try:
-                                    cid = int(ctx.split("_", 1)[1])
-                                except Exception:
-                                    cid = None
-                        announcements.append(
-                            {
-                                "course_id": cid,
-                                "title": a.get("title"),
-                                "html_url": a.get("html_url"),
-                                "posted_at": a.get("posted_at"),
-                            }
-                        )
-                except Exception:
-                    pass
-
-            # --- GPA ---
-            grade_points_by_course: dict[str, float] = {}
-            credits_by_course: dict[str, float] = {}
-            gpa = None
-            gpa_credits = 0.0
-            gpa_quality_points = 0.0
-
-            if enable_gpa:
-                for cid, g in grades_by_course.items():
-                    score = g.get("current_score")
-                    letter = g.get("current_grade")
-
-                    if not letter and score is not None:
+                if dt < historical:
+                    level = PRIORITY_LOW
+            if use_cache and (cached := self.submission_cache.get(cid, str(a.get("id")))) is not None:
+                subs[str(a.get("id"))] = cached
+                continue
+            checks.append(_check(a, dt, level))
+        await asyncio.gather(*checks)
+        return subs
+
+    async def _async_fetch_ungraded(self, cid: str, stale: set[tuple[str, str | None]]) -> list[dict[str, Any]]:
+        """Submitted but not yet graded work for a course."""
+        try:
+            with priority(PRIORITY_NORMAL):
+                subs_list = await self.client.list_submissions_self(cid, workflow_state="submitted")
+        except _STALE_ERRORS as err:
+            return self._fallback("ungraded", cid, err, stale) or []
+        except Exception:
+            return []
+        if not isinstance(subs_list, list):
+            return []
+
+        items: list[dict[str, Any]] = []
+        for sub in subs_list:
+            # Already graded?
+            if sub.get("graded_at") or sub.get("grade") is not None or sub.get("score") is not None:
+                continue
+
+            assignment = sub.get("assignment") or {}
+            items.append(
+                {
+                    "id": sub.get("assignment_id"),
+                    "name": assignment.get("name"),
+                    "submitted_at": sub.get("submitted_at"),
+                    "due_at": assignment.get("due_at"),
+                    "html_url": assignment.get("html_url"),
+                }
+            )
+        return items
+
+    async def _async_fetch_announcements(
+        self, course_ids: list[str], ann_days: int, stale: set[tuple[str, str | None]]
+    ) -> list[dict[str, Any]]:
+        announcements: list[dict[str, Any]] = []
+        start_anns = (dt_util.now() - timedelta(days=ann_days)).astimezone(timezone.utc)
+        end_anns = dt_util.now().astimezone(timezone.utc)
+
+        context_codes = [f"course_{cid}" for cid in course_ids]
+        if not context_codes:
+            return announcements
+        try:
+            with priority(PRIORITY_LOW):
+                fetched = await self.client.get_announcements(context_codes, start_anns, end_anns)
+        except _STALE_ERRORS as err:
+            return _announcements_for(self._fallback("announcements", None, err, stale) or [], set(course_ids))
+        except Exception:
+            return announcements
+        try:
+            for a in fetched:
+                cid = a.get("course_id")
+                if not cid:
+                    ctx = a.get("context_code") or ""
+                    if ctx.startswith("course_"):
                         try:
-                            letter = _letter_from_score(float(score))
+                            cid = int(ctx.split("_", 1)[1])
                         except Exception:
-                            letter = None
-
-                    gp = _grade_points(letter or "")
-                    cr = credits_map.get(cid)
-
-                    if gp is None or cr is None:
-                        continue
-
-                    grade_points_by_course[cid] = gp
-                    credits_by_course[cid] = cr
-                    gpa_credits += cr
-                    gpa_quality_points += (gp * cr)
-
-                if gpa_credits > 0:
-                    raw = gpa_quality_points / gpa_credits
-                    # If someone uses a different scale, allow scaling (default 4.0)
-                    if gpa_scale and gpa_scale != 4.0:
-                        raw = raw * (gpa_scale / 4.0)
-                    gpa = raw
-
-            options_applied = {
-                "hide_empty": hide_empty,
-                "days_ahead": days_ahead,
-                "announcement_days": ann_days,
-                "missing_lookback_days": miss_lookback_days,
-                "enable_gpa": enable_gpa,
-                "gpa_scale": gpa_scale,
-                "hidden_courses_count": len(hide_courses),
-                "end_dates_count": len(end_dates_map),
-                "credits_count": len(credits_map),
-            }
-
-            return {
-                "course_names_by_id": course_names_by_id,
-                "grade_urls_by_course": grade_urls_by_course,
-                "grades_by_course": grades_by_course,
-                "assignments_by_course": assignments_by_course,
-                "missing_by_course": missing_by_course,
-                "ungraded_by_course": ungraded_by_course,
-                "undated_outstanding_by_course": undated_outstanding_by_course,
-                "announcements": announcements,
-                "credits_by_course": credits_by_course,
-                "grade_points_by_course": grade_points_by_course,
-                "gpa": gpa,
-                "gpa_credits": gpa_credits,
-                "gpa_quality_points": gpa_quality_points,
-                "options_applied": options_applied,
-                "courses_total": len(courses),
-                "grades_total": len(grades_by_course),
-            }
-
-        except Exception as err:
-            # Use coordinator's school_name for more helpful diagnostics (and ensure it always exists).
-            raise UpdateFailed(f"{self.school_name} update failed: {err}") from err
+                            cid = None
+                announcements.append(
+                    {
+                        "course_id": cid,
+                        "title": a.get("title"),
+                        "html_url": a.get("html_url"),
+                        "posted_at": a.get("posted_at"),
+                    }
+                )
+        except Exception:
+            pass
+        return announcements
+
+    async def async_full_refresh(self) -> None:
+        """Refresh now with a complete crawl: no probe shortcut, frozen courses or cached responses.
+
+        Used for cassette capture, so the recording holds every request a cold start makes.
+        """
+        if hasattr(self.client, "invalidate"):
+            self.client.invalidate()
+        self._force_full = True
+        try:
+            await self.async_refresh()
+        finally:
+            self._force_full = False
+
+    # --- Targeted partial refresh ---
+
+    async def async_refresh_partial(
+        self,
+        course_ids: Iterable[str] | None = None,
+        sections: Iterable[str] = REFRESH_SECTIONS,
+    ) -> None:
+        """Re-fetch only the given sections for the given courses and merge them in.
+
+        With no snapshot yet this falls back to a regular full refresh. A full crawl
+        in progress finishes first, so its snapshot is the one this merges into.
+        """
+        if self._raw is None:
+            await self.async_request_refresh()
+            return
+        # A crawl in flight publishes first; this pass then merges into its snapshot
+        async with self._snapshot_lock:
+            await self._async_refresh_partial(course_ids, sections)
+
+    async def _async_refresh_partial(self, course_ids: Iterable[str] | None, sections: Iterable[str]) -> None:
+        opts = _parse_options(self.entry.options)
+        now = datetime.now(timezone.utc)
+        # Work on a copy: the published snapshot may be read by an executor view build
+        raw = {k: (dict(v) if isinstance(v, dict) else v) for k, v in self._raw.items()}
+        raw["fresh_at"] = {k: (dict(v) if isinstance(v, dict) else v) for k, v in raw.get("fresh_at", {}).items()}
+        sections = set(sections)
+
+        window = raw.get("window") or {}
+        crawled = [
+            str(c.get("id"))
+            for c in raw.get("courses") or []
+            if c.get("id") is not None and str(c.get("id")) not in (window.get("hidden_courses") or set())
+        ]
+        wanted = {str(c) for c in course_ids} if course_ids else None
+        targets = [cid for cid in crawled if wanted is None or cid in wanted]
+        if not targets:
+            _LOGGER.debug("Canvas %s partial refresh: no matching courses", self.school_name)
+            return
+
+        miss_floor = now - timedelta(days=window.get("miss_lookback_days", opts["miss_lookback_days"]))
+
+        # Observer clients share responses between students; make sure this re-fetch is real
+        if hasattr(self.client, "invalidate"):
+            self.client.invalidate(targets)
+
+        timer = CycleTimer("partial", self._requests_sent())
+        completed: set[tuple[str, str | None]] = set()
+        stale: set[tuple[str, str | None]] = set()
+        for cid in targets:
+            if "grades" in sections:
+                g = await self._async_fetch_grades(cid, stale)
+                if g is not None:
+                    raw["grades"][cid] = g
+                else:
+                    raw["grades"].pop(cid, None)
+                completed.add(("grades", cid))
+            if "assignments" in sections:
+                raw["assignments"][cid], raw["upcoming"][cid] = await self._async_fetch_assignments(cid, stale)
+                completed.add(("assignments", cid))
+            if "missing" in sections:
+                # An explicit refresh always asks Canvas: the course's cached states are dropped
+                # (stale ones for assignments no longer checked included)
+                self.submission_cache.invalidate(cid)
+                raw["submissions"][cid] = await self._async_fetch_submissions(
+                    cid, raw["assignments"].get(cid) or [], now, miss_floor, stale
+                )
+                completed.add(("submissions", cid))
+            if "ungraded" in sections:
+                items = await self._async_fetch_ungraded(cid, stale)
+                if items:
+                    raw["ungraded"][cid] = items
+                else:
+                    raw["ungraded"].pop(cid, None)
+                completed.add(("ungraded", cid))
+
+        if "announcements" in sections:
+            fresh = await self._async_fetch_announcements(targets, window.get("ann_days", opts["ann_days"]), stale)
+            target_set = set(targets)
+            keep = [a for a in raw["announcements"] if str(a.get("course_id")) not in target_set]
+            raw["announcements"] = keep + fresh
+            # Only a refresh of every course makes the announcements section as a whole fresh
+            if len(targets) == len(crawled):
+                completed.add(("announcements", None))
+
+        self._update_freshness(raw, completed, stale, now)
+
+        _LOGGER.debug(
+            "Canvas %s partial refresh of %s for %d course(s)",
+            self.school_name,
+            sorted(sections),
+            len(targets),
+        )
+        self._raw = raw
+        self.grade_history.record(raw["grades"], now)
+        with timer.phase("build_views"):
+            self.data = await self._async_build_views(raw, opts, now)
+        self._finish_cycle(timer, "ok", courses=len(targets), sections=sorted(sections))
+        self.async_update_listeners()
+        self._async_schedule_recompute()
+
+    # --- Option changes ---
+
+    def requires_reload(self) -> bool:
+        """Return True when entry data changed in a way that needs a new client/entities."""
+        for key in (CONF_BASE_URL, CONF_ACCESS_TOKEN, CONF_SCHOOL_NAME, CONF_STUDENT_NAME, CONF_OBSERVER, CONF_OBSERVEES):
+            if self.entry.data.get(key) != self._applied_data.get(key):
+                return True
+        return False
+
+    def _snapshot_covers(self, opts: dict[str, Any]) -> bool:
+        """Return True when the raw snapshot already holds everything the new options show."""
+        if self._raw is None:
+            return False
+        window = self._raw.get("window") or {}
+        # Un-hidden courses were never crawled
+        if (window.get("hidden_courses") or set()) - opts["hide_courses"]:
+            return False
+        # A longer lookback needs submission states / announcements that were not fetched
+        if opts["miss_lookback_days"] > window.get("miss_lookback_days", 0):
+            return False
+        if opts["ann_days"] > window.get("ann_days", 0):
+            return False
+        return True
+
+    async def async_apply_options(self) -> None:
+        """Re-apply changed options to the cached snapshot without reloading the entry.
+
+        Filtering, GPA and interval options are applied immediately with no network
+        traffic. Only when the snapshot does not cover the new options (a course was
+        un-hidden, a lookback grew) is a refresh requested; the change probe cannot
+        skip it (see _can_skip_refresh).
+
+        The rebuild waits for a running crawl or partial refresh: those read the
+        options when they start and would otherwise publish old-options views over
+        (or instead of) the new ones.
+        """
+        self._applied_data = dict(self.entry.data)
+        async with self._snapshot_lock:
+            opts = _parse_options(self.entry.options)
+            now = datetime.now(timezone.utc)
+            if self._raw is not None:
+                self.data = await self._async_build_views(self._raw, opts, now)
+                self.async_update_listeners()
+                self._async_schedule_recompute()
+
+        if self.data is not None:
+            self.update_interval = self._compute_update_interval(self.data, now)
+
+        if not self._snapshot_covers(opts):
+            _LOGGER.debug("Canvas %s options need data outside the snapshot; refreshing", self.school_name)
+            await self.async_request_refresh()
+
+    def due_items(self) -> list[dict[str, Any]]:
+        """Dated assignments from the cached snapshot (see collect_due_items)."""
+        if self._raw is None:
+            return []
+        return collect_due_items(self._raw, _parse_options(self.entry.options))
+
+    # --- Local recomputation between polls ---
+
+    @callback
+    def _async_schedule_recompute(self) -> None:
+        """Arm a timer for the next instant a time-windowed view changes."""
+        if self._unsub_recompute is not None:
+            self._unsub_recompute()
+            self._unsub_recompute = None
+        if self._raw is None:
+            return
+        opts = _parse_options(self.entry.options)
+        when = next_view_boundary(self._raw, opts, datetime.now(timezone.utc))
+        if when is None:
+            return
+        # Never fire more often than once a second, even with clustered due dates
+        when = max(when, dt_util.utcnow() + timedelta(seconds=1))
+        self._unsub_recompute = async_track_point_in_utc_time(self.hass, self._async_recompute_views, when)
+
+    @callback
+    def _async_recompute_views(self, _now: datetime | None = None) -> None:
+        """Rebuild views from the cached snapshot (no API calls) and notify entities."""
+        self._unsub_recompute = None
+        if self._raw is None:
+            return
+        raw = self._raw
+        if snapshot_size(raw) < VIEW_EXECUTOR_MIN_ITEMS:
+            now = datetime.now(timezone.utc)
+            self.data = self._finish_views(build_views(raw, _parse_options(self.entry.options), now), now)
+            self.view_builds["inline"] += 1
+            self.async_update_listeners()
+            self._async_schedule_recompute()
+            return
+        if self._recompute_task is None or self._recompute_task.done():
+            self._recompute_task = self.hass.async_create_task(self._async_recompute_offloaded(raw))
+
+    async def _async_recompute_offloaded(self, raw: dict[str, Any]) -> None:
+        options = self.entry.options
+        data = await self._async_build_views(raw, _parse_options(options), datetime.now(timezone.utc))
+        # A crawl or partial refresh published a newer snapshot meanwhile, or the options
+        # changed and async_apply_options published views built with them; those win
+        if raw is not self._raw or options is not self.entry.options:
+            return
+        self.data = data
+        self.async_update_listeners()
+        self._async_schedule_recompute()
+
+    async def async_shutdown(self) -> None:
+        if self._unsub_recompute is not None:
+            self._unsub_recompute()
+            self._unsub_recompute = None
+        if self._recompute_task is not None:
+            self._recompute_task.cancel()
+            self._recompute_task = None
+        await super().async_shutdown()
@@ -5,8 +5,11 @@ from typing import Any
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.helpers import entity_registry as er
 
-from .const import DOMAIN
+from .const import DATA_METRICS, DATA_SCHEDULER, DOMAIN
+from .gpa import cache_info as gpa_cache_info
+from .metrics import entity_payloads, payload_bytes
 
 
 # If anything sensitive ever ends up in these structures, HA will redact it.
@@ -32,13 +35,44 @@ def _summarize_counts(mapping: dict[str, list[dict[str, Any]]] | None) -> dict[s
     return out
 
 
+def _coordinator_summary(coordinator: Any) -> dict[str, Any]:
+    """Safe, summarized snapshot of one coordinator."""
+    data = getattr(coordinator, "data", {}) or {}
+    return {
+        "last_update_success": getattr(coordinator, "last_update_success", None),
+        "last_update": getattr(coordinator, "last_update", None),
+        "update_interval": str(getattr(coordinator, "update_interval", None)),
+        "last_full_refresh": getattr(coordinator, "last_full_refresh", None),
+        "probe_skips": getattr(coordinator, "probe_skips", None),
+        "unchanged_streak": getattr(coordinator, "unchanged_streak", None),
+        "deferred_requests": getattr(coordinator, "deferred_requests", None),
+        "submission_cache": coordinator.submission_cache.as_dict() if hasattr(coordinator, "submission_cache") else None,
+        "grade_history": coordinator.grade_history.as_dict() if hasattr(coordinator, "grade_history") else None,
+        "view_builds": getattr(coordinator, "view_builds", None),
+        "shared_views": coordinator.shared_views.as_dict() if hasattr(coordinator, "shared_views") else None,
+        "refresh_cycles": list(getattr(coordinator, "refresh_cycles", None) or []),
+        "section_updated_at": data.get("section_updated_at"),
+        "stale_sections": data.get("stale_sections"),
+        "courses_total": data.get("courses_total"),
+        "grades_total": data.get("grades_total"),
+        "options_applied": data.get("options_applied"),
+        "course_names_by_id": data.get("course_names_by_id"),
+        "counts": {
+            "assignments_by_course": _summarize_counts(data.get("assignments_by_course")),
+            "missing_by_course": _summarize_counts(data.get("missing_by_course")),
+            "undated_outstanding_by_course": _summarize_counts(data.get("undated_outstanding_by_course")),
+        },
+    }
+
+
 async def async_get_config_entry_diagnostics(
     hass: HomeAssistant,
     entry: ConfigEntry,
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
     domain_data = hass.data.get(DOMAIN, {})
-    coordinator = domain_data.get(entry.entry_id)
+    entry_data = domain_data.get(entry.entry_id) or {}
+    coordinator = entry_data.get("coordinator") if isinstance(entry_data, dict) else entry_data
 
     diag: dict[str, Any] = {
         "entry": {
@@ -53,25 +87,53 @@ async def async_get_config_entry_diagnostics(
         }
     }
 
+    # Import and setup timings of this entry (see async_setup_entry)
+    if isinstance(entry_data, dict) and entry_data.get("startup") is not None:
+        diag["startup"] = dict(entry_data["startup"])
+
     # Add coordinator snapshot (safe + summarized)
     if coordinator is not None:
-        data = getattr(coordinator, "data", {}) or {}
-
-        diag["coordinator"] = {
-            "last_update_success": getattr(coordinator, "last_update_success", None),
-            "last_update": getattr(coordinator, "last_update", None),
-            "update_interval": str(getattr(coordinator, "update_interval", None)),
-            "courses_total": data.get("courses_total"),
-            "grades_total": data.get("grades_total"),
-            "options_applied": data.get("options_applied"),
-            "course_names_by_id": data.get("course_names_by_id"),
-            "counts": {
-                "assignments_by_course": _summarize_counts(data.get("assignments_by_course")),
-                "missing_by_course": _summarize_counts(data.get("missing_by_course")),
-                "undated_outstanding_by_course": _summarize_counts(data.get("undated_outstanding_by_course")),
+        diag["coordinator"] = _coordinator_summary(coordinator)
+
+    # Observer entries: one coordinator per student plus the shared request cache
+    observer = entry_data.get("observer") if isinstance(entry_data, dict) else None
+    if observer is not None:
+        diag["observer"] = observer.as_dict()
+        diag["students"] = [
+            {"student_id": c.student_id, "student_name": c.student_name, **_coordinator_summary(c)}
+            for c in entry_data.get("coordinators") or []
+        ]
+
+    # Client request queue (priority classes, rate-limit budget, deferrals)
+    client = entry_data.get("client") if isinstance(entry_data, dict) else None
+    if client is not None and hasattr(client, "queue"):
+        diag["request_queue"] = client.queue.as_dict()
+        diag["json_decodes_offloaded"] = getattr(client, "offloaded_decodes", None)
+        # Last requests, oldest first (URLs/params redacted; host and token never included)
+        if hasattr(client, "trace"):
+            diag["request_trace"] = client.trace.as_list()
+
+    # Event-loop lag, state writes, and serialized sizes (computed only here, on demand)
+    monitor = hass.data.get(DATA_METRICS)
+    if monitor is not None:
+        registry = er.async_get(hass)
+        entity_ids = [e.entity_id for e in er.async_entries_for_config_entry(registry, entry.entry_id)]
+        diag["performance"] = {
+            **monitor.as_dict(),
+            "attribute_bytes": entity_payloads(hass, entity_ids),
+            "snapshot_bytes": {
+                c.unique_prefix: {"raw": payload_bytes(getattr(c, "_raw", None)), "data": payload_bytes(c.data)}
+                for c in (entry_data.get("coordinators") or [] if isinstance(entry_data, dict) else [])
             },
+            # Memoized GPA stages (hits mean a refresh reused unchanged GPA inputs)
+            "gpa_cache": gpa_cache_info(),
         }
 
+    # Domain-wide refresh schedule (phase offsets, concurrency, queueing)
+    scheduler = hass.data.get(DATA_SCHEDULER)
+    if scheduler is not None:
+        diag["schedule"] = scheduler.as_dict()
+
     # Redact anything that matches common secret-ish keys
     return async_redact_data(diag, TO_REDACT)
 
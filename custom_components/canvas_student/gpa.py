@@ -0,0 +1,270 @@
+"""Table-driven GPA engine.
+
+A GpaScale is plain data: the minimum percentage of each letter (looked up with
+a bisect over the sorted cutoffs), the grade points of each letter, and
+optional per-category bonuses for weighted scales (honors, AP, IB). The common
+US scales are presets; any other table can be given as JSON in the options.
+
+Results are memoized on their inputs. A course's grade points are keyed by
+(scale, score, letter, category) and the whole GPA by the tuple of every
+course's inputs including credits, so a refresh in which no grade, credit,
+weight or scale changed does no GPA work at all. Cached results are shared:
+treat them as read-only.
+"""
+from __future__ import annotations
+
+import json
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Any, Iterable, Mapping, NamedTuple
+
+# Minimum percentage per letter
+_PLUSMINUS_CUTOFFS = {
+    "A": 93, "A-": 90,
+    "B+": 87, "B": 83, "B-": 80,
+    "C+": 77, "C": 73, "C-": 70,
+    "D+": 67, "D": 63, "D-": 60,
+    "F": 0,
+}
+_PLUSMINUS_POINTS = {
+    "A+": 4.0, "A": 4.0, "A-": 3.7,
+    "B+": 3.3, "B": 3.0, "B-": 2.7,
+    "C+": 2.3, "C": 2.0, "C-": 1.7,
+    "D+": 1.3, "D": 1.0, "D-": 0.7,
+    "F": 0.0,
+}
+_PLAIN_CUTOFFS = {"A": 90, "B": 80, "C": 70, "D": 60, "F": 0}
+_PLAIN_POINTS = {"A": 4.0, "B": 3.0, "C": 2.0, "D": 1.0, "F": 0.0}
+# Added to a passing grade's points for courses tagged with the category
+_WEIGHTED_BONUSES = {"honors": 0.5, "ap": 1.0, "ib": 1.0}
+
+GPA_PRESETS: dict[str, dict[str, Any]] = {
+    "us_4_0_plusminus": {"cutoffs": _PLUSMINUS_CUTOFFS, "points": _PLUSMINUS_POINTS},
+    "us_4_0_plain": {"cutoffs": _PLAIN_CUTOFFS, "points": _PLAIN_POINTS},
+    "us_4_0_weighted": {"cutoffs": _PLUSMINUS_CUTOFFS, "points": _PLUSMINUS_POINTS, "weights": _WEIGHTED_BONUSES},
+}
+# Existing entries saved "us_4_0" for the plus/minus scale; it must keep meaning that
+GPA_PRESETS["us_4_0"] = GPA_PRESETS["us_4_0_plusminus"]
+DEFAULT_PRESET = "us_4_0_plusminus"
+CUSTOM_SCALE = "custom"
+
+
+def _letter_key(letter: Any) -> str:
+    return str(letter).strip().upper()
+
+
+class GpaScale:
+    """Immutable, hashable scale definition (usable as an lru_cache key)."""
+
+    __slots__ = ("key", "multiplier", "max_points", "_mins", "_letters", "_points", "_weights", "_ident")
+
+    def __init__(
+        self,
+        key: str,
+        cutoffs: Mapping[str, float],
+        points: Mapping[str, float],
+        weights: Mapping[str, float] | None = None,
+        multiplier: float = 1.0,
+    ) -> None:
+        ordered = sorted((float(v), _letter_key(k)) for k, v in cutoffs.items())
+        if not ordered:
+            raise ValueError("a GPA scale needs at least one cutoff")
+        self.key = key
+        self.multiplier = float(multiplier)
+        self._mins = [m for m, _ in ordered]
+        self._letters = [letter for _, letter in ordered]
+        self._points = {_letter_key(k): float(v) for k, v in points.items()}
+        self._weights = {str(k).strip().lower(): float(v) for k, v in (weights or {}).items()}
+        missing = [letter for letter in self._letters if letter not in self._points]
+        if missing:
+            raise ValueError(f"no grade points for {', '.join(missing)}")
+        # Top of the unweighted scale, used to normalize GPAs from different scales
+        self.max_points = max(self._points.values()) * self.multiplier
+        self._ident = (
+            key,
+            tuple(ordered),
+            tuple(sorted(self._points.items())),
+            tuple(sorted(self._weights.items())),
+            self.multiplier,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, GpaScale) and other._ident == self._ident
+
+    def __hash__(self) -> int:
+        return hash(self._ident)
+
+    def __repr__(self) -> str:
+        return f"GpaScale({self.key!r})"
+
+    @property
+    def weighted(self) -> bool:
+        return bool(self._weights)
+
+    def letter_for(self, score: float) -> str:
+        """Letter of a percentage: the highest cutoff at or below it (the lowest letter below all)."""
+        i = bisect_right(self._mins, score) - 1
+        return self._letters[max(i, 0)]
+
+    def points_for(self, letter: str) -> float | None:
+        """Grade points of a letter; "B+" falls back to "B" when the table has no +/- rows."""
+        key = _letter_key(letter)
+        if key not in self._points:
+            key = key.rstrip("+-")
+        gp = self._points.get(key)
+        return gp * self.multiplier if gp is not None else None
+
+    def bonus_for(self, category: str | None) -> float:
+        if not category:
+            return 0.0
+        return self._weights.get(category.strip().lower(), 0.0) * self.multiplier
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "key": self.key,
+            "cutoffs": dict(zip(self._letters, self._mins)),
+            "points": dict(self._points),
+            "weights": dict(self._weights),
+            "multiplier": self.multiplier,
+            "max_points": self.max_points,
+        }
+
+
+def validate_custom_scale(value: Any) -> GpaScale:
+    """Build the scale described by a custom-scale option; raises ValueError if it is unusable."""
+    if not isinstance(value, Mapping):
+        raise ValueError("custom scale must be an object")
+    cutoffs, points, weights = value.get("cutoffs"), value.get("points"), value.get("weights") or {}
+    if not isinstance(cutoffs, Mapping) or not isinstance(points, Mapping) or not isinstance(weights, Mapping):
+        raise ValueError('custom scale needs "cutoffs" and "points" objects')
+    try:
+        return GpaScale(CUSTOM_SCALE, cutoffs, points, weights)
+    except (TypeError, ValueError) as err:
+        raise ValueError(str(err)) from err
+
+
+@lru_cache(maxsize=32)
+def _scale_for(name: str, custom_json: str | None) -> GpaScale:
+    try:
+        # Legacy numeric option: the plus/minus scale stretched to that maximum
+        value = float(name)
+    except ValueError:
+        pass
+    else:
+        if value > 0:
+            return GpaScale(name, _PLUSMINUS_CUTOFFS, _PLUSMINUS_POINTS, multiplier=value / 4.0)
+        name = DEFAULT_PRESET
+    if name == CUSTOM_SCALE and custom_json:
+        try:
+            return validate_custom_scale(json.loads(custom_json))
+        except ValueError:
+            pass
+    preset = GPA_PRESETS.get(name) or GPA_PRESETS[DEFAULT_PRESET]
+    return GpaScale(name if name in GPA_PRESETS else DEFAULT_PRESET, **preset)
+
+
+def resolve_scale(value: Any, custom: Mapping[str, Any] | None = None) -> GpaScale:
+    """Scale for the gpa_scale option: a preset name, "custom" (with `custom`), or a number.
+
+    Unknown names and an invalid custom table fall back to the default preset.
+    """
+    name = str(value if value is not None else DEFAULT_PRESET).strip().lower()
+    custom_json = json.dumps(custom, sort_keys=True) if name == CUSTOM_SCALE and custom else None
+    return _scale_for(name, custom_json)
+
+
+@lru_cache(maxsize=4096)
+def course_contribution(scale: GpaScale, score: float | None, letter: str | None, category: str | None) -> float | None:
+    """Grade points one course contributes, or None if it has no usable grade."""
+    if not letter and score is not None:
+        letter = scale.letter_for(score)
+    gp = scale.points_for(letter) if letter else None
+    if gp is None:
+        return None
+    # Weighting bonuses never lift a failing grade
+    return gp + scale.bonus_for(category) if gp > 0 else gp
+
+
+class GpaResult(NamedTuple):
+    gpa: float | None
+    credits: float
+    quality_points: float
+    points_by_course: tuple[tuple[str, float], ...]
+    credits_by_course: tuple[tuple[str, float], ...]
+
+
+# (course id, score, letter, credits, category)
+CourseInput = tuple[str, float | None, str | None, float, str | None]
+
+
+@lru_cache(maxsize=64)
+def compute_gpa(scale: GpaScale, courses: tuple[CourseInput, ...]) -> GpaResult:
+    """Credit-weighted GPA over the courses that have both a grade and credits."""
+    points: list[tuple[str, float]] = []
+    credits: list[tuple[str, float]] = []
+    total_credits = 0.0
+    quality_points = 0.0
+    for cid, score, letter, cr, category in courses:
+        gp = course_contribution(scale, score, letter, category)
+        if gp is None:
+            continue
+        points.append((cid, gp))
+        credits.append((cid, cr))
+        total_credits += cr
+        quality_points += gp * cr
+    gpa = quality_points / total_credits if total_credits > 0 else None
+    return GpaResult(gpa, total_credits, quality_points, tuple(points), tuple(credits))
+
+
+def gpa_inputs(
+    grades_by_course: Mapping[str, Mapping[str, Any]],
+    credits_map: Mapping[str, float],
+    weights_map: Mapping[str, str],
+) -> tuple[CourseInput, ...]:
+    """Hashable per-course GPA inputs, in course order; courses without credits are left out."""
+    out: list[CourseInput] = []
+    for cid, g in grades_by_course.items():
+        cr = credits_map.get(cid)
+        if cr is None:
+            continue
+        score = g.get("current_score")
+        try:
+            score = float(score) if score is not None else None
+        except (TypeError, ValueError):
+            score = None
+        letter = g.get("current_grade")
+        out.append((cid, score, str(letter) if letter else None, float(cr), weights_map.get(cid)))
+    return tuple(out)
+
+
+def cumulative_gpa(parts: Iterable[Mapping[str, Any]]) -> dict[str, Any] | None:
+    """Credit-weighted GPA across schools from their quality points, credits and scale maximum.
+
+    Schools graded on the same maximum combine as-is; mixed maxima are first
+    normalized to 4.0.
+    """
+    usable = [p for p in parts if (p.get("gpa_credits") or 0) > 0 and (p.get("gpa_max_points") or 0) > 0]
+    if not usable:
+        return None
+    maxima = {float(p["gpa_max_points"]) for p in usable}
+    normalized = len(maxima) > 1
+    credits = sum(float(p["gpa_credits"]) for p in usable)
+    quality_points = sum(
+        float(p["gpa_quality_points"]) * (4.0 / float(p["gpa_max_points"]) if normalized else 1.0) for p in usable
+    )
+    return {
+        "gpa": quality_points / credits,
+        "credits": credits,
+        "quality_points": quality_points,
+        "scale_max": 4.0 if normalized else maxima.pop(),
+        "normalized": normalized,
+        "schools": len(usable),
+    }
+
+
+def cache_info() -> dict[str, Any]:
+    """Hit/miss counts of the memoized stages, for diagnostics."""
+    return {
+        name: fn.cache_info()._asdict()
+        for name, fn in (("gpa", compute_gpa), ("course", course_contribution), ("scale", _scale_for))
+    }
@@ -0,0 +1,160 @@
+"""Per-course grade history with compact, array-backed storage.
+
+`grades_by_course` only holds the current score, and following a trend through
+the recorder means storing the whole attribute blob on every change.
+GradeHistory keeps its own time series instead: one (timestamp, score) row per
+course, appended only when the score changes. Rows live in two parallel
+`array` columns per course (epoch seconds as 64-bit "q", so 32-bit hosts get
+past 2038; score), are persisted with HA's Store as plain column lists, and
+are thinned as they age: after
+GRADE_HISTORY_FULL_DAYS only the last row of each day is kept, and rows older
+than GRADE_HISTORY_MAX_DAYS are dropped (the newest of them stays as the
+baseline). Summaries (delta over 7 and 30 days, trend, last change) are bisects
+over the time column.
+"""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Any, Iterable, Mapping
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    GRADE_HISTORY_FULL_DAYS,
+    GRADE_HISTORY_MAX_DAYS,
+    GRADE_HISTORY_SAVE_DELAY,
+    GRADE_HISTORY_VERSION,
+    GRADE_TREND_MIN_DELTA,
+)
+
+_DAY = 86400
+
+
+def storage_key(unique_prefix: str) -> str:
+    return f"{DOMAIN}.grade_history.{unique_prefix}"
+
+
+class _Series:
+    """Parallel time/score columns of one course, oldest first."""
+
+    __slots__ = ("times", "scores")
+
+    def __init__(self, times: Iterable[int] = (), scores: Iterable[float] = ()) -> None:
+        self.times = array("q", times)
+        self.scores = array("d", scores)
+
+    def score_at(self, ts: float) -> float | None:
+        """Score in effect at `ts` (last row at or before it)."""
+        i = bisect_right(self.times, ts) - 1
+        return self.scores[i] if i >= 0 else None
+
+    def compact(self, now: float) -> bool:
+        """Thin aged rows; return True if anything was removed."""
+        full_floor = now - GRADE_HISTORY_FULL_DAYS * _DAY
+        if not self.times or self.times[0] >= full_floor:
+            return False
+        drop_floor = now - GRADE_HISTORY_MAX_DAYS * _DAY
+        times, scores = array("q"), array("d")
+        split = bisect_right(self.times, full_floor)
+        for i in range(split):
+            t = self.times[i]
+            # Beyond the horizon only the newest row survives, as the baseline
+            if t < drop_floor and i + 1 < split and self.times[i + 1] < drop_floor:
+                continue
+            # Older than the full-resolution window: one row (the last) per day
+            if i + 1 < split and self.times[i + 1] // _DAY == t // _DAY:
+                continue
+            times.append(t)
+            scores.append(self.scores[i])
+        times.extend(self.times[split:])
+        scores.extend(self.scores[split:])
+        changed = len(times) != len(self.times)
+        self.times, self.scores = times, scores
+        return changed
+
+
+class GradeHistory:
+    """Score change log per course, persisted per coordinator."""
+
+    def __init__(self, hass: HomeAssistant, unique_prefix: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, GRADE_HISTORY_VERSION, storage_key(unique_prefix))
+        self._series: dict[str, _Series] = {}
+        self._compacted_day: int | None = None
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load()
+        if not isinstance(stored, dict) or not isinstance(stored.get("courses"), dict):
+            return
+        for cid, cols in stored["courses"].items():
+            times, scores = cols.get("t") or [], cols.get("s") or []
+            if len(times) == len(scores):
+                self._series[cid] = _Series(times, scores)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"courses": {cid: {"t": s.times.tolist(), "s": s.scores.tolist()} for cid, s in self._series.items()}}
+
+    def record(self, grades: Mapping[str, Mapping[str, Any]], now: datetime) -> None:
+        """Append a row for every course whose current score differs from its last row."""
+        ts = int(now.timestamp())
+        changed = False
+        for cid, g in grades.items():
+            score = g.get("current_score") if isinstance(g, Mapping) else None
+            if score is None:
+                continue
+            try:
+                score = round(float(score), 2)
+            except (TypeError, ValueError):
+                continue
+            series = self._series.setdefault(cid, _Series())
+            if series.scores and series.scores[-1] == score:
+                continue
+            if series.times and ts <= series.times[-1]:
+                # Clock went backwards or two writes in one second: overwrite the last row
+                series.scores[-1] = score
+            else:
+                series.times.append(ts)
+                series.scores.append(score)
+            changed = True
+
+        # Aged rows are thinned at most once a day
+        day = ts // _DAY
+        if day != self._compacted_day:
+            self._compacted_day = day
+            changed = any([s.compact(ts) for s in self._series.values()]) or changed
+
+        if changed:
+            self._store.async_delay_save(self._data_to_save, GRADE_HISTORY_SAVE_DELAY)
+
+    def summary(self, cid: str, now: datetime) -> dict[str, Any] | None:
+        """Delta over 7/30 days, trend direction and time of the last change for one course."""
+        series = self._series.get(cid)
+        if series is None or not series.scores:
+            return None
+        ts = now.timestamp()
+        current = series.scores[-1]
+
+        def _delta(days: int) -> float | None:
+            then = series.score_at(ts - days * _DAY)
+            return round(current - then, 2) if then is not None else None
+
+        delta_7d = _delta(7)
+        if delta_7d is None or abs(delta_7d) < GRADE_TREND_MIN_DELTA:
+            trend = "flat"
+        else:
+            trend = "up" if delta_7d > 0 else "down"
+        return {
+            "delta_7d": delta_7d,
+            "delta_30d": _delta(30),
+            "trend": trend,
+            "last_change": datetime.fromtimestamp(series.times[-1], timezone.utc).isoformat(),
+        }
+
+    def summaries(self, course_ids: Iterable[str], now: datetime) -> dict[str, dict[str, Any]]:
+        return {cid: s for cid in course_ids if (s := self.summary(cid, now)) is not None}
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"courses": len(self._series), "rows": sum(len(s.times) for s in self._series.values())}
@@ -0,0 +1,152 @@
+"""Runtime performance instrumentation for Canvas Student.
+
+Many config entries on modest hardware can make the event loop stutter during
+crawls and attribute serialization. PerformanceMonitor measures that from
+inside the running integration, so scaling limits show up in diagnostics on
+the real installation (tests/test_load.py measures the same offline):
+
+* event-loop lag, only while debug logging is enabled for the integration: a
+  1 s timer records how late it fires, split into samples taken while a
+  refresh is running and while idle;
+* state writes per Canvas entity group (counts and recent rate);
+* on demand (diagnostics only), serialized state-attribute and snapshot sizes
+  as a proxy for recorder payload and memory per entry.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, EVENT_LOGGING_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.json import json_bytes
+
+from .const import DATA_METRICS, LOOP_LAG_INTERVAL_SECONDS, LOOP_LAG_SAMPLES, STATE_WRITE_WINDOW_SECONDS
+
+# Loop-lag sampling follows the integration's log level (Settings > "Enable debug logging")
+_PACKAGE_LOGGER = logging.getLogger(__package__)
+
+
+def percentiles(samples: list[float]) -> dict[str, float | None]:
+    """p50/p95/p99/max of a sample list (nearest-rank)."""
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None, "max": None, "count": 0}
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)  # noqa: E731
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": round(ordered[-1], 2), "count": len(ordered)}
+
+
+def payload_bytes(value: Any) -> int | None:
+    """Size of `value` serialized the way HA stores it, or None if it cannot be serialized."""
+    try:
+        return len(json_bytes(value))
+    except Exception:
+        return None
+
+
+class PerformanceMonitor:
+    """Event-loop lag sampler and state-write counters shared by all entries."""
+
+    def __init__(self, is_refreshing: Callable[[], bool]) -> None:
+        self._is_refreshing = is_refreshing
+        self._lag_refreshing: deque[float] = deque(maxlen=LOOP_LAG_SAMPLES)
+        self._lag_idle: deque[float] = deque(maxlen=LOOP_LAG_SAMPLES)
+        self._handle: asyncio.TimerHandle | None = None
+        self._expected = 0.0
+        # group (entry/student prefix or "all_schools") -> total writes, recent write times
+        self._writes: dict[str, int] = {}
+        self._recent: dict[str, deque[float]] = {}
+
+    # --- Loop lag ---
+
+    @property
+    def sampling(self) -> bool:
+        return self._handle is not None
+
+    @callback
+    def async_follow_logging(self, hass: HomeAssistant) -> None:
+        """Sample loop lag only while debug logging is enabled for the integration."""
+
+        @callback
+        def _apply(_: Event | None = None) -> None:
+            if _PACKAGE_LOGGER.isEnabledFor(logging.DEBUG):
+                self.start()
+            else:
+                self.stop()
+
+        _apply()
+        hass.bus.async_listen(EVENT_LOGGING_CHANGED, _apply)
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self.stop)
+
+    def start(self) -> None:
+        if self._handle is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._expected = loop.time() + LOOP_LAG_INTERVAL_SECONDS
+        self._handle = loop.call_at(self._expected, self._tick)
+
+    def stop(self, *_: Any) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _tick(self) -> None:
+        loop = asyncio.get_running_loop()
+        lag_ms = max(0.0, (loop.time() - self._expected) * 1000)
+        (self._lag_refreshing if self._is_refreshing() else self._lag_idle).append(lag_ms)
+        self._expected = loop.time() + LOOP_LAG_INTERVAL_SECONDS
+        self._handle = loop.call_at(self._expected, self._tick)
+
+    # --- State writes ---
+
+    def record_write(self, group: str) -> None:
+        self._writes[group] = self._writes.get(group, 0) + 1
+        now = time.monotonic()
+        recent = self._recent.setdefault(group, deque())
+        recent.append(now)
+        while recent and now - recent[0] > STATE_WRITE_WINDOW_SECONDS:
+            recent.popleft()
+
+    def as_dict(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "loop_lag_sampling": self.sampling,
+            "loop_lag_ms": {
+                "refreshing": percentiles(list(self._lag_refreshing)),
+                "idle": percentiles(list(self._lag_idle)),
+            },
+            "state_writes": {
+                group: {
+                    "total": total,
+                    f"last_{STATE_WRITE_WINDOW_SECONDS}s": sum(
+                        1 for t in self._recent.get(group, ()) if now - t <= STATE_WRITE_WINDOW_SECONDS
+                    ),
+                }
+                for group, total in self._writes.items()
+            },
+        }
+
+
+class MeteredEntity:
+    """Mixin counting state writes per entity group; put it before the HA entity base classes."""
+
+    _metrics_group: str = "unknown"
+
+    def async_write_ha_state(self) -> None:
+        super().async_write_ha_state()  # type: ignore[misc]
+        monitor: PerformanceMonitor | None = self.hass.data.get(DATA_METRICS)  # type: ignore[attr-defined]
+        if monitor is not None:
+            monitor.record_write(self._metrics_group)
+
+
+def entity_payloads(hass: HomeAssistant, entity_ids: list[str]) -> dict[str, int | None]:
+    """Serialized attribute size per entity (upper bound of what the recorder stores)."""
+    out: dict[str, int | None] = {}
+    for entity_id in entity_ids:
+        state = hass.states.get(entity_id)
+        if state is not None:
+            out[entity_id] = payload_bytes(dict(state.attributes))
+    return out
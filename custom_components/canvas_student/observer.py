@@ -0,0 +1,203 @@
+"""Observer-account mode: one token, many students, one crawl.
+
+A parent's observer token can read every observed student's courses, grades
+and submissions. Each student still gets an ordinary CanvasCoordinator, but its
+client is an ObserverStudentClient: a CanvasClient-shaped facade over one
+ObserverSession that
+
+* fetches shared data (assignment lists, announcements, probe endpoints) once
+  and hands the same response to every sibling student for a short TTL;
+* batches per-student data: one enrollments request per student covers every
+  course's grades, and one submissions request per course covers all students;
+* adds the student's own enrollments (last activity, grades) to the change
+  probe, since the parent's activity summary does not move with them;
+* de-duplicates in-flight requests and runs everything under one concurrency
+  budget, so N students do not multiply load on the Canvas instance.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Iterable
+
+from .const import OBSERVER_MAX_CONCURRENT_REQUESTS, OBSERVER_SHARED_TTL_SECONDS
+from .simple_client import CanvasClient
+
+
+class ObserverSession:
+    """Shared, short-lived response cache and request budget for one observer entry."""
+
+    def __init__(self, client: CanvasClient, student_ids: Iterable[str]) -> None:
+        self.client = client
+        self.student_ids = [str(s) for s in student_ids]
+        self._semaphore = asyncio.Semaphore(OBSERVER_MAX_CONCURRENT_REQUESTS)
+        self._cache: dict[tuple[Any, ...], tuple[float, Any]] = {}
+        self._inflight: dict[tuple[Any, ...], asyncio.Future[Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def cached(self, key: tuple[Any, ...], fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a fresh cached response for `key`, or fetch it once for all concurrent callers."""
+        hit = self._cache.get(key)
+        if hit is not None and time.monotonic() - hit[0] < OBSERVER_SHARED_TTL_SECONDS:
+            self.hits += 1
+            return hit[1]
+        if key in self._inflight:
+            self.hits += 1
+            return await asyncio.shield(self._inflight[key])
+
+        self.misses += 1
+        fut: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            async with self._semaphore:
+                result = await fetch()
+        except BaseException as err:
+            # Waiters must not hang when the fetch fails or is cancelled (refresh deadline)
+            if isinstance(err, Exception):
+                fut.set_exception(err)
+                # Mark retrieved so an un-awaited future does not log "exception never retrieved"
+                fut.exception()
+            else:
+                fut.cancel()
+            raise
+        else:
+            self._cache[key] = (time.monotonic(), result)
+            fut.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def forget(self, key: tuple[Any, ...]) -> None:
+        """Drop one cached response so the next cached() call fetches it again."""
+        self._cache.pop(key, None)
+
+    def invalidate(self, course_ids: Iterable[str] | None = None) -> None:
+        """Drop cached responses (for the given courses, or everything)."""
+        if course_ids is None:
+            self._cache.clear()
+            return
+        wanted = {str(c) for c in course_ids}
+        for key in [k for k in self._cache if len(k) > 1 and str(k[1]) in wanted]:
+            del self._cache[key]
+
+    async def submissions_by_student(self, course_id: str) -> dict[tuple[str, str], dict[str, Any]]:
+        """All observed students' submissions for a course, keyed by (student_id, assignment_id)."""
+
+        async def _fetch() -> dict[tuple[str, str], dict[str, Any]]:
+            subs = await self.client.list_student_submissions(course_id, self.student_ids)
+            return {(str(s.get("user_id")), str(s.get("assignment_id"))): s for s in subs or []}
+
+        return await self.cached(("submissions", course_id), _fetch)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "students": len(self.student_ids),
+            "cached_responses": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class ObserverStudentClient:
+    """CanvasClient-compatible view of one observed student, backed by an ObserverSession."""
+
+    def __init__(self, session: ObserverSession, student_id: str) -> None:
+        self._session = session
+        self.student_id = str(student_id)
+
+    @property
+    def base_url(self) -> str:
+        return self._session.client.base_url
+
+    @property
+    def queue(self):
+        return self._session.client.queue
+
+    @property
+    def trace(self):
+        return self._session.client.trace
+
+    def invalidate(self, course_ids: Iterable[str] | None = None) -> None:
+        """Drop cached responses for the given courses (or everything) and this student's own.
+
+        Grades come from the per-student enrollments response, which is keyed by
+        student rather than course, so it is always dropped.
+        """
+        self._session.invalidate(course_ids)
+        self._session.forget(("enrollments", self.student_id))
+        if course_ids is None:
+            self._session.forget(("courses", self.student_id))
+
+    # Shared across students
+
+    async def get_activity_stream_summary(self) -> list[dict[str, Any]]:
+        return await self._session.cached(("activity_summary",), self._session.client.get_activity_stream_summary)
+
+    async def get_todo_item_count(self) -> dict[str, Any]:
+        return await self._session.cached(("todo_count",), self._session.client.get_todo_item_count)
+
+    # Per student, for the change probe
+
+    async def get_student_activity(self) -> list[dict[str, Any]]:
+        """This student's per-course last activity and current grades.
+
+        The parent's activity summary and todo count do not move when a student
+        submits work or is graded, so the coordinator's change probe adds this.
+        The enrollments are fetched fresh and left in the shared cache, where the
+        crawl that follows a changed probe picks them up for its grades.
+        """
+        key = ("enrollments", self.student_id)
+        self._session.forget(key)
+        enrollments = await self._session.cached(key, lambda: self._session.client.list_user_enrollments(self.student_id))
+        return sorted(
+            (
+                {
+                    "course_id": str(e.get("course_id")),
+                    "last_activity_at": e.get("last_activity_at"),
+                    "grades": {k: (e.get("grades") or {}).get(k) for k in ("current_score", "current_grade")},
+                }
+                for e in enrollments or []
+            ),
+            key=lambda e: e["course_id"],
+        )
+
+    async def list_assignments(self, course_id: str, bucket: str | None = None) -> list[dict[str, Any]]:
+        return await self._session.cached(
+            ("assignments", course_id, bucket),
+            lambda: self._session.client.list_assignments(course_id, bucket=bucket),
+        )
+
+    async def get_announcements(self, context_codes: list[str], start_date, end_date) -> list[dict[str, Any]]:
+        return await self._session.cached(
+            ("announcements", tuple(sorted(context_codes))),
+            lambda: self._session.client.get_announcements(context_codes, start_date, end_date),
+        )
+
+    # Per student, batched
+
+    async def list_courses(self) -> list[dict[str, Any]]:
+        return await self._session.cached(
+            ("courses", self.student_id),
+            lambda: self._session.client.list_courses_for_user(self.student_id),
+        )
+
+    async def list_enrollments(self, course_id: str) -> list[dict[str, Any]]:
+        # One request per student covers the grades of every course
+        enrollments = await self._session.cached(
+            ("enrollments", self.student_id),
+            lambda: self._session.client.list_user_enrollments(self.student_id),
+        )
+        return [e for e in enrollments or [] if str(e.get("course_id")) == str(course_id)]
+
+    async def get_submission_self(self, course_id: str, assignment_id: str) -> dict[str, Any]:
+        subs = await self._session.submissions_by_student(course_id)
+        return subs.get((self.student_id, str(assignment_id))) or {}
+
+    async def list_submissions_self(self, course_id: str, workflow_state: str | None = None) -> list[dict[str, Any]]:
+        subs = await self._session.submissions_by_student(course_id)
+        return [
+            s
+            for (sid, _), s in subs.items()
+            if sid == self.student_id and (workflow_state is None or s.get("workflow_state") == workflow_state)
+        ]
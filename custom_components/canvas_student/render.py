@@ -0,0 +1,137 @@
+"""Server-side rendering of the all-schools Markdown cards.
+
+Produces the same output as the Jinja cards in `examples/cards/`, but once per
+data change in Python instead of on every frontend render. Timestamps are
+formatted in HA's local time zone like `timestamp_custom(fmt, true)`.
+"""
+from __future__ import annotations
+
+from html import escape
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+DISPLAY_FORMAT = "%b %d, %I:%M %p"
+
+
+def format_local(value: str | None) -> str | None:
+    """Format a Canvas timestamp for display, or None when missing/unparseable."""
+    if not value:
+        return None
+    dt = dt_util.parse_datetime(value)
+    if dt is None:
+        return None
+    return dt_util.as_local(dt).strftime(DISPLAY_FORMAT)
+
+
+def _link(url: str | None, text: Any) -> str:
+    label = escape(str(text if text is not None else ""))
+    return f'<a href="{escape(url)}">{label}</a>' if url else label
+
+
+def _school_header(school: dict[str, Any], with_gpa: bool = False) -> str:
+    name = escape(str(school.get("school_name") or "Canvas"))
+    gpa = school.get("gpa")
+    if with_gpa and isinstance(gpa, (int, float)):
+        scale_max = school.get("gpa_max_points")
+        out_of = f" / {scale_max:g}" if isinstance(scale_max, (int, float)) and scale_max != 4.0 else ""
+        return f"<h3>{name} — GPA: {round(gpa, 3)}{out_of}</h3>"
+    return f"<h3>{name}</h3>"
+
+
+def _render_upcoming(schools: list[dict[str, Any]]) -> list[str]:
+    out: list[str] = []
+    for s in schools:
+        hide = bool(s.get("hide_empty"))
+        if hide and s["total"] == 0:
+            continue
+        out.append(_school_header(s, with_gpa=True))
+        if s["total"] == 0:
+            out.append("_No upcoming assignments._<br>")
+            continue
+        for c in s["courses"]:
+            if hide and c["count"] == 0:
+                continue
+            line = f"<strong>{_link(c.get('course_url'), c['course_name'])}</strong> — {c['count']}"
+            if c.get("credits"):
+                line += f" • {c['credits']} cr"
+            if c.get("grade_text"):
+                line += f" — Grade: {_link(c.get('grade_url'), c['grade_text'])}"
+            elif c.get("grade_url"):
+                line += f" — {_link(c['grade_url'], 'Gradebook')}"
+            out.append(line + "<br>")
+            for a in c["items"]:
+                due = f" — {a['due_display']}" if a.get("due_display") else ""
+                out.append(f"• {_link(a.get('html_url'), a.get('name'))}{due}<br>")
+            out.append("<br>")
+    return out
+
+
+def _render_missing(schools: list[dict[str, Any]]) -> list[str]:
+    out: list[str] = []
+    for s in schools:
+        if s.get("hide_empty") and s["total"] == 0:
+            continue
+        out.append(_school_header(s))
+        if s["total"] == 0:
+            out.append("_No missing work._<br>")
+            continue
+        for c in s["courses"]:
+            out.append(f"<strong>{_link(c.get('course_url'), c['course_name'])}</strong> — {c['count']}<br>")
+            for a in c["items"]:
+                due = f" — {a['due_display']}" if a.get("due_display") else ""
+                out.append(f"• {_link(a.get('html_url'), a.get('name'))}{due}<br>")
+            out.append("<br>")
+    return out
+
+
+def _render_awaiting_grading(schools: list[dict[str, Any]]) -> list[str]:
+    out: list[str] = []
+    for s in schools:
+        if s["total"] == 0:
+            continue
+        out.append(_school_header(s))
+        for c in s["courses"]:
+            out.append(f"<strong>{escape(str(c['course_name']))}</strong> — {c['count']} awaiting grading<br>")
+            for a in c["items"]:
+                line = f"• {_link(a.get('html_url'), a.get('name'))}"
+                if a.get("submitted_display"):
+                    line += f" — Submitted {a['submitted_display']}"
+                if a.get("due_display"):
+                    line += f" — Due {a['due_display']}"
+                out.append(line + "<br>")
+            out.append("<br>")
+    return out
+
+
+def _render_announcements(schools: list[dict[str, Any]]) -> list[str]:
+    out: list[str] = []
+    for s in schools:
+        if s.get("hide_empty") and s["total"] == 0:
+            continue
+        out.append(_school_header(s))
+        if s["total"] == 0:
+            out.append("_No recent announcements._<br>")
+            continue
+        for c in s["courses"]:
+            out.append(f"<strong>{_link(c.get('course_url'), c['course_name'])}</strong><br>")
+            for a in c["items"]:
+                posted = f" — {a['posted_display']}" if a.get("posted_display") else ""
+                out.append(f"• {_link(a.get('html_url'), a.get('title'))}{posted}<br>")
+        out.append("<br>")
+    return out
+
+
+_RENDERERS = {
+    "upcoming": (_render_upcoming, "_No upcoming assignments._"),
+    "missing": (_render_missing, "_No missing work._"),
+    "awaiting_grading": (_render_awaiting_grading, "_No ungraded assignments found._"),
+    "announcements": (_render_announcements, "_No recent announcements._"),
+}
+
+
+def render_markdown(kind: str, merged: dict[str, Any]) -> str:
+    """Render one aggregate kind to the Markdown/HTML a markdown card can show verbatim."""
+    renderer, empty = _RENDERERS[kind]
+    lines = renderer(merged.get("schools") or [])
+    return "\n".join(lines) if lines else empty
@@ -0,0 +1,150 @@
+"""Priority scheduling for Canvas API requests.
+
+Every CanvasClient request waits for a slot in its RequestQueue. Slots are
+handed out in priority order (see PRIORITY_* in const.py) under a global cap
+and a per-class cap, so a long tail of historical submission checks cannot
+hold up grades and upcoming work. A request that waits longer than its class
+deadline, or that starts while the rate-limit budget is below its class's
+reserve, raises CanvasRequestDeferred; callers keep the previous value and
+pick the work up on the next refresh.
+
+The priority of a request is taken from the `request_priority` context
+variable, so callers mark a whole section with `with priority(PRIORITY_LOW):`
+instead of threading a parameter through every client method.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Iterator, Mapping
+
+from .const import (
+    PRIORITY_NORMAL,
+    RATE_LIMIT_RESERVE,
+    REQUEST_CLASS_DEADLINES,
+    REQUEST_CLASS_LIMITS,
+    REQUEST_MAX_CONCURRENT,
+)
+
+request_priority: ContextVar[int] = ContextVar("canvas_request_priority", default=PRIORITY_NORMAL)
+
+
+@contextmanager
+def priority(level: int) -> Iterator[None]:
+    """Run the enclosed client calls (and tasks created inside) at `level`."""
+    token = request_priority.set(level)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+class CanvasRequestDeferred(Exception):
+    """Request was not sent (budget exhausted or queue deadline passed); retry next cycle."""
+
+
+class RequestQueue:
+    """Priority-ordered request slots with per-class concurrency and queue deadlines."""
+
+    def __init__(
+        self,
+        max_concurrent: int = REQUEST_MAX_CONCURRENT,
+        class_limits: Mapping[int, int] = REQUEST_CLASS_LIMITS,
+        deadlines: Mapping[int, float] = REQUEST_CLASS_DEADLINES,
+        reserves: Mapping[int, float] = RATE_LIMIT_RESERVE,
+    ) -> None:
+        self.max_concurrent = max(1, int(max_concurrent))
+        self._limits = dict(class_limits)
+        self._deadlines = dict(deadlines)
+        self._reserves = dict(reserves)
+        self._running: dict[int, int] = {p: 0 for p in self._limits}
+        # (priority, arrival order, future) waiting for a slot
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        # Last X-Rate-Limit-Remaining reported by Canvas (None until seen)
+        self.rate_remaining: float | None = None
+        self.stats: dict[int, dict[str, Any]] = {
+            p: {"sent": 0, "deferred": 0, "max_wait_s": 0.0} for p in self._limits
+        }
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """Record the remaining rate-limit budget from a Canvas response."""
+        value = headers.get("X-Rate-Limit-Remaining") or headers.get("x-rate-limit-remaining")
+        if value is None:
+            return
+        try:
+            self.rate_remaining = float(value)
+        except ValueError:
+            pass
+
+    def _admissible(self, prio: int) -> bool:
+        return (
+            sum(self._running.values()) < self.max_concurrent
+            and self._running.get(prio, 0) < self._limits.get(prio, self.max_concurrent)
+        )
+
+    def _wake(self) -> None:
+        """Grant free slots to waiters, highest priority (then oldest) first."""
+        self._waiters = [w for w in self._waiters if not w[2].done()]
+        self._waiters.sort(key=lambda w: (w[0], w[1]))
+        for w in list(self._waiters):
+            if sum(self._running.values()) >= self.max_concurrent:
+                break
+            if self._admissible(w[0]):
+                self._running[w[0]] = self._running.get(w[0], 0) + 1
+                w[2].set_result(None)
+                self._waiters.remove(w)
+
+    def _release(self, prio: int) -> None:
+        self._running[prio] -= 1
+        self._wake()
+
+    def _defer(self, prio: int, reason: str) -> CanvasRequestDeferred:
+        self.stats.setdefault(prio, {"sent": 0, "deferred": 0, "max_wait_s": 0.0})["deferred"] += 1
+        return CanvasRequestDeferred(reason)
+
+    @asynccontextmanager
+    async def slot(self, prio: int | None = None) -> AsyncIterator[None]:
+        """Hold one request slot; raises CanvasRequestDeferred instead of waiting past the deadline."""
+        prio = request_priority.get() if prio is None else prio
+        reserve = self._reserves.get(prio)
+        if reserve is not None and self.rate_remaining is not None and self.rate_remaining < reserve:
+            raise self._defer(prio, f"rate-limit budget {self.rate_remaining:.0f} below reserve {reserve:.0f}")
+
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append((prio, next(self._seq), fut))
+        self._wake()
+        queued = time.monotonic()
+        if not fut.done():
+            try:
+                async with asyncio.timeout(self._deadlines.get(prio)):
+                    await fut
+            except BaseException as err:
+                # The slot may have been granted just as the wait was cancelled
+                if fut.done() and not fut.cancelled():
+                    self._release(prio)
+                else:
+                    fut.cancel()
+                if isinstance(err, TimeoutError):
+                    raise self._defer(prio, f"queued longer than {self._deadlines.get(prio)}s") from None
+                raise
+
+        stats = self.stats.setdefault(prio, {"sent": 0, "deferred": 0, "max_wait_s": 0.0})
+        stats["sent"] += 1
+        stats["max_wait_s"] = max(stats["max_wait_s"], round(time.monotonic() - queued, 3))
+        try:
+            yield
+        finally:
+            self._release(prio)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Queue state for diagnostics."""
+        return {
+            "rate_remaining": self.rate_remaining,
+            "running": dict(self._running),
+            "waiting": sum(1 for w in self._waiters if not w[2].done()),
+            "classes": {p: dict(s) for p, s in self.stats.items()},
+        }
@@ -0,0 +1,97 @@
+"""Domain-wide refresh orchestration for Canvas Student entries.
+
+Every config entry (school/student) owns its own coordinator. Without help they
+all start at HA boot and then poll on the same aligned intervals, so several full
+Canvas crawls land at once. The scheduler spreads them out:
+
+* each entry gets a random phase offset that is added to its first scheduled
+  interval, so polls drift apart instead of firing together (coordinators of
+  one observer entry share a group offset so they hit a warm shared cache);
+* a global semaphore caps how many entries may crawl concurrently.
+
+The first refresh at setup is not delayed by the offset (entities would stay
+unavailable for up to a whole interval); the boot-time burst is only capped
+by the semaphore.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Any, AsyncIterator
+
+from .const import MAX_CONCURRENT_REFRESHES
+
+
+class RefreshScheduler:
+    """Assign phase offsets and gate concurrent refreshes across all entries."""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_REFRESHES) -> None:
+        self.max_concurrent = max(1, int(max_concurrent))
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._entries: dict[str, dict[str, Any]] = {}
+
+    def register(self, entry_id: str, interval: timedelta, group: str | None = None) -> timedelta:
+        """Register an entry and return its jittered phase offset.
+
+        Entries registered with the same `group` get the same offset.
+        """
+        offset = next(
+            (
+                timedelta(seconds=info["phase_offset_s"])
+                for info in self._entries.values()
+                if group is not None and info.get("group") == group
+            ),
+            None,
+        )
+        if offset is None:
+            offset = timedelta(seconds=round(random.uniform(0, max(interval.total_seconds(), 0)), 1))
+        self._entries[entry_id] = {
+            "group": group,
+            "phase_offset_s": round(offset.total_seconds(), 1),
+            "state": "idle",
+            "refreshes": 0,
+            "last_wait_s": None,
+            "last_run_s": None,
+        }
+        return offset
+
+    def unregister(self, entry_id: str) -> None:
+        self._entries.pop(entry_id, None)
+
+    @asynccontextmanager
+    async def slot(self, entry_id: str) -> AsyncIterator[None]:
+        """Hold one of the global refresh slots for the duration of a crawl.
+
+        Entries that are not (or no longer) registered still queue for a slot,
+        but their bookkeeping is not kept.
+        """
+        info = self._entries.get(entry_id, {})
+        info["state"] = "waiting"
+        queued = time.monotonic()
+        async with self._semaphore:
+            started = time.monotonic()
+            info["state"] = "running"
+            info["last_wait_s"] = round(started - queued, 3)
+            try:
+                yield
+            finally:
+                info["state"] = "idle"
+                info["refreshes"] = info.get("refreshes", 0) + 1
+                info["last_run_s"] = round(time.monotonic() - started, 3)
+
+    @property
+    def busy(self) -> bool:
+        """True while any entry is crawling or waiting to."""
+        return any(i.get("state") in ("running", "waiting") for i in self._entries.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the current schedule for diagnostics."""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": sum(1 for i in self._entries.values() if i.get("state") == "running"),
+            "waiting": sum(1 for i in self._entries.values() if i.get("state") == "waiting"),
+            "entries": {k: dict(v) for k, v in self._entries.items()},
+        }
@@ -1,5 +1,6 @@
 
 from __future__ import annotations
+from functools import lru_cache
 from typing import Any
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.helpers.entity import EntityCategory
@@ -7,28 +8,52 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from .const import DOMAIN, OPT_HIDE_EMPTY
+from homeassistant.util.read_only_dict import ReadOnlyDict
+from .aggregate import AGGREGATE_KINDS, CanvasAggregate
+from .const import DATA_AGGREGATE, DEFAULT_ATTRIBUTES_COUNTS_ONLY, DOMAIN, OPT_ATTRIBUTES_COUNTS_ONLY, OPT_HIDE_EMPTY
 from .coordinator import CanvasCoordinator
+from .metrics import MeteredEntity
 
-def _base_attrs(entry: ConfigEntry) -> dict[str, Any]:
-    return {"school_name": entry.data.get("school_name"), "student_name": entry.data.get("student_name"), "base_url": entry.data.get("base_url"), "hide_empty": entry.options.get(OPT_HIDE_EMPTY, False)}
+@lru_cache(maxsize=64)
+def _shared_base_attrs(school_name: str | None, student_name: str | None, base_url: str | None, hide_empty: bool) -> ReadOnlyDict[str, Any]:
+    return ReadOnlyDict({"school_name": school_name, "student_name": student_name, "base_url": base_url, "hide_empty": hide_empty})
+
+def _base_attrs(coord: CanvasCoordinator, entry: ConfigEntry) -> ReadOnlyDict[str, Any]:
+    # Built once per school/student/options and shared by every sensor of the entry
+    return _shared_base_attrs(entry.data.get("school_name"), coord.student_name, entry.data.get("base_url"), bool(entry.options.get(OPT_HIDE_EMPTY, False)))
+
+def _counts_only(entry: ConfigEntry) -> bool:
+    return bool(entry.options.get(OPT_ATTRIBUTES_COUNTS_ONLY, DEFAULT_ATTRIBUTES_COUNTS_ONLY))
+
+def _counts_by_course(by_course: dict[str, list[Any]]) -> dict[str, int]:
+    return {cid: len(v) for cid, v in by_course.items()}
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
-    coord: CanvasCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
-    ents = [
-    CanvasCoursesSensor(coord, entry),
-    CanvasGradesSensor(coord, entry),
-    CanvasAssignmentsSensor(coord, entry),
-    CanvasAnnouncementsSensor(coord, entry),
-    CanvasMissingSensor(coord, entry),
-    CanvasUndatedOutstandingSensor(coord, entry),
-    CanvasInfoSensor(coord, entry),
-    CanvasGpaSensor(coord, entry),
-]
+    ents = []
+    for coord in hass.data[DOMAIN][entry.entry_id]["coordinators"]:
+        ents += [
+            CanvasCoursesSensor(coord, entry),
+            CanvasGradesSensor(coord, entry),
+            CanvasAssignmentsSensor(coord, entry),
+            CanvasAnnouncementsSensor(coord, entry),
+            CanvasMissingSensor(coord, entry),
+            CanvasUndatedOutstandingSensor(coord, entry),
+            CanvasInfoSensor(coord, entry),
+            CanvasGpaSensor(coord, entry),
+        ]
 
     async_add_entities(ents)
 
-class CanvasUndatedOutstandingSensor(SensorEntity):
+    # Domain-wide "all schools" sensors are hosted by one entry's platform at a time
+    aggregate: CanvasAggregate = hass.data[DATA_AGGREGATE]
+    aggregate.async_register_platform(
+        entry.entry_id,
+        async_add_entities,
+        lambda: [*(CanvasAggregateSensor(aggregate, kind) for kind in AGGREGATE_KINDS), CanvasAggregateGpaSensor(aggregate)],
+    )
+    entry.async_on_unload(lambda: aggregate.async_unregister_platform(entry.entry_id))
+
+class CanvasUndatedOutstandingSensor(MeteredEntity, SensorEntity):
     _attr_icon = "mdi:clipboard-text-outline"
 
     def __init__(self, coordinator, entry):
@@ -39,7 +64,14 @@ class CanvasUndatedOutstandingSensor(SensorEntity):
         # via attributes. If you truly want ONE ENTITY PER COURSE, tell me and
         # we’ll generate entities dynamically from course IDs instead.
         self._attr_name = "Canvas Undated Outstanding (by course)"
-        self._attr_unique_id = f"{entry.entry_id}_undated_outstanding_by_course"
+        if coordinator.student_id is not None:
+            self._attr_name += f" - {coordinator.student_name}"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_undated_outstanding_by_course"
+        self._metrics_group = coordinator.unique_prefix
+
+    @property
+    def available(self) -> bool:
+        return self.coordinator.last_update_success and self.coordinator.data is not None
 
     @property
     def native_value(self):
@@ -62,42 +94,58 @@ class CanvasUndatedOutstandingSensor(SensorEntity):
             counts[cname] = len(items)
             details[cname] = items
 
+        if _counts_only(self.entry):
+            return {"counts_by_course": counts}
         return {
             "counts_by_course": counts,
             "outstanding_undated_by_course": details,
         }
 
     async def async_added_to_hass(self):
-        self.coordinator.async_add_listener(self.async_write_ha_state)
+        # DataUpdateCoordinator has no async_remove_listener; unsubscribe on removal instead
+        self.async_on_remove(self.coordinator.async_add_listener(self.async_write_ha_state))
 
-    async def async_will_remove_from_hass(self):
-        self.coordinator.async_remove_listener(self.async_write_ha_state)
-        
-class _BaseCanvasSensor(CoordinatorEntity, SensorEntity):
+class _BaseCanvasSensor(MeteredEntity, CoordinatorEntity, SensorEntity):
     def __init__(self, coordinator: CanvasCoordinator, entry: ConfigEntry, name_suffix: str, icon: str) -> None:
         super().__init__(coordinator)
         self._entry = entry
-        self._attr_name = f"Canvas ({entry.data.get('school_name')} - {entry.data.get('student_name') or 'Student'}) {name_suffix}"
-        self._attr_unique_id = f"{entry.entry_id}_v2_{name_suffix.lower().replace(' ', '_')}"
+        self._attr_name = f"Canvas ({entry.data.get('school_name')} - {coordinator.student_name or 'Student'}) {name_suffix}"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_v2_{name_suffix.lower().replace(' ', '_')}"
+        self._metrics_group = coordinator.unique_prefix
         self._attr_icon = icon
+        # Attributes of the last published data/options, built once and reused until either changes
+        self._attrs: dict[str, Any] | None = None
+        self._attrs_source: tuple[Any, Any] | None = None
+    @property
+    def available(self) -> bool:
+        # Platforms are set up while the first refresh runs; no data yet means unavailable
+        return super().available and self.coordinator.data is not None
+    def _own_attributes(self, d: dict[str, Any]) -> dict[str, Any]:
+        """The sensor's attributes on top of the shared base ones."""
+        return {}
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        d = self.coordinator.data or {}; options = self._entry.options; source = self._attrs_source
+        if self._attrs is None or source is None or source[0] is not d or source[1] is not options:
+            self._attrs = {**_base_attrs(self.coordinator, self._entry), **self._own_attributes(d)}; self._attrs_source = (d, options)
+        return self._attrs
 
 class CanvasCoursesSensor(_BaseCanvasSensor):
     def __init__(self, coordinator: CanvasCoordinator, entry: ConfigEntry) -> None:
         super().__init__(coordinator, entry, "Courses", "mdi:book-multiple")
     @property
     def native_value(self): return (self.coordinator.data or {}).get("courses_total", 0)
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        d = self.coordinator.data or {}; out = _base_attrs(self._entry); out["course_names_by_id"] = d.get("course_names_by_id", {}); return out
+    def _own_attributes(self, d: dict[str, Any]) -> dict[str, Any]: return {"course_names_by_id": d.get("course_names_by_id", {})}
 
 class CanvasGradesSensor(_BaseCanvasSensor):
+    # Trends change with every score change; the grade history already keeps them
+    _unrecorded_attributes = frozenset({"grade_trends_by_course"})
     def __init__(self, coordinator: CanvasCoordinator, entry: ConfigEntry) -> None:
         super().__init__(coordinator, entry, "Grades", "mdi:chart-bar")
     @property
     def native_value(self): return (self.coordinator.data or {}).get("grades_total", 0)
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        d = self.coordinator.data or {}; out = _base_attrs(self._entry); out["grades_by_course"] = d.get("grades_by_course", {}); out["grade_urls_by_course"] = d.get("grade_urls_by_course", {}); out["course_names_by_id"] = d.get("course_names_by_id", {}); return out
+    def _own_attributes(self, d: dict[str, Any]) -> dict[str, Any]:
+        return {"grades_by_course": d.get("grades_by_course", {}), "grade_trends_by_course": d.get("grade_trends_by_course", {}), "grade_urls_by_course": d.get("grade_urls_by_course", {}), "course_names_by_id": d.get("course_names_by_id", {})}
 
 class CanvasAssignmentsSensor(_BaseCanvasSensor):
     def __init__(self, coordinator: CanvasCoordinator, entry: ConfigEntry) -> None:
@@ -105,9 +153,11 @@ class CanvasAssignmentsSensor(_BaseCanvasSensor):
     @property
     def native_value(self):
         d = self.coordinator.data or {}; return sum(len(v) for v in (d.get("assignments_by_course") or {}).values())
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        d = self.coordinator.data or {}; out = _base_attrs(self._entry); out["assignments_by_course"] = d.get("assignments_by_course", {}); out["course_names_by_id"] = d.get("course_names_by_id", {}); return out
+    def _own_attributes(self, d: dict[str, Any]) -> dict[str, Any]:
+        out: dict[str, Any] = {"course_names_by_id": d.get("course_names_by_id", {})}
+        if _counts_only(self._entry): out["counts_by_course"] = _counts_by_course(d.get("assignments_by_course", {}))
+        else: out["assignments_by_course"] = d.get("assignments_by_course", {})
+        return out
 
 class CanvasAnnouncementsSensor(_BaseCanvasSensor):
     def __init__(self, coordinator: CanvasCoordinator, entry: ConfigEntry) -> None:
@@ -115,9 +165,14 @@ class CanvasAnnouncementsSensor(_BaseCanvasSensor):
     @property
     def native_value(self):
         d = self.coordinator.data or {}; return len(d.get("announcements") or [])
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        d = self.coordinator.data or {}; out = _base_attrs(self._entry); out["announcements"] = d.get("announcements", []); out["course_names_by_id"] = d.get("course_names_by_id", {}); return out
+    def _own_attributes(self, d: dict[str, Any]) -> dict[str, Any]:
+        out: dict[str, Any] = {"course_names_by_id": d.get("course_names_by_id", {})}
+        if _counts_only(self._entry):
+            counts: dict[str, int] = {}
+            for a in d.get("announcements") or []: counts[str(a.get("course_id"))] = counts.get(str(a.get("course_id")), 0) + 1
+            out["counts_by_course"] = counts
+        else: out["announcements"] = d.get("announcements", [])
+        return out
 
 class CanvasMissingSensor(_BaseCanvasSensor):
     def __init__(self, coordinator: CanvasCoordinator, entry: ConfigEntry) -> None:
@@ -125,20 +180,23 @@ class CanvasMissingSensor(_BaseCanvasSensor):
     @property
     def native_value(self):
         d = self.coordinator.data or {}; missing = d.get("missing_by_course") or {}; return sum(len(v) for v in missing.values())
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        d = self.coordinator.data or {}; out = _base_attrs(self._entry); missing = d.get("missing_by_course", {}); out["missing_by_course"] = missing; out["missing_total"] = sum(len(v) for v in missing.values()); out["course_names_by_id"] = d.get("course_names_by_id", {}); return out
+    def _own_attributes(self, d: dict[str, Any]) -> dict[str, Any]:
+        out: dict[str, Any] = {}; missing = d.get("missing_by_course", {})
+        if _counts_only(self._entry): out["counts_by_course"] = _counts_by_course(missing)
+        else: out["missing_by_course"] = missing
+        out["missing_total"] = sum(len(v) for v in missing.values()); out["course_names_by_id"] = d.get("course_names_by_id", {}); return out
 
 class CanvasInfoSensor(_BaseCanvasSensor):
     def __init__(self, coordinator: CanvasCoordinator, entry: ConfigEntry) -> None:
         super().__init__(coordinator, entry, "Info", "mdi:information-outline")
     @property
     def native_value(self): return "ok"
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        d = self.coordinator.data or {}; out = _base_attrs(self._entry)
+    def _own_attributes(self, d: dict[str, Any]) -> dict[str, Any]:
+        out: dict[str, Any] = {}
         out["courses_total"] = d.get("courses_total", 0); out["grades_total"] = d.get("grades_total", 0)
         out["grade_urls_by_course"] = d.get("grade_urls_by_course", {}); out["options_applied"] = d.get("options_applied", {})
+        out["concluded_course_ids"] = d.get("concluded_course_ids", [])
+        out["section_updated_at"] = d.get("section_updated_at", {}); out["stale_sections"] = d.get("stale_sections", [])
         out["credits_by_course"] = d.get("credits_by_course", {}); out["grade_points_by_course"] = d.get("grade_points_by_course", {})
         out["gpa"] = d.get("gpa"); out["gpa_credits"] = d.get("gpa_credits", 0.0); out["gpa_quality_points"] = d.get("gpa_quality_points", 0.0)
         return out
@@ -151,9 +209,60 @@ class CanvasGpaSensor(_BaseCanvasSensor):
         g = (self.coordinator.data or {}).get("gpa")
         try: return round(float(g), 3) if g is not None else None
         except Exception: return None
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        d = self.coordinator.data or {}; out = _base_attrs(self._entry)
+    def _own_attributes(self, d: dict[str, Any]) -> dict[str, Any]:
+        out: dict[str, Any] = {}
         out["gpa"] = d.get("gpa"); out["gpa_credits"] = d.get("gpa_credits", 0.0); out["gpa_quality_points"] = d.get("gpa_quality_points", 0.0)
+        out["gpa_scale"] = (d.get("options_applied") or {}).get("gpa_scale"); out["gpa_max_points"] = d.get("gpa_max_points")
         out["grade_points_by_course"] = d.get("grade_points_by_course", {}); out["credits_by_course"] = d.get("credits_by_course", {}); out["course_names_by_id"] = d.get("course_names_by_id", {})
         return out
+
+_AGGREGATE_LABELS = {
+    "missing": ("Missing", "mdi:alert-circle-outline"),
+    "upcoming": ("Assignments", "mdi:calendar-clock"),
+    "awaiting_grading": ("Awaiting Grading", "mdi:timer-sand"),
+    "announcements": ("Announcements", "mdi:bullhorn"),
+}
+
+class CanvasAggregateSensor(MeteredEntity, SensorEntity):
+    """All schools merged: state is the total, attributes are pre-sorted and grouped by school and course."""
+    _attr_should_poll = False
+    # Large and derived from data already recorded per school; keep it out of the recorder
+    _unrecorded_attributes = frozenset({"schools", "markdown"})
+    _metrics_group = "all_schools"
+
+    def __init__(self, aggregate: CanvasAggregate, kind: str) -> None:
+        label, icon = _AGGREGATE_LABELS[kind]
+        self._aggregate = aggregate
+        self._kind = kind
+        self._attr_name = f"Canvas All Schools {label}"
+        self._attr_unique_id = f"{DOMAIN}_all_schools_{kind}"
+        self._attr_icon = icon
+    @property
+    def native_value(self): return self._aggregate.merged(self._kind)["total"]
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        m = self._aggregate.merged(self._kind)
+        return {"total": m["total"], "schools": m["schools"], "markdown": self._aggregate.rendered(self._kind)}
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self._aggregate.async_add_listener(self._kind, self.async_write_ha_state))
+
+class CanvasAggregateGpaSensor(MeteredEntity, SensorEntity):
+    """Cumulative GPA across schools; the state is set when every school belongs to one student."""
+    _attr_should_poll = False
+    _attr_icon = "mdi:school-outline"
+    _metrics_group = "all_schools"
+
+    def __init__(self, aggregate: CanvasAggregate) -> None:
+        self._aggregate = aggregate
+        self._attr_name = "Canvas All Schools GPA"
+        self._attr_unique_id = f"{DOMAIN}_all_schools_gpa"
+    @property
+    def native_value(self):
+        by_student = self._aggregate.cumulative_gpa()
+        return round(next(iter(by_student.values()))["gpa"], 3) if len(by_student) == 1 else None
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {"by_student": self._aggregate.cumulative_gpa()}
+    async def async_added_to_hass(self) -> None:
+        # GPA inputs ride along in the upcoming slices
+        self.async_on_remove(self._aggregate.async_add_listener("upcoming", self.async_write_ha_state))
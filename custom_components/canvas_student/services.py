@@ -0,0 +1,98 @@
+"""Services for the Canvas Student integration."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_COURSE_ID,
+    ATTR_SECTIONS,
+    CASSETTE_DIR,
+    DOMAIN,
+    REFRESH_SECTIONS,
+    SERVICE_CAPTURE_CASSETTE,
+    SERVICE_REFRESH,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_COURSE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_SECTIONS, default=list(REFRESH_SECTIONS)): vol.All(
+            cv.ensure_list, [vol.In(REFRESH_SECTIONS)]
+        ),
+    }
+)
+
+CAPTURE_SCHEMA = vol.Schema({vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string})
+
+
+async def _async_handle_refresh(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Re-fetch selected sections for selected courses, across one or all entries."""
+    domain_data = hass.data.get(DOMAIN, {})
+    entry_ids = call.data.get(ATTR_CONFIG_ENTRY_ID) or list(domain_data)
+    unknown = [eid for eid in entry_ids if eid not in domain_data]
+    if unknown:
+        raise ServiceValidationError(f"Unknown Canvas Student config entry: {', '.join(unknown)}")
+
+    course_ids = call.data.get(ATTR_COURSE_ID) or None
+    sections = call.data[ATTR_SECTIONS]
+    for eid in entry_ids:
+        for coord in domain_data[eid]["coordinators"]:
+            await coord.async_refresh_partial(course_ids, sections)
+
+
+async def _async_handle_capture(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Run a complete crawl of one entry and save its sanitized traffic as a cassette."""
+    entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+    entry_data = hass.data.get(DOMAIN, {}).get(entry_id)
+    if entry_data is None:
+        raise ServiceValidationError(f"Unknown Canvas Student config entry: {entry_id}")
+
+    client = entry_data["client"]
+    recorder = client.start_capture()
+    try:
+        for coord in entry_data["coordinators"]:
+            await coord.async_full_refresh()
+    finally:
+        client.stop_capture()
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = hass.config.path(CASSETTE_DIR, f"{entry_id}_{stamp}.json")
+    await hass.async_add_executor_job(recorder.save, path)
+    _LOGGER.info("Canvas cassette with %d responses written to %s", len(recorder.interactions), path)
+    return {
+        "path": path,
+        "requests": len(recorder.interactions),
+        "refresh_ok": all(c.last_update_success for c in entry_data["coordinators"]),
+    }
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register domain services (idempotent)."""
+    if hass.services.has_service(DOMAIN, SERVICE_REFRESH):
+        return
+
+    async def _refresh(call: ServiceCall) -> None:
+        await _async_handle_refresh(hass, call)
+
+    async def _capture(call: ServiceCall) -> ServiceResponse:
+        return await _async_handle_capture(hass, call)
+
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH, _refresh, schema=REFRESH_SCHEMA)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CAPTURE_CASSETTE,
+        _capture,
+        schema=CAPTURE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,90 @@
+"""Interned, read-only view mappings shared by every entity of a coordinator.
+
+Each refresh builds fresh dicts and lists, even when most of them equal the
+previous build. Entities whose attributes did not change keep the old objects
+alive in their State while the rest reference the new ones, so with many
+entries the same course names, grade URLs and per-course lists end up held
+several times over. SharedViews swaps each unchanged value for the object
+already published, so every State and every consumer of a coordinator's data
+references a single copy, and wraps the top-level mappings in ReadOnlyDict.
+
+Read-only is shallow: item dicts inside the lists are shared too and must not
+be modified by consumers (copy before annotating, as aggregate.py does).
+
+For large snapshots the comparison runs in the executor, next to the view
+build, so intern() is serialized by a lock.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Mapping
+
+from homeassistant.util.read_only_dict import ReadOnlyDict
+
+# Published as one shared mapping, replaced as a whole when anything in it changes
+SHARED_MAPPINGS = (
+    "course_names_by_id",
+    "grade_urls_by_course",
+    "grades_by_course",
+    "grade_trends_by_course",
+    "credits_by_course",
+    "grade_points_by_course",
+)
+# Course id -> item list; each course's list is shared on its own
+SHARED_LISTS_BY_COURSE = (
+    "assignments_by_course",
+    "missing_by_course",
+    "ungraded_by_course",
+    "undated_outstanding_by_course",
+)
+
+
+class SharedViews:
+    """Keeps the last published value per view key and reuses it while it stays equal."""
+
+    def __init__(self) -> None:
+        self._mappings: dict[str, ReadOnlyDict[str, Any]] = {}
+        self._lists: dict[str, dict[str, list[Any]]] = {}
+        self.reused = 0
+        self.replaced = 0
+        self._lock = threading.Lock()
+
+    def _share(self, key: str, value: Mapping[str, Any]) -> ReadOnlyDict[str, Any]:
+        prev = self._mappings.get(key)
+        if prev is not None and (value is prev or value == prev):
+            self.reused += 1
+            return prev
+        self.replaced += 1
+        shared = self._mappings[key] = ReadOnlyDict(value)
+        return shared
+
+    def intern(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Replace the view values of `data` with shared, read-only ones (in place)."""
+        with self._lock:
+            return self._intern(data)
+
+    def _intern(self, data: dict[str, Any]) -> dict[str, Any]:
+        for key in SHARED_MAPPINGS:
+            value = data.get(key)
+            if isinstance(value, Mapping):
+                data[key] = self._share(key, value)
+
+        for key in SHARED_LISTS_BY_COURSE:
+            by_course = data.get(key)
+            if not isinstance(by_course, Mapping):
+                continue
+            prev_lists = self._lists.get(key) or {}
+            lists = {cid: prev if (prev := prev_lists.get(cid)) == items else items for cid, items in by_course.items()}
+            self._lists[key] = lists
+            # Identity is enough here: unchanged courses now hold the previous list objects
+            prev = self._mappings.get(key)
+            if prev is not None and prev.keys() == lists.keys() and all(prev[c] is v for c, v in lists.items()):
+                self.reused += 1
+                data[key] = prev
+            else:
+                self.replaced += 1
+                data[key] = self._mappings[key] = ReadOnlyDict(lists)
+        return data
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"reused": self.reused, "replaced": self.replaced}
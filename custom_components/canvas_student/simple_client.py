@@ -1,46 +1,114 @@
 
 from __future__ import annotations
+import asyncio
+import json
 import logging
-from typing import Any, Dict, List, Optional
-from aiohttp import ClientSession
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from aiohttp import ClientError, ClientSession, ClientTimeout
 from yarl import URL
 from .const import *
+from .request_queue import RequestQueue, request_priority
+from .tracing import RequestTrace
+
+if TYPE_CHECKING: from .cassette import RecordingSession
 
 _LOGGER = logging.getLogger(__name__)
 
 class CanvasApiError(Exception): pass
 
+class CanvasTransientError(CanvasApiError):
+    """Timeout, connection failure, 5xx or rate limiting: the last good data is still the best answer."""
+
+def _api_error(status: int, text: str) -> CanvasApiError:
+    transient = status >= 500 or status == 429 or (status == 403 and "Rate Limit Exceeded" in text)
+    return (CanvasTransientError if transient else CanvasApiError)(f"{status}: {text}")
+
 class CanvasClient:
-    def __init__(self, base_url: str, access_token: str, session: Optional[ClientSession] = None) -> None:
+    def __init__(self, base_url: str, access_token: str, session: Optional[ClientSession] = None, queue: Optional[RequestQueue] = None) -> None:
         self._base = base_url.rstrip("/"); self._token = access_token.strip() if access_token else access_token; self._session = session
+        # Every request (each page included) waits for a priority slot; see request_queue.py
+        self.queue = queue or RequestQueue()
+        # Per request (each page), counted from when the request leaves the queue
+        self._timeout = ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+        self.offloaded_decodes = 0
+        # Last requests (redacted) for the diagnostics download
+        self.trace = RequestTrace()
     @property
     def base_url(self) -> str: return self._base
+
+    # --- Cassette capture (see cassette.py) ---
+
+    def start_capture(self) -> RecordingSession:
+        """Record sanitized responses of every request until stop_capture()."""
+        from .cassette import RecordingSession  # only needed while capturing
+        if not isinstance(self._session, RecordingSession): self._session = RecordingSession(self._session)
+        return self._session
+
+    def stop_capture(self) -> Optional[RecordingSession]:
+        from .cassette import RecordingSession
+        if not isinstance(self._session, RecordingSession): return None
+        recorder = self._session; self._session = recorder.inner
+        return recorder
+
     @property
     def _headers(self) -> Dict[str, str]: return {"Authorization": f"Bearer {self._token}", "Accept": "application/json"}
 
+    async def _decode(self, resp) -> tuple[Any, int]:
+        """Decode a JSON body; large ones (long lookbacks, big courses) are parsed off the event loop."""
+        body = await resp.read()
+        if not body.strip(): return None, len(body)
+        if len(body) < JSON_EXECUTOR_MIN_BYTES: return json.loads(body), len(body)
+        self.offloaded_decodes += 1
+        return await asyncio.get_running_loop().run_in_executor(None, json.loads, body), len(body)
+
+    async def _request(self, url: URL, params: Optional[Dict[str, Any]] = None, page: int = 1, log_errors: bool = True) -> tuple[Any, Optional[str]]:
+        """One queued, traced GET; returns the decoded body and the Link header."""
+        queued = time.monotonic(); started = None; status = None; nbytes = None; headers = None
+        try:
+            async with self.queue.slot():
+                started = time.monotonic()
+                async with self._session.get(url, headers=self._headers, params=params, timeout=self._timeout) as resp:
+                    status = resp.status; headers = resp.headers; self.queue.observe(resp.headers)
+                    if resp.status == 401 and log_errors:
+                        txt = await resp.text()
+                        red = self._token[:4] + "…" + self._token[-4:] if self._token else "None"
+                        _LOGGER.error("Canvas 401 Unauthorized @ %s (token=%s). Body: %s", self._base, red, txt)
+                        raise CanvasApiError(f"401 Unauthorized at {self._base}: {txt}")
+                    if resp.status >= 400:
+                        txt = await resp.text()
+                        if log_errors: _LOGGER.error("Canvas error %s @ %s: %s", resp.status, self._base, txt)
+                        raise _api_error(resp.status, txt)
+                    data, nbytes = await self._decode(resp)
+                    link = resp.headers.get("Link") or resp.headers.get("link")
+        except (asyncio.TimeoutError, ClientError) as err:
+            wrapped = CanvasTransientError(f"{type(err).__name__} @ {url} page {page}")
+            self.trace.record(url, params, page=page, priority=request_priority.get(), queued=queued, started=started, status=status, headers=headers, error=wrapped)
+            raise wrapped from err
+        except BaseException as err:
+            self.trace.record(url, params, page=page, priority=request_priority.get(), queued=queued, started=started, status=status, headers=headers, error=err)
+            raise
+        self.trace.record(url, params, page=page, priority=request_priority.get(), queued=queued, started=started, status=status, nbytes=nbytes, headers=headers)
+        return data, link
+
+    async def _get_json(self, path: str) -> Any:
+        data, _ = await self._request(URL(self._base + path), log_errors=False)
+        return data
+
     async def _get_all_pages(self, path: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         url = URL(self._base + path); params = params or {}; items: List[Dict[str, Any]] = []; page = 1
         while True:
             _LOGGER.debug("Canvas GET %s params=%s page=%s", url, params, page)
-            async with self._session.get(url, headers=self._headers, params=params) as resp:
-                if resp.status == 401:
-                    txt = await resp.text()
-                    red = self._token[:4] + "…" + self._token[-4:] if self._token else "None"
-                    _LOGGER.error("Canvas 401 Unauthorized @ %s (token=%s). Body: %s", self._base, red, txt)
-                    raise CanvasApiError(f"401 Unauthorized at {self._base}: {txt}")
-                if resp.status >= 400:
-                    txt = await resp.text(); _LOGGER.error("Canvas error %s @ %s: %s", resp.status, self._base, txt); raise CanvasApiError(f"{resp.status}: {txt}")
-                data = await resp.json()
-                if isinstance(data, list): items.extend(data)
-                else: items.append(data)
-                link = resp.headers.get("Link") or resp.headers.get("link")
-                if not link or 'rel="next"' not in link: break
-                next_url = None
-                for part in link.split(","):
-                    if 'rel="next"' in part:
-                        start = part.find("<") + 1; end = part.find(">"); next_url = part[start:end]; break
-                if not next_url: break
-                url = URL(next_url); params = {}; page += 1
+            data, link = await self._request(url, params, page)
+            if isinstance(data, list): items.extend(data)
+            else: items.append(data)
+            if not link or 'rel="next"' not in link: break
+            next_url = None
+            for part in link.split(","):
+                if 'rel="next"' in part:
+                    start = part.find("<") + 1; end = part.find(">"); next_url = part[start:end]; break
+            if not next_url: break
+            url = URL(next_url); params = {}; page += 1
         return items
 
     async def list_courses(self) -> List[Dict[str, Any]]:
@@ -52,16 +120,36 @@ class CanvasClient:
         return await self._get_all_pages(PATH_ASSIGNMENTS.format(course_id=course_id), params)
 
     async def get_submission_self(self, course_id: str, assignment_id: str) -> Dict[str, Any]:
-        url = URL(self._base + PATH_SUBMISSIONS_SELF.format(course_id=course_id, assignment_id=assignment_id))
-        async with self._session.get(url, headers=self._headers) as resp:
-            if resp.status >= 400: raise CanvasApiError(f"{resp.status}: " + await resp.text())
-            return await resp.json()
+        return await self._get_json(PATH_SUBMISSIONS_SELF.format(course_id=course_id, assignment_id=assignment_id))
+
+    async def list_submissions_self(self, course_id: str, workflow_state: Optional[str] = None) -> List[Dict[str, Any]]:
+        params: Dict[str, Any] = {"student_ids[]": ["self"], "include[]": ["assignment"], "per_page": 50}
+        if workflow_state: params["workflow_state"] = workflow_state
+        return await self._get_all_pages(PATH_SUBMISSIONS_LIST.format(course_id=course_id), params)
+
+    # --- Observer accounts ---
+
+    async def list_observees(self) -> List[Dict[str, Any]]:
+        return await self._get_all_pages(PATH_OBSERVEES, {"per_page": 50})
+
+    async def list_courses_for_user(self, user_id: str) -> List[Dict[str, Any]]:
+        return await self._get_all_pages(PATH_USER_COURSES.format(user_id=user_id), {"enrollment_state": "active", "include[]": ["term"], "per_page": 50})
+
+    async def list_user_enrollments(self, user_id: str) -> List[Dict[str, Any]]:
+        return await self._get_all_pages(PATH_USER_ENROLLMENTS.format(user_id=user_id), {"type[]": ["StudentEnrollment"], "state[]": ["active"], "per_page": 50})
+
+    async def list_student_submissions(self, course_id: str, student_ids: List[str]) -> List[Dict[str, Any]]:
+        params: Dict[str, Any] = {"student_ids[]": list(student_ids), "include[]": ["assignment"], "per_page": 100}
+        return await self._get_all_pages(PATH_SUBMISSIONS_LIST.format(course_id=course_id), params)
 
     async def get_users_self(self) -> Dict[str, Any]:
-        url = URL(self._base + PATH_USERS_SELF)
-        async with self._session.get(url, headers=self._headers) as resp:
-            if resp.status >= 400: raise CanvasApiError(f"{resp.status}: " + await resp.text())
-            return await resp.json()
+        return await self._get_json(PATH_USERS_SELF)
+
+    async def get_activity_stream_summary(self) -> List[Dict[str, Any]]:
+        return await self._get_json(PATH_ACTIVITY_SUMMARY)
+
+    async def get_todo_item_count(self) -> Dict[str, Any]:
+        return await self._get_json(PATH_TODO_COUNT)
 
     async def get_announcements(self, context_codes: List[str], start_date, end_date) -> List[Dict[str, Any]]:
         params = {"context_codes[]": context_codes, "start_date": start_date.isoformat(), "end_date": end_date.isoformat(), "active_only": "true", "per_page": 50}
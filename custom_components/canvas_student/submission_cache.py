@@ -0,0 +1,100 @@
+"""Persistent cache of per-assignment submission state.
+
+The missing-work view needs `get_submission_self` for every assignment due in
+the lookback window, and most of those answers never change again once the
+work is graded. SubmissionCache keeps the last answer per (course, assignment)
+with a TTL chosen from its workflow state and due date, persists it with HA's
+Store so a restart does not re-query the whole window, and drops entries once
+their assignment leaves the window.
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+from typing import Any, Iterable
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    SUBMISSION_CACHE_SAVE_DELAY,
+    SUBMISSION_CACHE_VERSION,
+    SUBMISSION_RECENT_DAYS,
+    SUBMISSION_TTL_GRADED_HOURS,
+    SUBMISSION_TTL_SUBMITTED_HOURS,
+    SUBMISSION_TTL_UNSUBMITTED_MINUTES,
+    SUBMISSION_TTL_UNSUBMITTED_RECENT_MINUTES,
+)
+
+
+def storage_key(unique_prefix: str) -> str:
+    return f"{DOMAIN}.submissions.{unique_prefix}"
+
+
+def submission_ttl(state: dict[str, Any], due: datetime | None, now: datetime) -> float:
+    """Seconds a cached submission state stays fresh."""
+    workflow = state.get("workflow_state")
+    if workflow == "graded":
+        return SUBMISSION_TTL_GRADED_HOURS * 3600
+    if workflow in ("submitted", "pending_review") or state.get("submitted_at"):
+        return SUBMISSION_TTL_SUBMITTED_HOURS * 3600
+    # Unsubmitted: a late submission right after the due date must show up quickly
+    if due is None or now - due < timedelta(days=SUBMISSION_RECENT_DAYS):
+        return SUBMISSION_TTL_UNSUBMITTED_RECENT_MINUTES * 60
+    return SUBMISSION_TTL_UNSUBMITTED_MINUTES * 60
+
+
+class SubmissionCache:
+    """Submission states keyed by "course_id:assignment_id", persisted per coordinator."""
+
+    def __init__(self, hass: HomeAssistant, unique_prefix: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, SUBMISSION_CACHE_VERSION, storage_key(unique_prefix))
+        # key -> {"state": {...}, "fetched": epoch seconds, "ttl": seconds}
+        self._entries: dict[str, dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load()
+        if isinstance(stored, dict) and isinstance(stored.get("entries"), dict):
+            self._entries = stored["entries"]
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"entries": self._entries}
+
+    def get(self, cid: str, aid: str) -> dict[str, Any] | None:
+        """Return the cached state if still fresh, else None."""
+        entry = self._entries.get(f"{cid}:{aid}")
+        if entry is not None and time.time() - entry["fetched"] < entry["ttl"]:
+            self.hits += 1
+            return entry["state"]
+        self.misses += 1
+        return None
+
+    def set(self, cid: str, aid: str, state: dict[str, Any], due: datetime | None, now: datetime) -> None:
+        self._entries[f"{cid}:{aid}"] = {
+            "state": state,
+            "fetched": time.time(),
+            "ttl": submission_ttl(state, due, now),
+        }
+        self._store.async_delay_save(self._data_to_save, SUBMISSION_CACHE_SAVE_DELAY)
+
+    def invalidate(self, cid: str) -> None:
+        """Forget every cached state of a course (explicit refresh)."""
+        prefix = f"{cid}:"
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+        self._store.async_delay_save(self._data_to_save, SUBMISSION_CACHE_SAVE_DELAY)
+
+    def prune(self, keep: Iterable[str]) -> None:
+        """Drop entries not in `keep` (assignments that left the lookback window or the crawl)."""
+        wanted = set(keep)
+        stale = [k for k in self._entries if k not in wanted]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self._store.async_delay_save(self._data_to_save, SUBMISSION_CACHE_SAVE_DELAY)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,89 @@
+"""To-do platform: missing and undated outstanding work as a read-only list."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from homeassistant.components.todo import TodoItem, TodoItemStatus, TodoListEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .coordinator import CanvasCoordinator
+from .metrics import MeteredEntity
+
+# Undated items sort after dated ones
+_NO_DUE = datetime.max.replace(tzinfo=dt_util.UTC)
+
+
+def _items_from_data(data: dict[str, Any]) -> dict[str, TodoItem]:
+    """Map assignment identity ("course:assignment") to a TodoItem."""
+    names = data.get("course_names_by_id") or {}
+    out: dict[str, TodoItem] = {}
+    for key in ("missing_by_course", "undated_outstanding_by_course"):
+        for cid, items in (data.get(key) or {}).items():
+            course = names.get(str(cid), str(cid))
+            for a in items:
+                due = dt_util.parse_datetime(a["due_at"]) if a.get("due_at") else None
+                description = course if not a.get("html_url") else f"{course}\n{a['html_url']}"
+                uid = f"{cid}:{a.get('id')}"
+                out[uid] = TodoItem(
+                    summary=str(a.get("name") or "Assignment"),
+                    uid=uid,
+                    status=TodoItemStatus.NEEDS_ACTION,
+                    due=due,
+                    description=description,
+                )
+    return out
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
+    coords: list[CanvasCoordinator] = hass.data[DOMAIN][entry.entry_id]["coordinators"]
+    async_add_entities([CanvasOutstandingTodoList(coord, entry) for coord in coords])
+
+
+class CanvasOutstandingTodoList(MeteredEntity, CoordinatorEntity, TodoListEntity):
+    """Missing + undated outstanding work; state is written only when items actually change."""
+    _attr_icon = "mdi:clipboard-alert-outline"
+
+    def __init__(self, coordinator: CanvasCoordinator, entry: ConfigEntry) -> None:
+        super().__init__(coordinator)
+        self._entry = entry
+        self._attr_name = f"Canvas ({entry.data.get('school_name')} - {coordinator.student_name or 'Student'}) Outstanding Work"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_v2_outstanding_todo"
+        self._metrics_group = coordinator.unique_prefix
+        self._items: dict[str, TodoItem] = {}
+        self._attr_todo_items = []
+        self._last_available: bool | None = None
+        self._apply_diff(_items_from_data(coordinator.data or {}))
+
+    @property
+    def available(self) -> bool:
+        # Platforms are set up while the first refresh runs; no data yet means unavailable
+        return super().available and self.coordinator.data is not None
+
+    def _apply_diff(self, new: dict[str, TodoItem]) -> bool:
+        """Add/remove/update items by assignment identity; return True if anything changed."""
+        removed = [uid for uid in self._items if uid not in new]
+        upserts = {uid: item for uid, item in new.items() if self._items.get(uid) != item}
+        if not removed and not upserts:
+            return False
+        for uid in removed:
+            del self._items[uid]
+        self._items.update(upserts)
+        self._attr_todo_items = sorted(
+            self._items.values(),
+            key=lambda i: (i.due if isinstance(i.due, datetime) else _NO_DUE, i.summary or ""),
+        )
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        changed = self._apply_diff(_items_from_data(self.coordinator.data or {}))
+        available = self.available
+        if changed or available != self._last_available:
+            self._last_available = available
+            self.async_write_ha_state()
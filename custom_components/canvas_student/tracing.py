@@ -0,0 +1,112 @@
+"""Bounded request and refresh-cycle traces for diagnostics.
+
+When a refresh misbehaves in production, counts and options are not enough to
+tell a slow endpoint from a pagination blowup, and debug logging is rarely on
+at the time. CanvasClient therefore records its last REQUEST_TRACE_SIZE
+requests (redacted URL and params, status, queue wait, latency, bytes, page,
+rate-limit headers) in a RequestTrace ring buffer, and each coordinator keeps
+the phase timings of its last REFRESH_TRACE_CYCLES refreshes as CycleTimer
+records. Both are plain data, only serialized by the diagnostics download.
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Iterator, Mapping
+
+from yarl import URL
+
+from .const import REQUEST_TRACE_SIZE
+
+# Query/param keys whose values never go into a trace
+_SECRET_PARAMS = {"access_token", "token", "client_secret", "code", "refresh_token"}
+
+# Canvas response headers worth keeping per request
+_TRACE_HEADERS = ("X-Rate-Limit-Remaining", "X-Request-Cost")
+
+
+def _redact_params(params: Mapping[str, Any] | None) -> dict[str, Any]:
+    return {k: ("**REDACTED**" if k.lower() in _SECRET_PARAMS else v) for k, v in (params or {}).items()}
+
+
+def redact_url(url: URL) -> str:
+    """Path and query of a request URL with secret query values masked (host dropped)."""
+    query = _redact_params({k: v for k, v in url.query.items()})
+    return str(URL.build(path=url.path, query=query)) if query else url.path
+
+
+class RequestTrace:
+    """Ring buffer of the most recent Canvas requests."""
+
+    def __init__(self, size: int = REQUEST_TRACE_SIZE) -> None:
+        self._entries: deque[dict[str, Any]] = deque(maxlen=max(1, int(size)))
+        # Requests ever recorded; refresh cycles report their delta
+        self.total = 0
+
+    def record(
+        self,
+        url: URL,
+        params: Mapping[str, Any] | None,
+        *,
+        page: int,
+        priority: int,
+        queued: float,
+        started: float | None,
+        status: int | None = None,
+        nbytes: int | None = None,
+        headers: Mapping[str, str] | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        """Append one request; `queued`/`started` are time.monotonic() stamps."""
+        done = time.monotonic()
+        self.total += 1
+        self._entries.append(
+            {
+                "at": datetime.now(timezone.utc).isoformat(),
+                "url": redact_url(url),
+                "params": _redact_params(params),
+                "page": page,
+                "priority": priority,
+                "status": status,
+                "queue_wait_ms": round(((started or done) - queued) * 1000, 1),
+                "latency_ms": round((done - started) * 1000, 1) if started is not None else None,
+                "bytes": nbytes,
+                "rate_limit": {h: headers.get(h) for h in _TRACE_HEADERS if headers and headers.get(h) is not None},
+                "error": f"{type(error).__name__}: {error}"[:200] if error is not None else None,
+            }
+        )
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Oldest first."""
+        return list(self._entries)
+
+
+class CycleTimer:
+    """Phase timings of one refresh cycle, kept in a coordinator's refresh history."""
+
+    def __init__(self, kind: str, requests_before: int = 0) -> None:
+        self._started = time.monotonic()
+        self._requests_before = requests_before
+        self.record: dict[str, Any] = {
+            "kind": kind,
+            "started": datetime.now(timezone.utc).isoformat(),
+            "phases_ms": {},
+        }
+
+    @contextmanager
+    def phase(self, name: str, group: str = "phases_ms") -> Iterator[None]:
+        """Time the enclosed block as `name` (per-course timings use group="courses_ms")."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record.setdefault(group, {})[name] = round((time.monotonic() - started) * 1000, 1)
+
+    def finish(self, outcome: str, requests_after: int = 0, **extra: Any) -> dict[str, Any]:
+        self.record["outcome"] = outcome
+        self.record["total_ms"] = round((time.monotonic() - self._started) * 1000, 1)
+        self.record["requests"] = max(0, requests_after - self._requests_before)
+        self.record.update(extra)
+        return self.record
@@ -0,0 +1,190 @@
+"""WebSocket commands for on-demand, paged access to Canvas data.
+
+Cards can pull exactly the rows they show instead of receiving every item in
+sensor attributes on each state change. Rows come from the coordinators'
+current data; a sorted index per (kind, sort) is rebuilt only when some
+coordinator published new data, and cursors are the last row's sort key, so a
+page is a bisect plus a slice.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from bisect import bisect_left, bisect_right
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+
+from .const import DOMAIN
+
+# Command suffix -> coordinator data key
+WS_KINDS: dict[str, str] = {
+    "assignments": "assignments_by_course",
+    "missing": "missing_by_course",
+    "awaiting_grading": "ungraded_by_course",
+    "undated": "undated_outstanding_by_course",
+    "announcements": "announcements",
+}
+SORTS = ("due_at", "-due_at", "name", "-name")
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+DATA_WS_INDEX = f"{DOMAIN}_ws_index"
+
+_LAST = "\uffff"  # undated/unnamed rows sort last ascending
+
+
+def _encode_cursor(key: tuple[str, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    key = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    return (str(key[0]), str(key[1]))
+
+
+def _rows_for_entry(entry_id: str, coord: Any, kind: str) -> list[dict[str, Any]]:
+    data = coord.data or {}
+    names = data.get("course_names_by_id") or {}
+    school = getattr(coord, "school_name", None)
+    raw = data.get(WS_KINDS[kind])
+
+    if kind == "announcements":
+        pairs = [(str(a.get("course_id")), a) for a in raw or []]
+    else:
+        pairs = [(str(cid), a) for cid, items in (raw or {}).items() for a in items]
+
+    rows: list[dict[str, Any]] = []
+    for i, (cid, a) in enumerate(pairs):
+        ident = a.get("id") if a.get("id") is not None else a.get("html_url") or i
+        rows.append(
+            {
+                **a,
+                "uid": f"{getattr(coord, 'unique_prefix', entry_id)}:{cid}:{ident}",
+                "entry_id": entry_id,
+                "school_name": school,
+                "student_name": getattr(coord, "student_name", None),
+                "course_id": cid,
+                "course_name": names.get(cid, cid),
+            }
+        )
+    return rows
+
+
+def _sort_key(row: dict[str, Any], field: str) -> tuple[str, str]:
+    if field == "name":
+        value = str(row.get("name") or row.get("title") or _LAST).lower()
+    else:
+        value = row.get("due_at") or row.get("posted_at") or _LAST
+    return (value, row["uid"])
+
+
+class _Index:
+    """Sorted rows per (kind, field) across all entries, rebuilt when data objects change."""
+
+    def __init__(self) -> None:
+        # kind -> the coordinator data objects the index was built from
+        self._versions: dict[str, tuple[Any, ...]] = {}
+        self._sorted: dict[tuple[str, str], tuple[list[tuple[str, str]], list[dict[str, Any]]]] = {}
+
+    def get(self, hass: HomeAssistant, kind: str, field: str) -> tuple[list[tuple[str, str]], list[dict[str, Any]]]:
+        domain_data = hass.data.get(DOMAIN, {})
+        coords = [(eid, c) for eid, d in sorted(domain_data.items()) for c in d.get("coordinators") or []]
+        version = tuple(c.data for _, c in coords)
+        previous = self._versions.get(kind)
+        if previous is None or len(previous) != len(version) or any(a is not b for a, b in zip(previous, version)):
+            self._versions[kind] = version
+            for k in [k for k in self._sorted if k[0] == kind]:
+                del self._sorted[k]
+        if (kind, field) not in self._sorted:
+            rows = [r for eid, c in coords for r in _rows_for_entry(eid, c, kind)]
+            keyed = sorted(((_sort_key(r, field), r) for r in rows), key=lambda kr: kr[0])
+            self._sorted[(kind, field)] = ([k for k, _ in keyed], [r for _, r in keyed])
+        return self._sorted[(kind, field)]
+
+
+def _page(
+    keys: list[tuple[str, str]],
+    rows: list[dict[str, Any]],
+    descending: bool,
+    cursor: tuple[str, str] | None,
+    limit: int,
+    entry_ids: set[str] | None,
+    course_ids: set[str] | None,
+) -> tuple[list[dict[str, Any]], tuple[str, str] | None]:
+    """Return up to `limit` matching rows after the cursor, plus the next cursor."""
+
+    def wanted(r: dict[str, Any]) -> bool:
+        return (entry_ids is None or r["entry_id"] in entry_ids) and (
+            course_ids is None or r["course_id"] in course_ids
+        )
+
+    # Collect one row past the page to know whether there is a next page
+    found: list[int] = []
+    if descending:
+        i = (bisect_left(keys, cursor) if cursor else len(keys)) - 1
+        while i >= 0 and len(found) <= limit:
+            if wanted(rows[i]):
+                found.append(i)
+            i -= 1
+    else:
+        i = bisect_right(keys, cursor) if cursor else 0
+        while i < len(keys) and len(found) <= limit:
+            if wanted(rows[i]):
+                found.append(i)
+            i += 1
+
+    more = len(found) > limit
+    found = found[:limit]
+    return [rows[i] for i in found], (keys[found[-1]] if found and more else None)
+
+
+def _make_handler(kind: str):
+    @websocket_api.websocket_command(
+        {
+            vol.Required("type"): f"{DOMAIN}/{kind}",
+            vol.Optional("entry_id"): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional("course_id"): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional("sort", default="due_at"): vol.In(SORTS),
+            vol.Optional("limit", default=DEFAULT_LIMIT): vol.All(int, vol.Range(min=1, max=MAX_LIMIT)),
+            vol.Optional("cursor"): str,
+        }
+    )
+    @callback
+    def _handle(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]) -> None:
+        sort = msg["sort"]
+        field = sort.lstrip("-")
+        cursor = None
+        if msg.get("cursor"):
+            try:
+                cursor = _decode_cursor(msg["cursor"])
+            except Exception:
+                connection.send_error(msg["id"], "invalid_cursor", "Cursor is not valid")
+                return
+
+        index: _Index = hass.data.setdefault(DATA_WS_INDEX, _Index())
+        keys, rows = index.get(hass, kind, field)
+        entry_ids = set(msg["entry_id"]) if msg.get("entry_id") else None
+        course_ids = set(msg["course_id"]) if msg.get("course_id") else None
+        items, next_key = _page(keys, rows, sort.startswith("-"), cursor, msg["limit"], entry_ids, course_ids)
+
+        connection.send_result(
+            msg["id"],
+            {
+                "items": items,
+                "next_cursor": _encode_cursor(next_key) if next_key else None,
+            },
+        )
+
+    return _handle
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register one paged command per data kind (canvas_student/assignments, ...)."""
+    for kind in WS_KINDS:
+        websocket_api.async_register_command(hass, _make_handler(kind))
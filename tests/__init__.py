@@ -0,0 +1 @@
+"""Tests for the Canvas Student integration."""
@@ -0,0 +1,38 @@
+"""Shared fixtures for the Canvas Student tests."""
+from __future__ import annotations
+
+from typing import Any, Callable
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.canvas_student.const import DOMAIN
+
+from .fake_canvas import BASE_URL
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Let the hass fixture load custom_components/canvas_student."""
+    yield
+
+
+@pytest.fixture
+def canvas_entry() -> Callable[..., MockConfigEntry]:
+    """Factory for config entries of school `n` on the fake Canvas (not yet added to hass)."""
+
+    def _make(n: int = 0, **options: Any) -> MockConfigEntry:
+        return MockConfigEntry(
+            domain=DOMAIN,
+            title=f"School {n}",
+            entry_id=f"load{n:03d}",
+            data={
+                "base_url": BASE_URL,
+                "access_token": f"token-{n}",
+                "school_name": f"School {n}",
+                "student_name": f"Student {n}",
+            },
+            options={"enable_gpa": True, "credits_by_course": "{}", **options},
+        )
+
+    return _make
@@ -0,0 +1,185 @@
+"""In-memory Canvas API for offline tests.
+
+FakeCanvasSession answers the GETs CanvasClient sends (courses, enrollments,
+assignments with the upcoming bucket, submissions, announcements, the probe
+endpoints) from synthetic data sized by the caller, paginated with Link
+headers like Canvas. It sits where the aiohttp ClientSession goes, so the
+client's queue, pagination, decoding and tracing run unchanged.
+"""
+from __future__ import annotations
+
+import json
+import re
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Mapping
+
+from yarl import URL
+
+BASE_URL = "https://school.example.edu"
+DEFAULT_PER_PAGE = 10
+
+
+def _iso(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FakeResponse:
+    def __init__(self, status: int, body: Any, headers: Mapping[str, str] | None = None) -> None:
+        self.status = status
+        self.headers = dict(headers or {})
+        self._body = body if isinstance(body, bytes) else json.dumps(body).encode()
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self) -> str:
+        return self._body.decode()
+
+
+class FakeCanvas:
+    """Synthetic school: `courses` courses of `assignments` assignments each.
+
+    Due dates spread from `lookback_days` ago to a month ahead; every third
+    past assignment is submitted, the rest are missing.
+    """
+
+    def __init__(
+        self,
+        courses: int = 4,
+        assignments: int = 20,
+        announcements: int = 2,
+        lookback_days: int = 30,
+        now: datetime | None = None,
+        user_id: int = 1001,
+    ) -> None:
+        now = now or datetime.now(timezone.utc)
+        self.user = {"id": user_id, "name": "Alex Student", "sortable_name": "Student, Alex", "login_id": "alex@example.edu"}
+        self.courses = [
+            {
+                "id": 100 + c,
+                "name": f"Course {c}",
+                "course_code": f"C{c}",
+                "enrollment_term_id": 1,
+                "term": {"id": 1, "name": "Term", "end_at": _iso(now + timedelta(days=90))},
+            }
+            for c in range(courses)
+        ]
+        self.assignments: dict[str, list[dict[str, Any]]] = {}
+        self.submissions: dict[tuple[str, str], dict[str, Any]] = {}
+        span = lookback_days + 30
+        for course in self.courses:
+            cid = str(course["id"])
+            items = []
+            for i in range(assignments):
+                aid = course["id"] * 1000 + i
+                due = now - timedelta(days=lookback_days) + timedelta(days=span * (i + 0.5) / max(assignments, 1))
+                items.append(
+                    {
+                        "id": aid,
+                        "course_id": course["id"],
+                        "name": f"Assignment {i} of {course['name']}",
+                        "due_at": _iso(due),
+                        "points_possible": 10,
+                        "html_url": f"{BASE_URL}/courses/{cid}/assignments/{aid}",
+                    }
+                )
+                submitted = due < now and i % 3 == 0
+                self.submissions[(cid, str(aid))] = {
+                    "assignment_id": aid,
+                    "submitted_at": _iso(due - timedelta(hours=1)) if submitted else None,
+                    "workflow_state": "submitted" if submitted else "unsubmitted",
+                }
+            self.assignments[cid] = items
+        self.announcements = [
+            {
+                "id": course["id"] * 100 + n,
+                "title": f"Announcement {n}",
+                "context_code": f"course_{course['id']}",
+                "posted_at": _iso(now - timedelta(days=n + 1)),
+                "html_url": f"{BASE_URL}/courses/{course['id']}/discussion_topics/{n}",
+                "message": "<p>Hello class</p>",
+                "author": {"id": 9, "display_name": "Teacher"},
+            }
+            for course in self.courses
+            for n in range(announcements)
+        ]
+        self.now = now
+
+    def session(self, per_page: int | None = None, link_token: str | None = None) -> FakeCanvasSession:
+        return FakeCanvasSession(self, per_page, link_token)
+
+    def grades(self, cid: str) -> dict[str, Any]:
+        score = 70 + (int(cid) % 30)
+        return {"current_score": score, "current_grade": "A" if score >= 90 else "B" if score >= 80 else "C"}
+
+    def answer(self, path: str, query: Mapping[str, list[str]]) -> tuple[int, Any, bool]:
+        """(status, body, paginated) for a GET."""
+        api = path.removeprefix("/api/v1")
+        if api == "/users/self":
+            return 200, self.user, False
+        if api == "/users/self/activity_stream/summary":
+            return 200, [{"type": "Announcement", "count": len(self.announcements), "unread_count": 0}], False
+        if api == "/users/self/todo_item_count":
+            return 200, {"needs_grading_count": 0, "assignments_needing_submitting": 0}, False
+        if api == "/courses":
+            return 200, self.courses, True
+        if api == "/announcements":
+            wanted = set(query.get("context_codes[]", []))
+            return 200, [a for a in self.announcements if a["context_code"] in wanted], True
+        if m := re.fullmatch(r"/courses/(\d+)/enrollments", api):
+            return 200, [{"type": "StudentEnrollment", "user_id": self.user["id"], "grades": self.grades(m[1])}], True
+        if m := re.fullmatch(r"/courses/(\d+)/assignments", api):
+            items = self.assignments.get(m[1])
+            if items is None:
+                return 404, {"errors": [{"message": "not found"}]}, False
+            if query.get("bucket") == ["upcoming"]:
+                items = [a for a in items if a["due_at"] > _iso(self.now)]
+            return 200, items, True
+        if m := re.fullmatch(r"/courses/(\d+)/assignments/(\d+)/submissions/self", api):
+            sub = self.submissions.get((m[1], m[2]))
+            return (200, sub, False) if sub is not None else (404, {"errors": [{"message": "not found"}]}, False)
+        if m := re.fullmatch(r"/courses/(\d+)/students/submissions", api):
+            state = (query.get("workflow_state") or [None])[0]
+            subs = [s for (cid, _), s in self.submissions.items() if cid == m[1] and (state is None or s["workflow_state"] == state)]
+            return 200, subs, True
+        return 404, {"errors": [{"message": "not found"}]}, False
+
+
+class FakeCanvasSession:
+    """ClientSession stand-in serving a FakeCanvas; counts requests per path.
+
+    `link_token` is echoed as access_token in Link URLs, as Canvas does for
+    requests authenticated by query parameter.
+    """
+
+    def __init__(self, canvas: FakeCanvas, per_page: int | None = None, link_token: str | None = None) -> None:
+        self.canvas = canvas
+        self.per_page = per_page
+        self.link_token = link_token
+        self.requests: list[str] = []
+
+    def get(self, url: Any, params: Mapping[str, Any] | None = None, **_: Any):
+        return self._get(URL(str(url)), params)
+
+    @asynccontextmanager
+    async def _get(self, url: URL, params: Mapping[str, Any] | None) -> AsyncIterator[FakeResponse]:
+        query: dict[str, list[str]] = {}
+        for k, v in url.query.items():
+            query.setdefault(k, []).append(v)
+        for k, v in (params or {}).items():
+            query.setdefault(k, []).extend(str(i) for i in (v if isinstance(v, (list, tuple)) else [v]))
+        self.requests.append(url.path)
+        status, body, paginated = self.canvas.answer(url.path, query)
+        headers = {"Content-Type": "application/json", "X-Rate-Limit-Remaining": "700.0"}
+        if paginated and isinstance(body, list):
+            per_page = self.per_page or int((query.get("per_page") or [DEFAULT_PER_PAGE])[0])
+            page = int((query.get("page") or ["1"])[0])
+            start = (page - 1) * per_page
+            if start + per_page < len(body):
+                pairs = [(k, v) for k, vs in query.items() if k not in ("page", "access_token") for v in vs] + [("page", str(page + 1))]
+                if self.link_token:
+                    pairs.append(("access_token", self.link_token))
+                headers["Link"] = f'<{URL(BASE_URL + url.path).with_query(pairs)}>; rel="next"'
+            body = body[start : start + per_page]
+        yield FakeResponse(status, body, headers)
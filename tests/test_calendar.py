@@ -0,0 +1,35 @@
+"""Due-date calendar index."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.canvas_student.calendar import DueDateIndex, _to_event
+
+DURATION = timedelta(minutes=30)
+NOW = datetime(2026, 3, 2, 12, tzinfo=timezone.utc)
+
+
+def _item(n: int, hours: int, name: str = "Essay") -> dict:
+    return {"uid": f"100:{n}", "course_name": "Biology", "name": name, "html_url": None, "due": NOW + timedelta(hours=hours), "due_source": "due_at"}
+
+
+def test_sync_builds_only_new_or_changed_events() -> None:
+    built: list[str] = []
+
+    def build(item):
+        built.append(item["uid"])
+        return _to_event(item, DURATION)
+
+    index = DueDateIndex(DURATION)
+    items = {i["uid"]: i for i in (_item(1, 1), _item(2, 5), _item(3, -2))}
+    assert index.sync(items, build) and len(built) == 3
+
+    # Equal items (rebuilt by the next refresh) keep their events
+    assert not index.sync({uid: dict(i) for uid, i in items.items()}, build) and len(built) == 3
+
+    changed = {**items, "100:2": _item(2, 7, "Essay (revised)")}
+    del changed["100:3"]
+    assert index.sync(changed, build) and built[3:] == ["100:2"]
+    assert len(index) == 2
+    assert [e.summary for e in index.between(NOW, NOW + timedelta(hours=8))] == ["Essay", "Essay (revised)"]
+    assert index.next_after(NOW).uid == "100:1"
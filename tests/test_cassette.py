@@ -0,0 +1,93 @@
+"""Cassette recording (sanitizing) and replay through CanvasClient."""
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from custom_components.canvas_student.cassette import ReplaySession, load_cassette, request_key, scrub
+from custom_components.canvas_student.const import CASSETTE_BASE_URL, PATH_ASSIGNMENTS
+from custom_components.canvas_student.simple_client import CanvasApiError, CanvasClient
+
+from .fake_canvas import BASE_URL, FakeCanvas
+
+TOKEN = "7~SECRETTOKENVALUE"
+
+# Everything here is personal or secret and must not survive scrubbing
+PAYLOAD = {
+    "id": 1001,
+    "name": "Alex Student",
+    "sortable_name": "Student, Alex",
+    "login_id": "alex@example.edu",
+    "avatar_url": f"{BASE_URL}/images/thumbnails/1/abc",
+    "html_url": f"{BASE_URL}/courses/1/assignments/2?access_token={TOKEN}",
+    "message": f'<a href="{BASE_URL}/files/3/download?verifier=VERIFIERVALUE">Alex Student</a>',
+    "author": {"id": 9, "display_name": "Ms Teacher", "name": "Morgan Teacher"},
+    "submission_comments": [{"comment": "Nice work Alex", "user": {"id": 1001, "name": "Alex Student"}}],
+    "observees": [{"id": 2002, "name": "Sam Student", "email": "sam@example.edu"}],
+}
+SECRETS = (TOKEN, "VERIFIERVALUE", "school.example.edu", "Alex", "Morgan", "Teacher", "Sam", "example.edu")
+
+
+def test_scrub_removes_personal_fields_and_secrets() -> None:
+    scrubbed = scrub(PAYLOAD, BASE_URL)
+    dumped = json.dumps(scrubbed)
+    for secret in SECRETS:
+        assert secret not in dumped
+    # Same shape and sizes, so replayed payloads stay realistic
+    assert scrubbed["id"] == 1001
+    assert len(scrubbed["name"]) == len(PAYLOAD["name"])
+    assert scrubbed["author"]["id"] == 9
+    assert scrubbed["html_url"] == f"{CASSETTE_BASE_URL}/courses/1/assignments/2?access_token=redacted"
+    assert PAYLOAD["name"] == "Alex Student"
+
+
+async def test_recording_is_sanitized() -> None:
+    canvas = FakeCanvas(courses=2, assignments=25)
+    client = CanvasClient(BASE_URL, TOKEN, session=canvas.session(per_page=10, link_token=TOKEN))
+    recorder = client.start_capture()
+    await client.get_users_self()
+    await client.list_assignments("100")
+    await client.get_announcements(["course_100"], canvas.now, canvas.now)
+    assert client.stop_capture() is recorder
+
+    dumped = json.dumps(recorder.as_cassette())
+    for secret in (*SECRETS, "Authorization", "Bearer"):
+        assert secret not in dumped
+    links = [i["headers"]["Link"] for i in recorder.interactions if "Link" in i["headers"]]
+    assert links and all(link.startswith(f"<{CASSETTE_BASE_URL}/api/v1/") for link in links)
+
+
+async def test_replay_through_client(tmp_path) -> None:
+    canvas = FakeCanvas(courses=2, assignments=25)
+    recording = CanvasClient(BASE_URL, TOKEN, session=canvas.session(per_page=10, link_token=TOKEN))
+    recorder = recording.start_capture()
+    recorded = await recording.list_assignments("100")
+    await recording.get_submission_self("100", "100000")
+    path = str(tmp_path / "cassettes" / "school.json")
+    recorder.save(path)
+
+    session = ReplaySession(load_cassette(path))
+    client = CanvasClient(CASSETTE_BASE_URL, "replay", session=session)
+
+    # Three pages followed through the recorded (anonymized) Link headers
+    replayed = await client.list_assignments("100")
+    assert [a["id"] for a in replayed] == [a["id"] for a in recorded]
+    assert len(replayed) == 25 and session.requests == 3 and not session.misses
+    assert (await client.get_submission_self("100", "100000"))["workflow_state"] == "submitted"
+
+    # Requests the crawl never made are 404s, listed as misses
+    with pytest.raises(CanvasApiError):
+        await client.list_assignments("101")
+    missing = request_key(CASSETTE_BASE_URL + PATH_ASSIGNMENTS.format(course_id="101"), {"order_by": "due_at", "per_page": 50})
+    assert session.misses == [missing]
+
+    # Repeats keep being served (any number of refresh cycles can run)
+    assert len(await client.list_assignments("100")) == 25
+
+
+def test_load_rejects_other_versions(tmp_path) -> None:
+    path = tmp_path / "old.json"
+    path.write_text(json.dumps({"version": 0, "interactions": []}))
+    with pytest.raises(ValueError):
+        load_cassette(str(path))
@@ -0,0 +1,193 @@
+"""Coordinator: option changes racing crawls and view rebuilds."""
+from __future__ import annotations
+
+import asyncio
+import threading
+from datetime import timedelta
+from typing import Callable
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.canvas_student import coordinator as coordinator_module
+from custom_components.canvas_student.const import DOMAIN, OPT_COURSE_END_DATES_MAP, OPT_HIDE_COURSES
+
+from .fake_canvas import FakeCanvas
+
+PACKAGE = "custom_components.canvas_student"
+
+
+async def _setup(hass: HomeAssistant, entry: MockConfigEntry, canvas: FakeCanvas, sessions: list | None = None):
+    def _session(*_args, **_kwargs):
+        session = canvas.session()
+        if sessions is not None:
+            sessions.append(session)
+        return session
+
+    entry.add_to_hass(hass)
+    with patch(f"{PACKAGE}.async_get_clientsession", _session):
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+    return hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+
+async def test_options_changed_during_crawl_win(hass: HomeAssistant, canvas_entry: Callable[..., MockConfigEntry]) -> None:
+    entry = canvas_entry()
+    coord = await _setup(hass, entry, FakeCanvas(courses=3, assignments=5))
+    assert coord.data["options_applied"]["hidden_courses_count"] == 0
+
+    fetching, release = asyncio.Event(), asyncio.Event()
+    fetch_raw = coord._async_fetch_raw
+
+    async def _slow_fetch(*args, **kwargs):
+        fetching.set()
+        await release.wait()
+        return await fetch_raw(*args, **kwargs)
+
+    with patch.object(coord, "_async_fetch_raw", _slow_fetch):
+        crawl = hass.async_create_task(coord.async_full_refresh())
+        await fetching.wait()
+        # The crawl read the old options; the in-place apply lands while it runs
+        hass.config_entries.async_update_entry(entry, options={**entry.options, OPT_HIDE_COURSES: ["100"]})
+        await asyncio.sleep(0)
+        release.set()
+        await crawl
+        await hass.async_block_till_done()
+
+    assert coord.data["options_applied"]["hidden_courses_count"] == 1
+    assert coord.data["courses_total"] == 2
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_options_changed_during_offloaded_recompute_win(
+    hass: HomeAssistant, canvas_entry: Callable[..., MockConfigEntry]
+) -> None:
+    entry = canvas_entry()
+    coord = await _setup(hass, entry, FakeCanvas(courses=3, assignments=5))
+
+    building, release = threading.Event(), threading.Event()
+    build_views = coordinator_module.build_views
+    calls = []
+
+    def _blocking_build(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            building.set()
+            release.wait(10)
+        return build_views(*args, **kwargs)
+
+    with patch.object(coordinator_module, "VIEW_EXECUTOR_MIN_ITEMS", 1), patch.object(
+        coordinator_module, "build_views", _blocking_build
+    ):
+        # The timed recompute starts in the executor with the old options (fired by hand here)
+        if coord._unsub_recompute is not None:
+            coord._unsub_recompute()
+        coord._async_recompute_views()
+        await hass.async_add_executor_job(building.wait, 10)
+        hass.config_entries.async_update_entry(entry, options={**entry.options, OPT_HIDE_COURSES: ["100"]})
+        # The apply publishes while the recompute is still blocked (block_till_done would wait for it)
+        for _ in range(50):
+            if coord.data["options_applied"]["hidden_courses_count"] == 1:
+                break
+            await asyncio.sleep(0.01)
+        assert coord.data["options_applied"]["hidden_courses_count"] == 1
+        release.set()
+        await coord._recompute_task
+        await hass.async_block_till_done()
+
+    assert coord.data["options_applied"]["hidden_courses_count"] == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_missing_refresh_drops_cached_submission_states(
+    hass: HomeAssistant, canvas_entry: Callable[..., MockConfigEntry]
+) -> None:
+    entry = canvas_entry()
+    sessions: list = []
+    canvas = FakeCanvas(courses=2, assignments=6)
+    coord = await _setup(hass, entry, canvas, sessions)
+    cached = coord.submission_cache.as_dict()["entries"]
+    assert cached
+
+    def _checks(course: str) -> int:
+        return sum(1 for p in sessions[0].requests if p.startswith(f"/api/v1/courses/{course}/assignments/") and p.endswith("/submissions/self"))
+
+    before = {c: _checks(c) for c in ("100", "101")}
+    # An entry of an assignment no longer in the course is dropped with the rest
+    coord.submission_cache.set("100", "999999", {"workflow_state": "graded"}, None, canvas.now)
+    await coord.async_refresh_partial(["100"], ["missing"])
+    await hass.async_block_till_done()
+
+    assert _checks("100") - before["100"] == len(coord._raw["submissions"]["100"]) > 0
+    assert _checks("101") == before["101"]
+    assert coord.submission_cache.get("100", "999999") is None
+    assert coord.submission_cache.as_dict()["entries"] == cached
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_concluded_course_is_not_frozen_after_a_failed_crawl(
+    hass: HomeAssistant, canvas_entry: Callable[..., MockConfigEntry]
+) -> None:
+    canvas = FakeCanvas(courses=2, assignments=4)
+    ended = (canvas.now - timedelta(days=60)).date().isoformat()
+    entry = canvas_entry(**{OPT_COURSE_END_DATES_MAP: {"100": ended}})
+    failing = {"/api/v1/courses/100/enrollments"}
+    answer = canvas.answer
+    canvas.answer = lambda path, query: (503, {"errors": []}, False) if path in failing else answer(path, query)
+
+    coord = await _setup(hass, entry, canvas)
+    assert "100" in coord.data["concluded_course_ids"]
+    assert "100" not in coord._raw["crawled_at"] and "101" in coord._raw["crawled_at"]
+
+    # Next crawl (the probe sees a new announcement): the concluded course is crawled again
+    # instead of being frozen on its failed pass, and only then recorded
+    failing.clear()
+    canvas.announcements.append({**canvas.announcements[0], "id": 999})
+    await coord.async_refresh()
+    await hass.async_block_till_done()
+    assert coord.refresh_cycles[-1]["kind"] == "full"
+    assert coord.refresh_cycles[-1]["courses_frozen"] == 0
+    assert "100" in coord._raw["crawled_at"]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_announcements_without_course_survive_a_failed_fetch(
+    hass: HomeAssistant, canvas_entry: Callable[..., MockConfigEntry]
+) -> None:
+    canvas = FakeCanvas(courses=2, assignments=4)
+    odd = {**canvas.announcements[0], "id": 777, "title": "Unparsed", "context_code": "course_x"}
+    failing: set[str] = set()
+    answer = canvas.answer
+
+    def _answer(path, query):
+        if path in failing:
+            return 503, {"errors": []}, False
+        status, body, paginated = answer(path, query)
+        return (status, body + [odd], paginated) if path == "/api/v1/announcements" else (status, body, paginated)
+
+    canvas.answer = _answer
+    entry = canvas_entry()
+    coord = await _setup(hass, entry, canvas)
+    titles = sorted(a["title"] for a in coord._raw["announcements"])
+    assert "Unparsed" in titles
+
+    # Announcements fail on the next crawl: the last good list is kept, unparsed course included
+    failing.add("/api/v1/announcements")
+    canvas.announcements.append({**canvas.announcements[0], "id": 999})
+    await coord.async_refresh()
+    await hass.async_block_till_done()
+    assert coord.refresh_cycles[-1]["kind"] == "full"
+    assert sorted(a["title"] for a in coord._raw["announcements"]) == titles
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
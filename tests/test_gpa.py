@@ -0,0 +1,115 @@
+"""GPA scales, per-course contributions and the memoized GPA."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.canvas_student.gpa import (
+    DEFAULT_PRESET,
+    compute_gpa,
+    course_contribution,
+    cumulative_gpa,
+    gpa_inputs,
+    resolve_scale,
+    validate_custom_scale,
+)
+
+
+@pytest.mark.parametrize(
+    ("score", "letter"),
+    [(100, "A"), (93, "A"), (92.99, "A-"), (90, "A-"), (87, "B+"), (80, "B-"), (60, "D-"), (59.9, "F"), (-5, "F")],
+)
+def test_plusminus_letters(score: float, letter: str) -> None:
+    assert resolve_scale("us_4_0_plusminus").letter_for(score) == letter
+
+
+def test_us_4_0_keeps_plus_minus_points() -> None:
+    # Entries configured before the preset table existed stored "us_4_0" for the plus/minus scale
+    legacy, plusminus = resolve_scale("us_4_0"), resolve_scale("us_4_0_plusminus")
+    assert legacy.key == "us_4_0"
+    for score in (95, 91, 88, 84, 81, 78, 74, 71, 68, 64, 61, 40):
+        assert course_contribution(legacy, score, None, None) == course_contribution(plusminus, score, None, None)
+    assert course_contribution(legacy, 91, None, None) == 3.7
+    assert course_contribution(legacy, None, "B+", None) == 3.3
+
+
+def test_plain_scale() -> None:
+    plain = resolve_scale("us_4_0_plain")
+    assert plain.letter_for(91) == "A" and plain.letter_for(89.5) == "B"
+    assert course_contribution(plain, 91, None, None) == 4.0
+    # Canvas letters with +/- fall back to the plain letter
+    assert course_contribution(plain, None, "B+", None) == 3.0
+    assert plain.max_points == 4.0
+
+
+def test_weighted_bonus_never_lifts_a_failing_grade() -> None:
+    weighted = resolve_scale("us_4_0_weighted")
+    assert course_contribution(weighted, 95, None, "Honors") == 4.5
+    assert course_contribution(weighted, 95, None, "ap") == 5.0
+    assert course_contribution(weighted, 95, None, "unknown") == 4.0
+    assert course_contribution(weighted, 40, None, "ap") == 0.0
+    assert weighted.max_points == 4.0
+
+
+def test_numeric_scale_stretches_points() -> None:
+    five = resolve_scale("5.0")
+    assert five.max_points == 5.0
+    assert course_contribution(five, 95, None, None) == 5.0
+    assert course_contribution(five, 91, None, None) == pytest.approx(3.7 * 1.25)
+    assert resolve_scale(5).key == "5"
+
+
+@pytest.mark.parametrize("value", [None, "", "nonsense", "0", "-3", "custom"])
+def test_fallback_to_default(value) -> None:
+    assert resolve_scale(value).key == DEFAULT_PRESET
+
+
+def test_custom_scale() -> None:
+    table = {"cutoffs": {"P": 50, "F": 0}, "points": {"P": 1, "F": 0}}
+    custom = resolve_scale("custom", table)
+    assert custom.key == "custom" and custom.letter_for(75) == "P"
+    assert course_contribution(custom, 75, None, None) == 1.0
+    # An unusable table falls back instead of failing the refresh
+    assert resolve_scale("custom", {"cutoffs": {"P": 50}, "points": {}}).key == DEFAULT_PRESET
+    with pytest.raises(ValueError):
+        validate_custom_scale({"cutoffs": {"P": 50}, "points": {}})
+    with pytest.raises(ValueError):
+        validate_custom_scale(["not", "a", "table"])
+
+
+def test_compute_gpa_weights_by_credits_and_is_memoized() -> None:
+    scale = resolve_scale("us_4_0_plusminus")
+    grades = {
+        "1": {"current_score": 95, "current_grade": None},
+        "2": {"current_score": "84.0", "current_grade": None},
+        "3": {"current_score": None, "current_grade": None},
+        "4": {"current_score": 70, "current_grade": None},
+    }
+    inputs = gpa_inputs(grades, {"1": 3, "2": 1, "3": 2}, {})
+    # Course 4 has no credits and is left out; course 3 has credits but no grade
+    assert [c[0] for c in inputs] == ["1", "2", "3"]
+    result = compute_gpa(scale, inputs)
+    assert result.gpa == pytest.approx((4.0 * 3 + 3.0 * 1) / 4)
+    assert result.credits == 4.0
+    assert dict(result.points_by_course) == {"1": 4.0, "2": 3.0}
+    assert compute_gpa(scale, gpa_inputs(grades, {"1": 3, "2": 1, "3": 2}, {})) is result
+
+
+def test_cumulative_gpa_normalizes_mixed_maxima() -> None:
+    same = cumulative_gpa(
+        [
+            {"gpa_credits": 3, "gpa_quality_points": 12, "gpa_max_points": 4.0},
+            {"gpa_credits": 1, "gpa_quality_points": 2, "gpa_max_points": 4.0},
+            {"gpa_credits": 0, "gpa_quality_points": 0, "gpa_max_points": 4.0},
+        ]
+    )
+    assert same["gpa"] == pytest.approx(3.5) and not same["normalized"] and same["schools"] == 2
+
+    mixed = cumulative_gpa(
+        [
+            {"gpa_credits": 2, "gpa_quality_points": 10, "gpa_max_points": 5.0},
+            {"gpa_credits": 2, "gpa_quality_points": 6, "gpa_max_points": 4.0},
+        ]
+    )
+    assert mixed["normalized"] and mixed["scale_max"] == 4.0
+    assert mixed["gpa"] == pytest.approx((10 * 0.8 + 6) / 4)
+    assert cumulative_gpa([]) is None
@@ -0,0 +1,66 @@
+"""Import cost and setup time of the integration."""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from typing import Callable
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.canvas_student.const import DOMAIN, IMPORT_BUDGET_MS
+
+from .fake_canvas import FakeCanvas
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "custom_components.canvas_student"
+RUNTIME_MODULES = (
+    "aggregate", "cassette", "coordinator", "grade_history", "metrics", "observer", "scheduler",
+    "services", "simple_client", "submission_cache", "websocket_api",
+)
+# First setup of one small entry against the fake Canvas (runtime imports included)
+SETUP_BUDGET_MS = 3000
+
+_PROBE = f"""
+import json, sys, time
+# Loaded by Home Assistant long before it imports an integration
+import homeassistant.config_entries, homeassistant.helpers.aiohttp_client, homeassistant.helpers.selector
+import homeassistant.helpers.storage, homeassistant.helpers.config_validation
+started = time.perf_counter()
+import {PACKAGE}.config_flow as flow
+import {PACKAGE} as pkg
+print(json.dumps({{
+    "wall_ms": (time.perf_counter() - started) * 1000,
+    "import_ms": pkg.IMPORT_MS,
+    "loaded": sorted(m.rsplit(".", 1)[1] for m in sys.modules if m.startswith("{PACKAGE}."))
+}}))
+"""
+
+
+def test_config_flow_import_is_light() -> None:
+    # A fresh interpreter, so nothing the tests imported already counts
+    out = subprocess.run([sys.executable, "-c", _PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    assert not set(result["loaded"]) & set(RUNTIME_MODULES), result["loaded"]
+    assert result["import_ms"] < IMPORT_BUDGET_MS
+
+
+async def test_setup_time(hass: HomeAssistant, canvas_entry: Callable[..., MockConfigEntry]) -> None:
+    canvas = FakeCanvas(courses=3, assignments=10)
+    entry = canvas_entry()
+    entry.add_to_hass(hass)
+    with patch(f"{PACKAGE}.async_get_clientsession", lambda *_a, **_k: canvas.session()):
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+
+    startup = hass.data[DOMAIN][entry.entry_id]["startup"]
+    assert {"import_ms", "runtime_import_ms", "load_stores_ms", "first_refresh_ms", "platforms_ms", "setup_ms"} <= startup.keys()
+    assert startup["setup_ms"] < SETUP_BUDGET_MS
+    assert hass.states.get("calendar.canvas_school_0_student_0_due_dates") is not None
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
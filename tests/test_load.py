@@ -0,0 +1,177 @@
+"""Offline load harness: many entries against a fake Canvas in a real hass instance.
+
+Sets up CANVAS_LOAD_ENTRIES entries (default 6), each a school of
+CANVAS_LOAD_COURSES courses with CANVAS_LOAD_ASSIGNMENTS assignments, then runs
+a concurrent full refresh of all of them and reports, per entry:
+
+* event-loop lag (a 5 ms sleep loop measures how late it wakes up),
+* state writes (state_changed events of the entry's entities),
+* recorder payload (serialized attributes of the entry's entities),
+* memory (tracemalloc growth over setup).
+
+Run with ``-s`` to see the report; the assertions are coarse budgets meant to
+catch regressions, not benchmarks. Scale up with e.g.
+``CANVAS_LOAD_ENTRIES=40 CANVAS_LOAD_ASSIGNMENTS=200 pytest tests/test_load.py -s``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import tracemalloc
+from collections import Counter
+from typing import Callable
+from unittest.mock import patch
+
+from homeassistant.const import EVENT_LOGGING_CHANGED, EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.canvas_student.const import DATA_METRICS, DOMAIN
+from custom_components.canvas_student.metrics import payload_bytes, percentiles
+
+from .fake_canvas import FakeCanvas
+
+ENTRIES = int(os.environ.get("CANVAS_LOAD_ENTRIES", "6"))
+COURSES = int(os.environ.get("CANVAS_LOAD_COURSES", "6"))
+ASSIGNMENTS = int(os.environ.get("CANVAS_LOAD_ASSIGNMENTS", "40"))
+
+# Coarse budgets (generous for slow CI machines)
+MAX_LOOP_LAG_P99_MS = 250
+MAX_ATTRIBUTE_BYTES_PER_ENTRY = 250_000
+MAX_MEMORY_PER_ENTRY = 16 * 1024 * 1024
+
+
+class LoopLagProbe:
+    """Samples how late a short sleep wakes up while the workload runs."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task[None] | None = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, (loop.time() - started - self.interval) * 1000))
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+async def test_many_entries(hass: HomeAssistant, canvas_entry: Callable[..., MockConfigEntry]) -> None:
+    canvas = FakeCanvas(courses=COURSES, assignments=ASSIGNMENTS)
+    sessions = []
+
+    def _session(*_args, **_kwargs):
+        sessions.append(canvas.session())
+        return sessions[-1]
+
+    writes: Counter[str] = Counter()
+
+    def _count(event: Event) -> None:
+        writes[event.data["entity_id"]] += 1
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, _count)
+    entries = [canvas_entry(n) for n in range(ENTRIES)]
+    for entry in entries:
+        entry.add_to_hass(hass)
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        with patch("custom_components.canvas_student.async_get_clientsession", _session):
+            assert await async_setup_component(hass, DOMAIN, {})
+            await hass.async_block_till_done()
+        setup_memory = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+
+    coords = [c for e in entries for c in hass.data[DOMAIN][e.entry_id]["coordinators"]]
+    assert len(coords) == ENTRIES and all(c.last_update_success for c in coords)
+    # Every request the crawl made is one the fake Canvas knows (a 404 would hide missing coverage)
+    assert all(c.data.get("courses_total") == COURSES for c in coords)
+    assert not any(c.data.get("stale_sections") for c in coords)
+
+    # The all-schools sensors live on one entry but cover every entry; they are reported apart
+    registry = er.async_get(hass)
+    entity_ids: dict[str, list[str]] = {}
+    aggregate_ids: list[str] = []
+    for entry in entries:
+        for reg in er.async_entries_for_config_entry(registry, entry.entry_id):
+            is_aggregate = str(reg.unique_id).startswith(f"{DOMAIN}_all_schools")
+            (aggregate_ids if is_aggregate else entity_ids.setdefault(entry.entry_id, [])).append(reg.entity_id)
+    assert len(entity_ids) == ENTRIES and aggregate_ids
+
+    # Concurrent full refresh of every entry with unchanged Canvas data. The test loop runs in
+    # asyncio debug mode, whose per-callback stack capture would dominate the lag measured.
+    setup_writes = sum(writes.values())
+    probe = LoopLagProbe()
+    debug = hass.loop.get_debug()
+    hass.loop.set_debug(False)
+    try:
+        probe.start()
+        await asyncio.gather(*(c.async_full_refresh() for c in coords))
+        await hass.async_block_till_done()
+        await probe.stop()
+    finally:
+        hass.loop.set_debug(debug)
+    refresh_writes = sum(writes.values()) - setup_writes
+
+    lag = percentiles(probe.samples)
+
+    def _attribute_bytes(ids: list[str]) -> int:
+        return sum(payload_bytes(dict(state.attributes)) or 0 for eid in ids if (state := hass.states.get(eid)))
+
+    attribute_bytes = {entry_id: _attribute_bytes(ids) for entry_id, ids in entity_ids.items()}
+    entities = sum(len(ids) for ids in entity_ids.values()) + len(aggregate_ids)
+    print(
+        f"\nCanvas load: {ENTRIES} entries x {COURSES} courses x {ASSIGNMENTS} assignments, {entities} entities\n"
+        f"  requests per entry (setup + refresh): {sum(len(s.requests) for s in sessions) / ENTRIES:.0f}\n"
+        f"  loop lag during refresh (ms): {lag}\n"
+        f"  state writes: setup {setup_writes}, unchanged refresh {refresh_writes}\n"
+        f"  recorder payload per entry (bytes): max {max(attribute_bytes.values())}, "
+        f"all-schools sensors {_attribute_bytes(aggregate_ids)}\n"
+        f"  memory per entry after setup (bytes): {setup_memory // ENTRIES}"
+    )
+
+    assert lag["p99"] is not None and lag["p99"] < MAX_LOOP_LAG_P99_MS
+    # Unchanged data: at most the odd freshness attribute moves, never every entity
+    assert refresh_writes < entities
+    assert max(attribute_bytes.values()) < MAX_ATTRIBUTE_BYTES_PER_ENTRY
+    assert setup_memory // ENTRIES < MAX_MEMORY_PER_ENTRY
+
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_loop_lag_sampler_follows_debug_logging(hass: HomeAssistant) -> None:
+    logger = logging.getLogger("custom_components.canvas_student")
+    level = logger.level
+    try:
+        logger.setLevel(logging.INFO)
+        assert await async_setup_component(hass, DOMAIN, {})
+        monitor = hass.data[DATA_METRICS]
+        assert not monitor.sampling
+
+        logger.setLevel(logging.DEBUG)
+        hass.bus.async_fire(EVENT_LOGGING_CHANGED)
+        await hass.async_block_till_done()
+        assert monitor.sampling
+
+        logger.setLevel(logging.INFO)
+        hass.bus.async_fire(EVENT_LOGGING_CHANGED)
+        await hass.async_block_till_done()
+        assert not monitor.sampling
+    finally:
+        logger.setLevel(level)
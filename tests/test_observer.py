@@ -0,0 +1,53 @@
+"""Observer mode: shared responses and what a targeted refresh re-fetches."""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any
+
+from custom_components.canvas_student.observer import ObserverSession, ObserverStudentClient
+
+
+class _CountingClient:
+    """The CanvasClient calls ObserverSession makes, counted."""
+
+    def __init__(self) -> None:
+        self.calls: Counter[str] = Counter()
+        self.score = 80
+
+    async def list_user_enrollments(self, student_id: str) -> list[dict[str, Any]]:
+        self.calls["enrollments"] += 1
+        return [{"course_id": 100, "grades": {"current_score": self.score}}]
+
+    async def list_courses_for_user(self, student_id: str) -> list[dict[str, Any]]:
+        self.calls["courses"] += 1
+        return [{"id": 100}]
+
+    async def list_assignments(self, course_id: str, bucket: str | None = None) -> list[dict[str, Any]]:
+        self.calls["assignments"] += 1
+        return []
+
+
+async def test_invalidate_refetches_student_grades() -> None:
+    canvas = _CountingClient()
+    session = ObserverSession(canvas, ["1", "2"])
+    first, second = ObserverStudentClient(session, "1"), ObserverStudentClient(session, "2")
+
+    assert (await first.list_enrollments("100"))[0]["grades"]["current_score"] == 80
+    await first.list_enrollments("100")
+    await first.list_assignments("100")
+    assert canvas.calls == {"enrollments": 1, "assignments": 1}
+
+    # Targeted refresh of course 100: its grades come from the per-student enrollments
+    canvas.score = 95
+    first.invalidate(["100"])
+    assert (await first.list_enrollments("100"))[0]["grades"]["current_score"] == 95
+    assert canvas.calls["enrollments"] == 2
+
+    # A full invalidate drops the student's course list too
+    await first.list_courses()
+    first.invalidate()
+    await first.list_courses()
+    assert canvas.calls["courses"] == 2
+
+    await second.list_enrollments("100")
+    assert canvas.calls["enrollments"] == 3
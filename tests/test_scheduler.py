@@ -0,0 +1,24 @@
+"""Refresh scheduler: phase offsets, groups and slot bookkeeping."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from custom_components.canvas_student.scheduler import RefreshScheduler
+
+
+def test_group_shares_offset() -> None:
+    scheduler = RefreshScheduler()
+    first = scheduler.register("a_1", timedelta(minutes=30), group="a")
+    assert timedelta(0) <= first <= timedelta(minutes=30)
+    assert scheduler.register("a_2", timedelta(minutes=30), group="a") == first
+
+
+async def test_slot_of_unregistered_entry_leaves_no_ghost() -> None:
+    scheduler = RefreshScheduler()
+    scheduler.register("a", timedelta(minutes=30))
+    async with scheduler.slot("a"):
+        assert scheduler.as_dict()["running"] == 1
+        scheduler.unregister("a")
+    async with scheduler.slot("a"):
+        pass
+    assert scheduler.as_dict()["entries"] == {} and not scheduler.busy
@@ -0,0 +1,104 @@
+"""Shared, read-only views and the memory an entry retains across refreshes."""
+from __future__ import annotations
+
+import gc
+import tracemalloc
+from typing import Callable
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_component import DATA_INSTANCES
+from homeassistant.setup import async_setup_component
+from homeassistant.util.read_only_dict import ReadOnlyDict
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.canvas_student.const import DOMAIN
+from custom_components.canvas_student.coordinator import snapshot_size
+from custom_components.canvas_student.shared_views import SharedViews
+
+from .fake_canvas import FakeCanvas
+
+# Memory the integration still holds after a few refreshes with unchanged Canvas data
+MAX_RETAINED_GROWTH = 128 * 1024
+REFRESHES = 4
+TRACE_DEPTH = 16
+INTEGRATION = [
+    tracemalloc.Filter(True, "*custom_components/canvas_student/*", all_frames=True),
+    tracemalloc.Filter(False, "*tests/fake_canvas.py", all_frames=True),
+]
+
+
+def test_intern_reuses_equal_views() -> None:
+    views = SharedViews()
+    first = views.intern({"course_names_by_id": {"1": "Biology"}, "missing_by_course": {"1": [{"id": 7}], "2": []}})
+    assert isinstance(first["course_names_by_id"], ReadOnlyDict)
+    with pytest.raises(RuntimeError):
+        first["course_names_by_id"]["1"] = "Chemistry"
+
+    second = views.intern({"course_names_by_id": {"1": "Biology"}, "missing_by_course": {"1": [{"id": 7}], "2": []}})
+    assert second["course_names_by_id"] is first["course_names_by_id"]
+    assert second["missing_by_course"] is first["missing_by_course"]
+
+    # Only the course whose list changed gets a new list
+    third = views.intern({"course_names_by_id": {"1": "Biology"}, "missing_by_course": {"1": [{"id": 7}], "2": [{"id": 8}]}})
+    assert third["missing_by_course"] is not first["missing_by_course"]
+    assert third["missing_by_course"]["1"] is first["missing_by_course"]["1"]
+    assert views.as_dict() == {"reused": 3, "replaced": 3}
+
+
+async def test_unchanged_refreshes_retain_no_copies(hass: HomeAssistant, canvas_entry: Callable[..., MockConfigEntry]) -> None:
+    canvas = FakeCanvas(courses=4, assignments=60, lookback_days=60)
+    entry = canvas_entry()
+    entry.add_to_hass(hass)
+    # Small school, low threshold: views are built and interned in the executor
+    with patch("custom_components.canvas_student.async_get_clientsession", lambda *_a, **_k: canvas.session()), patch(
+        "custom_components.canvas_student.coordinator.VIEW_EXECUTOR_MIN_ITEMS", 100
+    ):
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+        coord = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        assert snapshot_size(coord._raw) >= 100
+
+        # The test loop's debug mode keeps reprs of every handle and the fake session logs every
+        # path, so only memory allocated by the integration itself counts
+        debug = hass.loop.get_debug()
+        hass.loop.set_debug(False)
+        tracemalloc.start(TRACE_DEPTH)
+        try:
+            # Warm-up: traced refreshes replace untraced data and bounded buffers with traced copies
+            for _ in range(2):
+                await coord.async_full_refresh()
+                await hass.async_block_till_done()
+            gc.collect()
+            before = tracemalloc.take_snapshot().filter_traces(INTEGRATION)
+            for _ in range(REFRESHES):
+                await coord.async_full_refresh()
+                await hass.async_block_till_done()
+            gc.collect()
+            after = tracemalloc.take_snapshot().filter_traces(INTEGRATION)
+        finally:
+            tracemalloc.stop()
+            hass.loop.set_debug(debug)
+
+    growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    assert coord.view_builds["executor"] >= REFRESHES + 3
+    assert coord.shared_views.reused > 0
+    assert growth < MAX_RETAINED_GROWTH, f"{growth} bytes retained after {REFRESHES} unchanged refreshes"
+
+    # States hold the coordinator's shared views, not copies
+    states = [hass.states.get(eid) for eid in hass.states.async_entity_ids("sensor") if "school_0" in eid]
+    assignments = next(s for s in states if "assignments_by_course" in s.attributes)
+    assert assignments.attributes["assignments_by_course"] is coord.data["assignments_by_course"]
+    grades = next(s for s in states if "grades_by_course" in s.attributes)
+    assert grades.attributes["course_names_by_id"] is coord.data["course_names_by_id"]
+
+    # Attributes are built once per data version, not on every state write
+    sensor = hass.data[DATA_INSTANCES]["sensor"].get_entity(assignments.entity_id)
+    attrs = sensor.extra_state_attributes
+    assert sensor.extra_state_attributes is attrs
+    coord.async_set_updated_data(dict(coord.data))
+    assert sensor.extra_state_attributes is not attrs
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()